@@ -1,7 +1,10 @@
 import os
+import threading
+import time
+from typing import Any, Dict
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.models import Base
 
 # Database configuration
@@ -11,14 +14,129 @@ SYNC_DATABASE_URL = DATABASE_URL.replace("+asyncpg", "") if DATABASE_URL else No
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
+# Connection pool configuration; "null" opens a connection per session and
+# is meant for deployments behind pgbouncer, which pools on its own
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Prepared statements cached per asyncpg connection; pgbouncer in
+# transaction mode needs 0
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+
+class PoolStats:
+    """Checkout wait times and timeouts of the connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float, timed_out: bool = False):
+        """Record one checkout attempt."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Consistent copy of the counters."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / attempts * 1000 if attempts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def reset(self):
+        """Zero the counters."""
+        with self._lock:
+            self.checkouts = self.timeouts = 0
+            self.total_wait = self.max_wait = 0.0
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waited."""
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kwargs):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def engine_options(mode: str = DB_POOL_MODE, url: str = DATABASE_URL) -> Dict[str, Any]:
+    """Keyword arguments for the async engine in the given pool mode."""
+    options: Dict[str, Any] = {}
+    if url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+
+    if mode == "null":
+        options["poolclass"] = NullPool
+        return options
+    if mode != "queue":
+        raise ValueError(f"Unknown DB_POOL_MODE: {mode}. Expected 'queue' or 'null'")
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+
 # Create async engine for FastAPI
 engine = create_async_engine(
     DATABASE_URL,
     echo=os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true",
-    poolclass=NullPool,  # Disable pooling for async
     future=True,
+    **engine_options(),
 )
 
+
+def get_pool_stats(async_engine=None) -> Dict[str, Any]:
+    """Occupancy and checkout wait statistics of the engine's connection pool."""
+    pool = (async_engine or engine).sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"mode": "null"}
+
+    capacity = pool.size() + max(pool.max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "mode": "queue",
+        "size": pool.size(),
+        "max_overflow": pool.max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "saturation": checked_out / capacity if capacity > 0 else 0.0,
+        **pool_stats.snapshot(),
+    }
+
+
 # Create sync engine for Alembic
 sync_engine = create_engine(
     SYNC_DATABASE_URL,
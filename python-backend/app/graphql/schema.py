@@ -1,18 +1,110 @@
+import asyncio
 import strawberry
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Callable
+from graphql import GraphQLError
+from strawberry.types import Info
 from app.services.reconciliation_service import ReconciliationService
+from app.services.scheduler import ScoringScheduler, SchedulerBusy
+from app.services.single_flight import SingleFlight
+from app.services.jobs import JobManager, JobStore
+from app.services.blocking import BlockingPlan
+from app.database import async_session_maker
 from app.graphql.types import (
     InvoiceInput,
     TransactionInput,
     ScoringResult,
+    ScoringResultColumnar,
     ExplanationResult,
     ScoreBreakdown,
     ReconciliationCandidate,
+    BlockingPlanResult,
+    RecallAuditResult,
+    WorkingSetResult,
+    IncrementalScoringResult,
+    IndexCacheStats,
+    ResultCacheStats,
+    SimilarityMemoStats,
+    AssignmentResult,
+    ReconcileTenantResult,
+    ReconciliationJob,
 )
 
 # Initialize service
 reconciliation_service = ReconciliationService()
 
+# Runs CPU-bound scoring off the event loop
+scoring_scheduler = ScoringScheduler()
+
+# Concurrent identical scoreCandidates requests share one scoring run
+scoring_flights = SingleFlight()
+
+# Background scoring jobs, persisted so they survive restarts
+reconciliation_jobs = JobManager(reconciliation_service, scoring_scheduler, JobStore())
+
+
+def to_invoice_dicts(invoices: List[InvoiceInput]) -> List[Dict[str, Any]]:
+    """Convert Strawberry invoice inputs to dictionaries for the service."""
+    return [
+        {
+            "id": inv.id,
+            "amount": inv.amount,
+            "invoice_date": inv.invoice_date,
+            "description": inv.description,
+            "vendor_name": inv.vendor_name,
+            "invoice_number": inv.invoice_number,
+        }
+        for inv in invoices
+    ]
+
+
+def to_transaction_dicts(transactions: List[TransactionInput]) -> List[Dict[str, Any]]:
+    """Convert Strawberry transaction inputs to dictionaries for the service."""
+    return [
+        {
+            "id": tx.id,
+            "amount": tx.amount,
+            "posted_at": tx.posted_at,
+            "description": tx.description,
+            "reference": tx.reference,
+        }
+        for tx in transactions
+    ]
+
+
+async def run_scoring(info: Info, tenant_id: str, fn: Callable, **kwargs) -> Any:
+    """Run a scoring call on the scheduler, turning rejections into retryable errors."""
+    try:
+        return await scoring_scheduler.run(tenant_id, fn, tenant_id, **kwargs)
+    except SchedulerBusy as exc:
+        raise scoring_busy(info, exc)
+
+
+def scoring_busy(info: Info, exc: SchedulerBusy) -> GraphQLError:
+    """GraphQL error for a rejected scoring call, with a Retry-After header when possible."""
+    response = info.context.get("response") if isinstance(info.context, dict) else None
+    if response is not None:
+        response.headers["Retry-After"] = str(exc.retry_after)
+    return GraphQLError(
+        str(exc), extensions={"code": "SCORING_BUSY", "retryAfter": exc.retry_after}
+    )
+
+
+async def score_candidates_shared(tenant_id: str, **kwargs) -> ScoringResult:
+    """
+    Run score_candidates on the scheduler, sharing the run with identical concurrent calls.
+
+    Calls are identical when their request keys match: same tenant,
+    options and record content. Rejections raise SchedulerBusy.
+    """
+    # Hashing a large batch takes a while, so it stays off the event loop too
+    key = await asyncio.to_thread(reconciliation_service.request_key, tenant_id, **kwargs)
+    return await scoring_flights.run(
+        key,
+        lambda: scoring_scheduler.run(
+            tenant_id, reconciliation_service.score_candidates, tenant_id, cache_key=key, **kwargs
+        ),
+    )
+
 
 @strawberry.type
 class Query:
@@ -22,6 +114,33 @@ class Query:
     def health(self) -> str:
         """Health check endpoint."""
         return "Python reconciliation service is healthy"
+    
+    @strawberry.field
+    def blocking_plan(self, tenant_id: str) -> BlockingPlanResult:
+        """Blocking plan used when scoring candidates for a tenant."""
+        return reconciliation_service.describe_blocking_plan(
+            tenant_id, reconciliation_service.get_blocking_plan(tenant_id)
+        )
+    
+    @strawberry.field
+    def index_cache_stats(self) -> IndexCacheStats:
+        """Hit, miss and memory counters for cached tenant indexes."""
+        return reconciliation_service.index_cache_stats()
+    
+    @strawberry.field
+    def result_cache_stats(self) -> ResultCacheStats:
+        """Hit, miss and memory counters for cached scoring results."""
+        return reconciliation_service.result_cache_stats()
+    
+    @strawberry.field
+    def similarity_memo_stats(self) -> SimilarityMemoStats:
+        """Hit rate and size of the description-pair similarity memo."""
+        return reconciliation_service.similarity_memo_stats()
+    
+    @strawberry.field
+    def reconciliation_job(self, id: str) -> Optional[ReconciliationJob]:
+        """Status, progress and results so far of a background scoring job."""
+        return reconciliation_jobs.get(id)
 
 
 @strawberry.type
@@ -29,12 +148,16 @@ class Mutation:
     """GraphQL mutations."""
     
     @strawberry.field
-    def score_candidates(
+    async def score_candidates(
         self,
+        info: Info,
         tenant_id: str,
         invoices: List[InvoiceInput],
         transactions: List[TransactionInput],
         top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
     ) -> ScoringResult:
         """
         Score invoice-transaction pairs using deterministic heuristics.
@@ -44,40 +167,413 @@ class Mutation:
             invoices: List of invoices to match
             transactions: List of transactions to match against
             top_n: Number of top candidates to return per invoice
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine ("sequence" or
+                "tfidf"); defaults to the tenant's engine
             
         Returns:
             ScoringResult with ranked candidates
         """
-        # Convert Strawberry types to dictionaries for service
-        invoice_dicts = [
-            {
-                "id": inv.id,
-                "amount": inv.amount,
-                "invoice_date": inv.invoice_date,
-                "description": inv.description,
-                "vendor_name": inv.vendor_name,
-                "invoice_number": inv.invoice_number,
-            }
-            for inv in invoices
-        ]
-        
-        transaction_dicts = [
-            {
-                "id": tx.id,
-                "amount": tx.amount,
-                "posted_at": tx.posted_at,
-                "description": tx.description,
-                "reference": tx.reference,
-            }
-            for tx in transactions
-        ]
-        
-        return reconciliation_service.score_candidates(
+        try:
+            return await score_candidates_shared(
+                tenant_id,
+                invoices=to_invoice_dicts(invoices),
+                transactions=to_transaction_dicts(transactions),
+                top_n=top_n,
+                backend=backend,
+                min_partial_score=min_partial_score,
+                text_engine=text_engine,
+            )
+        except SchedulerBusy as exc:
+            raise scoring_busy(info, exc)
+    
+    @strawberry.field
+    async def score_candidates_columnar(
+        self,
+        info: Info,
+        tenant_id: str,
+        invoices: List[InvoiceInput],
+        transactions: List[TransactionInput],
+        top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
+    ) -> ScoringResultColumnar:
+        """
+        Score like scoreCandidates, returning parallel arrays for bulk callers.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: List of invoices to match
+            transactions: List of transactions to match against
+            top_n: Number of top candidates to return per invoice
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine; defaults to the
+                tenant's engine
+            
+        Returns:
+            ScoringResultColumnar with one array per candidate field
+        """
+        return await run_scoring(
+            info,
+            tenant_id,
+            reconciliation_service.score_candidates_columnar,
+            invoices=to_invoice_dicts(invoices),
+            transactions=to_transaction_dicts(transactions),
+            top_n=top_n,
+            backend=backend,
+            min_partial_score=min_partial_score,
+            text_engine=text_engine,
+        )
+    
+    @strawberry.field
+    async def submit_reconciliation_job(
+        self,
+        tenant_id: str,
+        invoices: List[InvoiceInput],
+        transactions: List[TransactionInput],
+        top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
+    ) -> ReconciliationJob:
+        """
+        Score like scoreCandidates in the background, for batches that
+        would outlast an HTTP request.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: List of invoices to match
+            transactions: List of transactions to match against
+            top_n: Number of top candidates to return per invoice
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine; defaults to the
+                tenant's engine
+            
+        Returns:
+            The queued job; poll reconciliationJob with its id
+        """
+        return reconciliation_jobs.submit(
             tenant_id=tenant_id,
-            invoices=invoice_dicts,
-            transactions=transaction_dicts,
+            invoices=to_invoice_dicts(invoices),
+            transactions=to_transaction_dicts(transactions),
+            top_n=top_n,
+            backend=backend,
+            min_partial_score=min_partial_score,
+            text_engine=text_engine,
+        )
+    
+    @strawberry.field
+    def cancel_reconciliation_job(self, id: str) -> Optional[ReconciliationJob]:
+        """
+        Stop a background scoring job after the shard it is scoring.
+        
+        Args:
+            id: Job identifier
+            
+        Returns:
+            The job, keeping the candidates scored so far, or null if unknown
+        """
+        return reconciliation_jobs.cancel(id)
+    
+    @strawberry.field
+    async def reconcile_tenant(
+        self,
+        tenant_id: str,
+        top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
+    ) -> ReconcileTenantResult:
+        """
+        Reconcile a tenant straight from the database and store the candidates.
+        
+        Args:
+            tenant_id: Tenant identifier
+            top_n: Number of top candidates to keep per invoice
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine; defaults to the
+                tenant's engine
+            
+        Returns:
+            ReconcileTenantResult with counts of rows read, written and removed
+        """
+        async with async_session_maker() as session:
+            return await reconciliation_service.reconcile_tenant(
+                session,
+                tenant_id,
+                top_n=top_n,
+                backend=backend,
+                min_partial_score=min_partial_score,
+                text_engine=text_engine,
+            )
+    
+    @strawberry.field
+    async def propose_assignment(
+        self,
+        info: Info,
+        tenant_id: str,
+        invoices: List[InvoiceInput],
+        transactions: List[TransactionInput],
+        top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
+    ) -> AssignmentResult:
+        """
+        Propose a one-to-one matching of invoices to transactions.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: List of invoices to match
+            transactions: List of transactions to match against
+            top_n: Candidates per invoice considered by the assignment
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine; defaults to the
+                tenant's engine
+            
+        Returns:
+            AssignmentResult where no invoice or transaction appears twice
+        """
+        return await run_scoring(
+            info,
+            tenant_id,
+            reconciliation_service.propose_assignment,
+            invoices=to_invoice_dicts(invoices),
+            transactions=to_transaction_dicts(transactions),
             top_n=top_n,
+            backend=backend,
+            min_partial_score=min_partial_score,
+            text_engine=text_engine,
         )
+    
+    @strawberry.field
+    def set_blocking_plan(
+        self,
+        tenant_id: str,
+        keys: List[str],
+        match: Optional[str] = "all",
+        full_scan_fallback: Optional[bool] = False,
+    ) -> BlockingPlanResult:
+        """
+        Choose which cheap keys a pair must share before it is fully scored.
+        
+        Args:
+            tenant_id: Tenant identifier
+            keys: Blocking keys (amount, date, currency, vendor)
+            match: "all" to require every key, "any" to require one
+            full_scan_fallback: Score invoices with no blocked candidates
+                against every transaction
+            
+        Returns:
+            The tenant's new blocking plan
+        """
+        plan = BlockingPlan(
+            keys=tuple(keys), match=match, full_scan_fallback=full_scan_fallback
+        )
+        return reconciliation_service.set_blocking_plan(tenant_id, plan)
+    
+    @strawberry.field
+    def set_text_similarity_engine(self, tenant_id: str, engine: str) -> str:
+        """
+        Choose how descriptions are compared for a tenant.
+        
+        Args:
+            tenant_id: Tenant identifier
+            engine: "sequence" (SequenceMatcher ratios) or "tfidf"
+                (character n-gram TF-IDF cosine)
+            
+        Returns:
+            The tenant's new engine
+        """
+        return reconciliation_service.set_text_engine(tenant_id, engine)
+    
+    @strawberry.field
+    def audit_blocking_recall(
+        self,
+        tenant_id: str,
+        invoices: List[InvoiceInput],
+        transactions: List[TransactionInput],
+        top_n: Optional[int] = 5,
+        sample_size: Optional[int] = 100,
+        keys: Optional[List[str]] = None,
+        match: Optional[str] = "all",
+    ) -> RecallAuditResult:
+        """
+        Measure top-N candidates lost by blocking against exhaustive scoring.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: List of invoices to sample from
+            transactions: List of transactions to match against
+            top_n: Number of top candidates compared per invoice
+            sample_size: Maximum number of invoices to audit
+            keys: Blocking keys to audit instead of the tenant's plan
+            match: Match mode for the audited keys
+            
+        Returns:
+            RecallAuditResult with lost candidates and timings
+        """
+        plan = BlockingPlan(keys=tuple(keys), match=match) if keys is not None else None
+        
+        return reconciliation_service.audit_recall(
+            tenant_id=tenant_id,
+            invoices=to_invoice_dicts(invoices),
+            transactions=to_transaction_dicts(transactions),
+            top_n=top_n,
+            sample_size=sample_size,
+            plan=plan,
+        )
+    
+    @strawberry.field
+    def sync_working_set(
+        self,
+        tenant_id: str,
+        invoices: List[InvoiceInput],
+        transactions: List[TransactionInput],
+    ) -> WorkingSetResult:
+        """
+        Upload a tenant's full set of open invoices and unmatched transactions.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: Every open invoice
+            transactions: Every unmatched transaction
+            
+        Returns:
+            WorkingSetResult with the version to send with later deltas
+        """
+        return reconciliation_service.sync_working_set(
+            tenant_id, to_invoice_dicts(invoices), to_transaction_dicts(transactions)
+        )
+    
+    @strawberry.field
+    def apply_working_set_delta(
+        self,
+        tenant_id: str,
+        base_version: str,
+        upsert_invoices: Optional[List[InvoiceInput]] = None,
+        remove_invoice_ids: Optional[List[str]] = None,
+        upsert_transactions: Optional[List[TransactionInput]] = None,
+        remove_transaction_ids: Optional[List[str]] = None,
+    ) -> WorkingSetResult:
+        """
+        Send only the records changed since base_version.
+        
+        Fails with a resync error if the server holds a different version.
+        
+        Args:
+            tenant_id: Tenant identifier
+            base_version: Version returned by the last sync or delta
+            upsert_invoices: Invoices added or changed
+            remove_invoice_ids: Ids of invoices no longer open
+            upsert_transactions: Transactions added or changed
+            remove_transaction_ids: Ids of transactions no longer unmatched
+            
+        Returns:
+            WorkingSetResult with the new version
+        """
+        return reconciliation_service.apply_working_set_delta(
+            tenant_id,
+            base_version,
+            to_invoice_dicts(upsert_invoices or []),
+            remove_invoice_ids or [],
+            to_transaction_dicts(upsert_transactions or []),
+            remove_transaction_ids or [],
+        )
+    
+    @strawberry.field
+    def score_working_set(
+        self,
+        tenant_id: str,
+        version: str,
+        top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
+    ) -> ScoringResult:
+        """
+        Score the tenant's retained working set.
+        
+        Args:
+            tenant_id: Tenant identifier
+            version: Working set version the client expects to be scored
+            top_n: Number of top candidates to return per invoice
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine; defaults to the
+                tenant's engine
+            
+        Returns:
+            ScoringResult with ranked candidates
+        """
+        return reconciliation_service.score_working_set(
+            tenant_id=tenant_id,
+            version=version,
+            top_n=top_n,
+            backend=backend,
+            min_partial_score=min_partial_score,
+            text_engine=text_engine,
+        )
+    
+    @strawberry.field
+    def rescore_working_set(
+        self,
+        tenant_id: str,
+        version: str,
+        top_n: Optional[int] = 5,
+        backend: Optional[str] = "python",
+        min_partial_score: Optional[int] = 0,
+        text_engine: Optional[str] = None,
+    ) -> IncrementalScoringResult:
+        """
+        Re-rank the working set, scoring only pairs touched since the last call.
+        
+        Args:
+            tenant_id: Tenant identifier
+            version: Working set version the client expects to be scored
+            top_n: Number of top candidates to return per invoice
+            backend: Scoring engine ("python" or "numpy")
+            min_partial_score: Minimum amount plus date score before text
+                and vendor scoring
+            text_engine: Description similarity engine; defaults to the
+                tenant's engine
+            
+        Returns:
+            IncrementalScoringResult with all candidates and changed invoices
+        """
+        return reconciliation_service.rescore_working_set(
+            tenant_id=tenant_id,
+            version=version,
+            top_n=top_n,
+            backend=backend,
+            min_partial_score=min_partial_score,
+            text_engine=text_engine,
+        )
+    
+    @strawberry.field
+    def invalidate_tenant_indexes(self, tenant_id: str) -> int:
+        """
+        Drop a tenant's cached records, indexes and results, e.g. after vendor changes.
+        
+        Args:
+            tenant_id: Tenant identifier
+            
+        Returns:
+            Number of cache entries dropped
+        """
+        return reconciliation_service.invalidate_tenant_indexes(tenant_id)
 
 
 # Create schema
@@ -1,11 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Callable
 import strawberry
 from datetime import datetime
 from decimal import Decimal
 from app.models.enums import InvoiceStatus, MatchStatus, Currency
 
 
-@strawberry.type
+@strawberry.input
 class InvoiceInput:
     """Input type for invoice data."""
     id: str
@@ -13,15 +13,17 @@ class InvoiceInput:
     invoice_date: Optional[str] = None
     description: str = ""
     vendor_name: str = ""
+    invoice_number: Optional[str] = None
 
 
-@strawberry.type
+@strawberry.input
 class TransactionInput:
     """Input type for transaction data."""
     id: str
     amount: float
     posted_at: str
     description: str
+    reference: Optional[str] = None
 
 
 @strawberry.type
@@ -34,14 +36,38 @@ class ScoreBreakdown:
     total: int
 
 
+@strawberry.input
+class ScoreBreakdownInput:
+    """Input type for a score breakdown."""
+    exact_amount: int
+    date_proximity: int
+    text_similarity: int
+    vendor_match: int
+    total: int
+
+
+@strawberry.input
+class AiExplanationRequest:
+    """Input type for explaining a scored invoice/transaction pair."""
+    invoice: InvoiceInput
+    transaction: TransactionInput
+    score: int
+    score_breakdown: ScoreBreakdownInput
+
+
 @strawberry.type
 class ReconciliationCandidate:
     """Reconciliation candidate with scoring details."""
     invoice_id: str
     transaction_id: str
     score: int
-    explanation: str
     score_breakdown: ScoreBreakdown
+    explainer: strawberry.Private[Callable[[], str]]
+    
+    @strawberry.field
+    def explanation(self) -> str:
+        """Human-readable explanation, only formatted when the field is selected."""
+        return self.explainer()
 
 
 @strawberry.type
@@ -53,6 +79,151 @@ class ScoringResult:
     duration_ms: int
 
 
+@strawberry.type
+class ScoringResultColumnar:
+    """Result of the scoring operation as parallel arrays, one element per candidate."""
+    invoice_ids: List[str]
+    transaction_ids: List[str]
+    scores: List[int]
+    exact_amount: List[int]
+    date_proximity: List[int]
+    text_similarity: List[int]
+    vendor_match: List[int]
+    processed_invoices: int
+    processed_transactions: int
+    duration_ms: int
+    explainers: strawberry.Private[List[Callable[[], str]]]
+    
+    @strawberry.field
+    def explanations(self) -> List[str]:
+        """Explanation of each candidate, only formatted when the field is selected."""
+        return [explainer() for explainer in self.explainers]
+
+
+@strawberry.type
+class ReconciliationJob:
+    """Progress and results so far of a background scoring job."""
+    id: str
+    tenant_id: str
+    status: str
+    total_invoices: int
+    processed_invoices: int
+    percent_complete: float
+    elapsed_ms: int
+    error: Optional[str]
+    expires_at: Optional[datetime]
+    loader: strawberry.Private[Callable[[], List[ReconciliationCandidate]]]
+    
+    @strawberry.field
+    def candidates(self) -> List[ReconciliationCandidate]:
+        """Candidates of the invoices processed so far, ranked as by scoreCandidates."""
+        return self.loader()
+
+
+@strawberry.type
+class ReconcileTenantResult:
+    """Result of reconciling a tenant directly from the database."""
+    tenant_id: str
+    processed_invoices: int
+    processed_transactions: int
+    candidates_written: int
+    candidates_removed: int
+    duration_ms: int
+
+
+@strawberry.type
+class AssignmentResult:
+    """Conflict-free one-to-one proposals chosen from the candidate graph."""
+    proposals: List[ReconciliationCandidate]
+    total_score: int
+    candidate_edges: int
+    components: int
+    exact_components: int
+    duration_ms: int
+
+
+@strawberry.type
+class BlockingPlanResult:
+    """Blocking plan applied before full scoring."""
+    tenant_id: str
+    keys: List[str]
+    match: str
+    full_scan_fallback: bool
+
+
+@strawberry.type
+class RecallAuditResult:
+    """Recall of a blocking plan measured against exhaustive scoring."""
+    tenant_id: str
+    plan: BlockingPlanResult
+    sampled_invoices: int
+    exhaustive_candidates: int
+    lost_candidates: int
+    recall: float
+    exhaustive_duration_ms: float
+    blocked_duration_ms: float
+    speedup: float
+
+
+@strawberry.type
+class WorkingSetResult:
+    """Version and size of a tenant's retained working set."""
+    tenant_id: str
+    version: str
+    invoices: int
+    transactions: int
+
+
+@strawberry.type
+class IncrementalScoringResult:
+    """Result of re-ranking a working set after deltas."""
+    tenant_id: str
+    version: str
+    candidates: List[ReconciliationCandidate]
+    changed_invoice_ids: List[str]
+    rescored_invoices: int
+    incremental: bool
+    duration_ms: int
+
+
+@strawberry.type
+class IndexCacheStats:
+    """Counters for the per-tenant prepared index cache."""
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+@strawberry.type
+class ResultCacheStats:
+    """Counters for the scoring result cache."""
+    entries: int
+    bytes: int
+    max_bytes: int
+    ttl_seconds: float
+    shared: bool
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+@strawberry.type
+class SimilarityMemoStats:
+    """Counters for the description-pair similarity memo."""
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    persistent: bool
+
+
 @strawberry.type
 class ExplanationResult:
     """AI explanation result."""
@@ -1,14 +1,42 @@
 import os
-from fastapi import FastAPI
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
 from strawberry.fastapi import GraphQLRouter
-from app.graphql.schema import schema
-from app.database import engine, init_db
+from app.graphql.schema import (
+    schema,
+    reconciliation_service,
+    scoring_scheduler,
+    scoring_flights,
+    score_candidates_shared,
+    reconciliation_jobs,
+)
+from app.database import engine, init_db, get_pool_stats
+from app.services.ingest import ARROW_AVAILABLE, ARROW_STREAM, NDJSON, read_arrow, read_ndjson
+from app.services.scheduler import SchedulerBusy
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Pick up background scoring jobs left unfinished by the last process,
+    and save the similarity memo for the next one.
+    """
+    reconciliation_jobs.resume()
+    yield
+    await asyncio.to_thread(reconciliation_service.similarity_memo.save)
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Invoice Reconciliation - Python Backend",
     description="Deterministic reconciliation engine with GraphQL API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Create GraphQL app
@@ -37,6 +65,141 @@ async def health():
     return {"status": "healthy", "service": "python-reconciliation"}
 
 
+@app.get("/db/pool")
+async def db_pool():
+    """Connection pool occupancy, saturation and checkout wait times."""
+    return get_pool_stats()
+
+
+@app.get("/scoring/queue")
+async def scoring_queue():
+    """Scoring thread occupancy, queue depth, rejected and coalesced requests."""
+    return {**scoring_scheduler.stats(), **scoring_flights.stats()}
+
+
+class ScoreStreamRequest(BaseModel):
+    """Request body for streaming candidate scoring."""
+    tenant_id: str
+    invoices: List[Dict[str, Any]]
+    transactions: List[Dict[str, Any]]
+    top_n: int = 5
+    backend: str = "python"
+    min_partial_score: int = 0
+    text_engine: Optional[str] = None
+    include_explanations: bool = True
+
+
+def candidate_row(candidate, include_explanations: bool) -> Dict[str, Any]:
+    """Serialize one candidate without its invoice id."""
+    row = {
+        "transaction_id": candidate.transaction_id,
+        "score": candidate.score,
+        "score_breakdown": {
+            "exact_amount": candidate.score_breakdown.exact_amount,
+            "date_proximity": candidate.score_breakdown.date_proximity,
+            "text_similarity": candidate.score_breakdown.text_similarity,
+            "vendor_match": candidate.score_breakdown.vendor_match,
+            "total": candidate.score_breakdown.total,
+        },
+    }
+    if include_explanations:
+        row["explanation"] = candidate.explanation()
+    return row
+
+
+def candidate_line(invoice_id: str, candidates, include_explanations: bool) -> str:
+    """Serialize one invoice's candidates as an NDJSON line."""
+    rows = [candidate_row(candidate, include_explanations) for candidate in candidates]
+    return json.dumps({"invoice_id": invoice_id, "candidates": rows}) + "\n"
+
+
+@app.post("/score/stream")
+def score_stream(request: ScoreStreamRequest):
+    """
+    Stream scored candidates as NDJSON.
+    
+    Writes one line per invoice, in input order, as soon as that invoice's
+    top-N candidates are known.
+    """
+    try:
+        results = reconciliation_service.iter_candidates(
+            tenant_id=request.tenant_id,
+            invoices=request.invoices,
+            transactions=request.transactions,
+            top_n=request.top_n,
+            backend=request.backend,
+            min_partial_score=request.min_partial_score,
+            text_engine=request.text_engine,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    return StreamingResponse(
+        (
+            candidate_line(invoice_id, candidates, request.include_explanations)
+            for invoice_id, candidates in results
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/score/batch")
+async def score_batch(
+    request: Request,
+    tenant_id: str,
+    top_n: int = 5,
+    backend: str = "python",
+    min_partial_score: int = 0,
+    text_engine: Optional[str] = None,
+    include_explanations: bool = True,
+):
+    """
+    Score a bulk upload of invoices and transactions.
+    
+    The body is NDJSON or an Arrow IPC stream and is read straight into
+    the scorer's dictionaries, without building a GraphQL or pydantic
+    object per record. Responds with the fields of ScoringResult.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == ARROW_STREAM and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=415, detail="Arrow uploads require pyarrow on the server")
+    if content_type not in (NDJSON, ARROW_STREAM):
+        raise HTTPException(status_code=415, detail=f"Content-Type must be {NDJSON} or {ARROW_STREAM}")
+    
+    try:
+        if content_type == NDJSON:
+            batch = await read_ndjson(request.stream())
+        else:
+            batch = await asyncio.to_thread(read_arrow, await request.body())
+        
+        result = await score_candidates_shared(
+            tenant_id,
+            invoices=batch.invoices,
+            transactions=batch.transactions,
+            top_n=top_n,
+            backend=backend,
+            min_partial_score=min_partial_score,
+            text_engine=text_engine,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except SchedulerBusy as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(exc.retry_after)}
+        )
+    
+    # Rows are plain JSON types already, so skip FastAPI's encoder
+    return JSONResponse({
+        "candidates": [
+            {"invoice_id": candidate.invoice_id, **candidate_row(candidate, include_explanations)}
+            for candidate in result.candidates
+        ],
+        "processed_invoices": result.processed_invoices,
+        "processed_transactions": result.processed_transactions,
+        "duration_ms": result.duration_ms,
+    })
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
-from sqlalchemy import String, DateTime, Numeric, Text, ForeignKey, Enum
+from sqlalchemy import String, DateTime, Numeric, Text, ForeignKey, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 from app.models.enums import Currency
@@ -11,6 +11,10 @@ class BankTransaction(Base):
     """Bank transaction model for imported bank data."""
     
     __tablename__ = "bank_transactions"
+    __table_args__ = (
+        Index("bank_transactions_tenant_posted_at_idx", "tenant_id", "posted_at"),
+        Index("bank_transactions_tenant_amount_idx", "tenant_id", "amount"),
+    )
     
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     tenant_id: Mapped[str] = mapped_column(
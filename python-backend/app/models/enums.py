@@ -1,4 +1,10 @@
 import enum
+from typing import List
+
+
+def enum_values(enum_class) -> List[str]:
+    """Database labels of an enum: its values, as created by the NestJS migrations."""
+    return [member.value for member in enum_class]
 
 
 class InvoiceStatus(str, enum.Enum):
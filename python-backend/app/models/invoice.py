@@ -1,16 +1,26 @@
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
-from sqlalchemy import String, DateTime, Numeric, Text, ForeignKey, Enum
+from sqlalchemy import String, DateTime, Numeric, Text, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
-from app.models.enums import InvoiceStatus, Currency
+from app.models.enums import InvoiceStatus, Currency, enum_values
 
 
 class Invoice(Base):
     """Invoice model for tenant-scoped invoices."""
     
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Only open invoices are reconciled, so only they are indexed
+        Index(
+            "invoices_tenant_open_idx",
+            "tenant_id",
+            "status",
+            postgresql_where=text("status = 'open'"),
+            sqlite_where=text("status = 'open'"),
+        ),
+    )
     
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     tenant_id: Mapped[str] = mapped_column(
@@ -28,7 +38,7 @@ class Invoice(Base):
     due_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     status: Mapped[InvoiceStatus] = mapped_column(
-        Enum(InvoiceStatus, name="invoice_status"), nullable=False, default=InvoiceStatus.OPEN
+        Enum(InvoiceStatus, name="invoice_status", values_callable=enum_values), nullable=False, default=InvoiceStatus.OPEN
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
@@ -1,15 +1,23 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, ForeignKey, Enum, Integer, Text
+from sqlalchemy import String, DateTime, ForeignKey, Enum, Integer, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
-from app.models.enums import MatchStatus
+from app.models.enums import MatchStatus, enum_values
 
 
 class MatchCandidate(Base):
     """Match candidate model for invoice-transaction reconciliation."""
     
     __tablename__ = "match_candidates"
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id",
+            "invoice_id",
+            "bank_transaction_id",
+            name="match_candidates_tenant_invoice_transaction_unique",
+        ),
+    )
     
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     tenant_id: Mapped[str] = mapped_column(
@@ -23,7 +31,7 @@ class MatchCandidate(Base):
     )
     score: Mapped[int] = mapped_column(Integer, nullable=False)
     status: Mapped[MatchStatus] = mapped_column(
-        Enum(MatchStatus, name="match_status"), nullable=False, default=MatchStatus.PROPOSED
+        Enum(MatchStatus, name="match_status", values_callable=enum_values), nullable=False, default=MatchStatus.PROPOSED
     )
     explanation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
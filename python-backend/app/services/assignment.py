@@ -0,0 +1,174 @@
+from typing import List, Dict, Hashable, Tuple
+
+# (invoice id, transaction id, score)
+Edge = Tuple[Hashable, Hashable, int]
+
+# Components whose invoice x transaction grid is at most this size are
+# solved exactly; larger ones use the greedy solver
+EXACT_MAX_CELLS = 2500
+
+
+class AssignmentStats:
+    """Summary of one assignment run."""
+
+    __slots__ = ("components", "exact_components", "total_score")
+
+    def __init__(self):
+        self.components = 0
+        self.exact_components = 0
+        self.total_score = 0
+
+
+def connected_components(edges: List[Edge]) -> List[List[int]]:
+    """Group edge indices by connected component of the invoice/transaction graph."""
+    parent: Dict[Tuple[int, Hashable], Tuple[int, Hashable]] = {}
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for invoice_id, transaction_id, _ in edges:
+        # Invoice and transaction ids live in separate namespaces
+        left, right = (0, invoice_id), (1, transaction_id)
+        parent.setdefault(left, left)
+        parent.setdefault(right, right)
+        left_root, right_root = find(left), find(right)
+        if left_root != right_root:
+            parent[right_root] = left_root
+
+    components: Dict[Tuple[int, Hashable], List[int]] = {}
+    for index, (invoice_id, _, _) in enumerate(edges):
+        components.setdefault(find((0, invoice_id)), []).append(index)
+    return list(components.values())
+
+
+def solve_greedy(edges: List[Edge], indices: List[int]) -> List[int]:
+    """Take edges best-first, skipping any whose invoice or transaction is taken."""
+    ordered = sorted(
+        indices, key=lambda i: (-edges[i][2], str(edges[i][0]), str(edges[i][1]))
+    )
+    used_invoices, used_transactions = set(), set()
+    chosen = []
+    for index in ordered:
+        invoice_id, transaction_id, _ = edges[index]
+        if invoice_id in used_invoices or transaction_id in used_transactions:
+            continue
+        used_invoices.add(invoice_id)
+        used_transactions.add(transaction_id)
+        chosen.append(index)
+    return chosen
+
+
+def solve_exact(edges: List[Edge], indices: List[int]) -> List[int]:
+    """Maximum-total-score matching of one component (Hungarian algorithm)."""
+    invoices = sorted({edges[i][0] for i in indices}, key=str)
+    transactions = sorted({edges[i][1] for i in indices}, key=str)
+    transpose = len(invoices) > len(transactions)
+    rows, cols = (transactions, invoices) if transpose else (invoices, transactions)
+    row_of = {node: r for r, node in enumerate(rows)}
+    col_of = {node: c for c, node in enumerate(cols)}
+
+    # Missing edges cost nothing, so a row assigned to one is left unmatched
+    cost = [[0] * len(cols) for _ in rows]
+    edge_at: Dict[Tuple[int, int], int] = {}
+    for index in indices:
+        invoice_id, transaction_id, score = edges[index]
+        row, col = (transaction_id, invoice_id) if transpose else (invoice_id, transaction_id)
+        cell = (row_of[row], col_of[col])
+        if cell not in edge_at or score > edges[edge_at[cell]][2]:
+            cost[cell[0]][cell[1]] = -score
+            edge_at[cell] = index
+
+    chosen = []
+    for row, col in enumerate(_hungarian(cost)):
+        index = edge_at.get((row, col))
+        if index is not None:
+            chosen.append(index)
+    return chosen
+
+
+def assign(edges: List[Edge], exact_max_cells: int = EXACT_MAX_CELLS) -> Tuple[List[int], AssignmentStats]:
+    """
+    Choose a conflict-free subset of edges with a high total score.
+
+    The graph is split into connected components, each solved on its own:
+    exactly when small, greedily otherwise.
+
+    Returns:
+        Chosen edge indices in input order, and run statistics
+    """
+    stats = AssignmentStats()
+    chosen: List[int] = []
+
+    for indices in connected_components(edges):
+        stats.components += 1
+        invoices = len({edges[i][0] for i in indices})
+        transactions = len({edges[i][1] for i in indices})
+
+        if invoices == 1 or transactions == 1:
+            # A star is solved by its best edge; greedy picks exactly that
+            chosen.extend(solve_greedy(edges, indices))
+            stats.exact_components += 1
+        elif invoices * transactions <= exact_max_cells:
+            chosen.extend(solve_exact(edges, indices))
+            stats.exact_components += 1
+        else:
+            chosen.extend(solve_greedy(edges, indices))
+
+    chosen.sort()
+    stats.total_score = sum(edges[i][2] for i in chosen)
+    return chosen, stats
+
+
+def _hungarian(cost: List[List[int]]) -> List[int]:
+    """Column assigned to each row minimising total cost; requires rows <= columns."""
+    n, m = len(cost), len(cost[0])
+    infinity = float("inf")
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    match = [0] * (m + 1)  # row (1-based) matched to each column, 0 if none
+    way = [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        match[0] = row
+        col0 = 0
+        min_slack = [infinity] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[col0] = True
+            row0 = match[col0]
+            costs = cost[row0 - 1]
+            delta = infinity
+            col1 = 0
+            for col in range(1, m + 1):
+                if not used[col]:
+                    slack = costs[col - 1] - u[row0] - v[col]
+                    if slack < min_slack[col]:
+                        min_slack[col] = slack
+                        way[col] = col0
+                    if min_slack[col] < delta:
+                        delta = min_slack[col]
+                        col1 = col
+            for col in range(m + 1):
+                if used[col]:
+                    u[match[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_slack[col] -= delta
+            col0 = col1
+            if match[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+
+    assignment = [-1] * n
+    for col in range(1, m + 1):
+        if match[col]:
+            assignment[match[col] - 1] = col - 1
+    return assignment
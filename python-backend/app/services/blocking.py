@@ -0,0 +1,194 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Set, Tuple
+from app.services.candidate_index import TransactionAmountIndex
+from app.services.features import InvoiceRecord, TransactionRecord
+
+# Cheap keys a blocking plan can combine
+BLOCKING_KEYS = ("amount", "date", "currency", "vendor")
+BLOCKING_MATCH_MODES = ("all", "any")
+
+# Widest tier rewarded by date proximity scoring
+DATE_WINDOW_DAYS = 7
+
+
+@dataclass(frozen=True)
+class BlockingPlan:
+    """
+    Which cheap keys a pair must share before it is fully scored.
+
+    With match="all" a pair must pass every key; with match="any" passing one
+    key is enough. A plan without keys scores every pair (exhaustive).
+    """
+    keys: Tuple[str, ...] = ("amount",)
+    match: str = "all"
+    full_scan_fallback: bool = False
+
+    def __post_init__(self):
+        object.__setattr__(self, "keys", tuple(self.keys))
+
+        unknown = [key for key in self.keys if key not in BLOCKING_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown blocking keys: {', '.join(unknown)}")
+
+        if len(set(self.keys)) != len(self.keys):
+            raise ValueError("Blocking keys must not repeat")
+
+        if self.match not in BLOCKING_MATCH_MODES:
+            raise ValueError(f"Blocking match mode must be one of: {', '.join(BLOCKING_MATCH_MODES)}")
+
+    @property
+    def is_exhaustive(self) -> bool:
+        return not self.keys
+
+
+DEFAULT_BLOCKING_PLAN = BlockingPlan()
+EXHAUSTIVE_PLAN = BlockingPlan(keys=())
+
+
+class BlockingPlanner:
+    """
+    Candidate generator for one scoring request.
+
+    Builds one lookup structure per key in the plan over the transaction
+    records, then returns, per invoice, the positions of transactions that
+    pass the plan. Positions are in input order so tie ordering stays stable.
+    """
+
+    def __init__(self, service, transactions: List[TransactionRecord], plan: BlockingPlan):
+        self.service = service
+        self.transactions = transactions
+        self.plan = plan
+
+        if "amount" in plan.keys:
+            self._amount_index = TransactionAmountIndex(
+                transactions, service.AMOUNT_TOLERANCE_PERCENT
+            )
+
+        if "date" in plan.keys:
+            self._build_date_index()
+
+        if "currency" in plan.keys:
+            self._build_currency_index()
+
+        if "vendor" in plan.keys:
+            self._build_vendor_index()
+
+    def candidates(self, invoice: InvoiceRecord) -> List[int]:
+        """Return positions of transactions to fully score against an invoice."""
+        if self.plan.is_exhaustive:
+            return list(range(len(self.transactions)))
+
+        if self.plan.match == "all":
+            # Generate from the first key and filter through the rest
+            first, rest = self.plan.keys[0], self.plan.keys[1:]
+            positions = [
+                position
+                for position in self._key_candidates(first, invoice)
+                if all(self._key_accepts(key, invoice, self.transactions[position]) for key in rest)
+            ]
+        else:
+            merged: Set[int] = set()
+            for key in self.plan.keys:
+                merged.update(self._key_candidates(key, invoice))
+            positions = sorted(merged)
+
+        if not positions and self.plan.full_scan_fallback:
+            return list(range(len(self.transactions)))
+
+        return positions
+
+    def _key_candidates(self, key: str, invoice: InvoiceRecord) -> List[int]:
+        if key == "amount":
+            return [
+                position
+                for position in self._amount_index.neighbours(invoice.amount)
+                if self._amount_accepts(invoice, self.transactions[position])
+            ]
+
+        if key == "date":
+            return self._date_candidates(invoice)
+
+        if key == "currency":
+            return self._currency_candidates(invoice)
+
+        return self._vendor_candidates(invoice)
+
+    def _key_accepts(self, key: str, invoice: InvoiceRecord, transaction: TransactionRecord) -> bool:
+        if key == "amount":
+            return self._amount_accepts(invoice, transaction)
+
+        if key == "date":
+            return self._date_accepts(invoice, transaction)
+
+        if key == "currency":
+            return (
+                invoice.currency is None
+                or transaction.currency is None
+                or invoice.currency == transaction.currency
+            )
+
+        return not invoice.vendor_tokens.isdisjoint(transaction.tokens)
+
+    # Amount band: the pair earns an exact or tolerance amount score
+
+    def _amount_accepts(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> bool:
+        return self.service._score_amount_match(invoice, transaction) > 0
+
+    # Posted-at window: the pair earns a date proximity score
+
+    def _build_date_index(self):
+        entries = sorted(
+            (transaction.day, position)
+            for position, transaction in enumerate(self.transactions)
+            if transaction.day is not None
+        )
+        self._days = [day for day, _ in entries]
+        self._date_positions = [position for _, position in entries]
+
+    def _date_candidates(self, invoice: InvoiceRecord) -> List[int]:
+        if invoice.day is None:
+            return []
+
+        # Whole days are widened by one to cover time of day
+        start = bisect_left(self._days, invoice.day - DATE_WINDOW_DAYS - 1)
+        end = bisect_right(self._days, invoice.day + DATE_WINDOW_DAYS + 1)
+
+        return sorted(
+            position
+            for position in self._date_positions[start:end]
+            if self._date_accepts(invoice, self.transactions[position])
+        )
+
+    def _date_accepts(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> bool:
+        return self.service._score_date_proximity(invoice, transaction) > 0
+
+    # Currency: equal currencies, or a missing currency on either side
+
+    def _build_currency_index(self):
+        self._currency_positions: Dict[Optional[str], List[int]] = {}
+        for position, transaction in enumerate(self.transactions):
+            self._currency_positions.setdefault(transaction.currency, []).append(position)
+
+    def _currency_candidates(self, invoice: InvoiceRecord) -> List[int]:
+        if invoice.currency is None:
+            return list(range(len(self.transactions)))
+
+        return sorted(
+            self._currency_positions.get(invoice.currency, [])
+            + self._currency_positions.get(None, [])
+        )
+
+    # Vendor token: the vendor name shares a token with the description
+
+    def _build_vendor_index(self):
+        self._token_positions: Dict[str, List[int]] = {}
+        for position, transaction in enumerate(self.transactions):
+            for token in transaction.tokens:
+                self._token_positions.setdefault(token, []).append(position)
+
+    def _vendor_candidates(self, invoice: InvoiceRecord) -> List[int]:
+        merged: Set[int] = set()
+        for token in invoice.vendor_tokens:
+            merged.update(self._token_positions.get(token, []))
+        return sorted(merged)
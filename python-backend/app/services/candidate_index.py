@@ -0,0 +1,82 @@
+import math
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional
+from app.services.features import TransactionRecord, to_cents
+
+
+class TransactionAmountIndex:
+    """
+    Transactions sorted by integer-cents amount.
+
+    Built once per scoring request so that each invoice only looks at the
+    transactions whose amount can earn an exact or tolerance amount score,
+    instead of every transaction in the batch.
+    """
+
+    def __init__(self, transactions: List[TransactionRecord], tolerance_percent: float):
+        self.tolerance_percent = tolerance_percent
+
+        # Positions of every transaction with a parseable amount (used for
+        # non-positive invoice amounts, where the tolerance check is unbounded)
+        self._valid_positions: List[int] = []
+
+        # Hash lookup for exact cents matches
+        self._exact: Dict[int, List[int]] = {}
+
+        entries = []
+        for position, transaction in enumerate(transactions):
+            if transaction.amount is None:
+                continue
+
+            self._valid_positions.append(position)
+            if transaction.amount_cents is None:
+                continue
+
+            entries.append((transaction.amount_cents, position))
+            self._exact.setdefault(transaction.amount_cents, []).append(position)
+
+        entries.sort()
+        self._cents = [cents for cents, _ in entries]
+        self._positions = [position for _, position in entries]
+
+    def __len__(self) -> int:
+        return len(self._valid_positions)
+
+    def exact_matches(self, cents: int) -> List[int]:
+        """Return positions of transactions with exactly this cents amount."""
+        return self._exact.get(cents, [])
+
+    def neighbours(self, amount: Optional[float]) -> List[int]:
+        """
+        Return positions of transactions near an invoice amount.
+
+        The cents window is one cent wider than the tolerance band on each
+        side, so it is a superset of the pairs the scorer rewards for amount.
+        Positions are returned in input order to keep tie ordering stable.
+        """
+        if amount is None or math.isnan(amount):
+            return []
+
+        if amount <= 0:
+            # Relative tolerance against a non-positive amount is unbounded
+            return list(self._valid_positions)
+
+        if math.isinf(amount):
+            return []
+
+        cents = to_cents(amount)
+        low = math.floor(amount * (1 - self.tolerance_percent) * 100) - 1
+        high = math.ceil(amount * (1 + self.tolerance_percent) * 100) + 1
+
+        start = bisect_left(self._cents, low)
+        exact_start = bisect_left(self._cents, cents)
+        exact_end = bisect_right(self._cents, cents)
+        end = bisect_right(self._cents, high)
+
+        positions = (
+            self._positions[start:exact_start]
+            + self.exact_matches(cents)
+            + self._positions[exact_end:end]
+        )
+        positions.sort()
+        return positions
@@ -0,0 +1,158 @@
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, FrozenSet
+
+# Patterns used to normalize descriptions and vendor names
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\\w\\s]')
+WHITESPACE_PATTERN = re.compile(r'\\s+')
+
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y",
+]
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+DAY_MICROSECONDS = 86_400_000_000
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """Parse an amount the same way the scorer does, returning None when invalid."""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def to_cents(amount: float) -> int:
+    """Convert a finite amount to integer cents."""
+    return int(round(amount * 100))
+
+
+def parse_date(date_str: str) -> Optional[datetime]:
+    """Parse date string to datetime object."""
+    if not date_str:
+        return None
+
+    try:
+        # Try ISO format first
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+
+    # Try other common formats
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    return None
+
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text for comparison."""
+    if not text:
+        return ""
+
+    # Convert to lowercase and remove special characters
+    cleaned = SPECIAL_CHARS_PATTERN.sub(' ', text.lower())
+
+    # Remove extra whitespace
+    cleaned = WHITESPACE_PATTERN.sub(' ', cleaned).strip()
+
+    return cleaned
+
+
+def normalize_currency(value: Any) -> Optional[str]:
+    """Normalize a currency code or enum, returning None when missing."""
+    if not value:
+        return None
+    return str(getattr(value, "value", value)).upper()
+
+
+class _DatedRecord:
+    """Shared amount and date derivation for scoring records."""
+
+    __slots__ = ("id", "source", "amount", "amount_cents", "date_us", "date_aware", "day", "currency")
+
+    def _set_amount(self, value: Any):
+        self.amount = parse_amount(value)
+        self.amount_cents = (
+            to_cents(self.amount)
+            if self.amount is not None and math.isfinite(self.amount)
+            else None
+        )
+
+    def _set_date(self, value: Any):
+        try:
+            parsed = parse_date(value)
+        except (ValueError, TypeError):
+            parsed = None
+
+        if parsed is None:
+            self.date_us = None
+            self.date_aware = False
+            self.day = None
+            return
+
+        # Microseconds since the epoch keep timedelta.days semantics exact;
+        # aware dates are measured in UTC, naive ones as-is
+        self.date_aware = parsed.utcoffset() is not None
+        epoch = EPOCH_UTC if self.date_aware else EPOCH
+        self.date_us = (parsed - epoch) // MICROSECOND
+        self.day = self.date_us // DAY_MICROSECONDS
+
+
+class InvoiceRecord(_DatedRecord):
+    """Invoice fields derived once per request for the scoring loop."""
+
+    __slots__ = ("description", "tokens", "vendor", "vendor_tokens")
+
+    def __init__(self, invoice: Dict[str, Any]):
+        self.id = invoice["id"]
+        self.source = invoice
+        self._set_amount(invoice.get("amount"))
+        self._set_date(invoice.get("invoice_date"))
+        self.currency = normalize_currency(invoice.get("currency"))
+
+        description = invoice.get("description", "")
+        self.description = clean_text(description) if description else ""
+        self.tokens: FrozenSet[str] = frozenset(self.description.split())
+
+        # None when the invoice has no vendor name at all
+        vendor_name = invoice.get("vendor_name", "")
+        self.vendor = clean_text(vendor_name) if vendor_name else None
+        self.vendor_tokens: FrozenSet[str] = frozenset((self.vendor or "").split())
+
+
+class TransactionRecord(_DatedRecord):
+    """Transaction fields derived once per request for the scoring loop."""
+
+    __slots__ = ("description", "tokens", "has_description")
+
+    def __init__(self, transaction: Dict[str, Any]):
+        self.id = transaction["id"]
+        self.source = transaction
+        self._set_amount(transaction.get("amount"))
+        self._set_date(transaction.get("posted_at"))
+        self.currency = normalize_currency(transaction.get("currency"))
+
+        description = transaction.get("description", "")
+        self.has_description = bool(description)
+        self.description = clean_text(description) if description else ""
+        self.tokens: FrozenSet[str] = frozenset(self.description.split())
+
+
+def prepare_invoices(invoices: List[Dict[str, Any]]) -> List[InvoiceRecord]:
+    """Derive scoring records for a batch of invoices."""
+    return [InvoiceRecord(invoice) for invoice in invoices]
+
+
+def prepare_transactions(transactions: List[Dict[str, Any]]) -> List[TransactionRecord]:
+    """Derive scoring records for a batch of transactions."""
+    return [TransactionRecord(transaction) for transaction in transactions]
@@ -0,0 +1,108 @@
+import heapq
+from typing import List, Dict, Callable, Iterable, Iterator, Optional, Set, Tuple
+from app.services.features import InvoiceRecord, TransactionRecord
+from app.services.ranking import RankKey
+
+# Text engines whose pair scores do not depend on the rest of the batch.
+# TF-IDF weights change with every new description, so it always re-ranks fully.
+INCREMENTAL_TEXT_ENGINES = ("sequence",)
+
+# (rank key, transaction id, score breakdown)
+RankedEntry = Tuple[RankKey, object, Dict[str, int]]
+
+# Scores invoices against transactions, yielding each invoice id with its top-N entries
+RankFunction = Callable[
+    [List[InvoiceRecord], List[TransactionRecord]], Iterable[Tuple[str, List[RankedEntry]]]
+]
+
+
+class IncrementalRanker:
+    """
+    Each invoice's current top-N for a working set, patched as records change.
+
+    Unchanged invoices are only scored against new or changed transactions
+    and the results merged into their lists. Invoices that are new, changed,
+    or whose list referenced a changed or removed transaction are re-ranked
+    against every transaction, since their replacement candidates are unknown.
+    """
+
+    def __init__(self, settings: Tuple, top_n: int):
+        # Scoring options the lists were built with; any change forces a rebuild
+        self.settings = settings
+        self.top_n = top_n
+        self.top: Dict[str, List[RankedEntry]] = {}
+
+    def update(
+        self,
+        rank: RankFunction,
+        invoices: List[InvoiceRecord],
+        transactions: List[TransactionRecord],
+        changed_invoices: Set[str],
+        changed_transactions: Set[str],
+        rebuild: bool = False,
+    ) -> Tuple[Set[str], int]:
+        """
+        Bring the lists up to date with the current records.
+
+        Args:
+            rank: Scoring callback for a subset of invoices and transactions
+            invoices: Every current invoice
+            transactions: Every current transaction
+            changed_invoices: Ids of invoices upserted or removed since the last update
+            changed_transactions: Ids of transactions upserted or removed since the last update
+            rebuild: Re-rank every invoice
+
+        Returns:
+            Ids of invoices whose candidate list changed, and the number of
+            invoices re-ranked against every transaction
+        """
+        invoice_ids = {invoice.id for invoice in invoices}
+        changed = {invoice_id for invoice_id in self.top if invoice_id not in invoice_ids}
+        for invoice_id in changed:
+            del self.top[invoice_id]
+
+        if rebuild:
+            full = invoice_ids
+        else:
+            full = {i for i in invoice_ids if i in changed_invoices or i not in self.top}
+            full |= {
+                invoice_id
+                for invoice_id, entries in self.top.items()
+                if any(transaction_id in changed_transactions for _, transaction_id, _ in entries)
+            }
+
+        updated = dict(rank([invoice for invoice in invoices if invoice.id in full], transactions))
+
+        touched = [t for t in transactions if t.id in changed_transactions]
+        unchanged = [invoice for invoice in invoices if invoice.id not in full]
+        if touched and unchanged:
+            for invoice_id, entries in rank(unchanged, touched):
+                if entries:
+                    updated[invoice_id] = heapq.nsmallest(
+                        self.top_n, self.top[invoice_id] + entries, key=lambda entry: entry[0]
+                    )
+
+        for invoice_id, entries in updated.items():
+            if self.top.get(invoice_id) != entries:
+                changed.add(invoice_id)
+            self.top[invoice_id] = entries
+
+        return changed, len(full)
+
+    def ranked(self, invoices: List[InvoiceRecord]) -> Iterator[Tuple[RankKey, str, object, Dict[str, int]]]:
+        """All current entries in global rank order, as (key, invoice id, transaction id, breakdown)."""
+        runs = (
+            [(key, invoice.id, transaction_id, score_result) for key, transaction_id, score_result in self.top[invoice.id]]
+            for invoice in invoices
+        )
+        return heapq.merge(*runs, key=lambda entry: entry[0])
+
+
+def ranker_settings(
+    top_n: int, plan, backend: str, min_partial_score: int, text_engine: str
+) -> Optional[Tuple]:
+    """Settings tuple for an incremental ranker, or None if these options cannot be patched."""
+    if text_engine not in INCREMENTAL_TEXT_ENGINES or plan.full_scan_fallback:
+        # Fallback scans depend on whether any transaction passes blocking
+        return None
+    return (top_n, plan, backend, min_partial_score, text_engine)
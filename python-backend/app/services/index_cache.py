@@ -0,0 +1,208 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from app.services.blocking import BlockingPlan, BlockingPlanner
+from app.services.features import InvoiceRecord, TransactionRecord, prepare_invoices, prepare_transactions
+from app.services.vendor_index import VendorAutomaton, VendorMentionIndex
+
+# Memory budget for cached tenant indexes
+INDEX_CACHE_BYTES = int(os.getenv("SCORING_INDEX_CACHE_MB", "256")) * 1024 * 1024
+
+# Rough per-record footprint of a prepared record plus its index entries;
+# descriptions and input dictionaries are counted separately
+RECORD_BYTES = 600
+TOKEN_BYTES = 60
+
+# Rough per-record footprint of each index attached after preparation
+INDEX_BYTES = 150
+
+
+def fingerprint(records: List[Dict[str, Any]]) -> str:
+    """Content fingerprint of a batch of input records, order included."""
+    return hashlib.blake2b(repr(records).encode(), digest_size=16).hexdigest()
+
+
+def estimate_bytes(records: List) -> int:
+    """Approximate memory held by prepared records, their input dictionaries and token sets."""
+    return sum(
+        RECORD_BYTES
+        + 2 * len(record.description)
+        + TOKEN_BYTES * len(record.tokens)
+        + sys.getsizeof(record.source)
+        + sum(sys.getsizeof(value) for value in record.source.values())
+        for record in records
+    )
+
+
+def estimate_scorer_bytes(scorer, records: List) -> int:
+    """Approximate memory held by a NumPy scorer: its arrays plus any vendor index."""
+    arrays = sum(value.nbytes for value in vars(scorer).values() if hasattr(value, "nbytes"))
+    return arrays + INDEX_BYTES * len(records)
+
+
+class PreparedInvoices:
+    """Cached scoring records for a batch of invoices."""
+
+    def __init__(self, invoices: List[Dict[str, Any]]):
+        self.records: List[InvoiceRecord] = prepare_invoices(invoices)
+        self.size = estimate_bytes(self.records)
+
+
+class PreparedTransactions:
+    """
+    Cached scoring records for a batch of transactions, with the indexes built over them.
+
+    Indexes are built on first use and reused by later requests for the same
+    content. They are only read while scoring, so requests can share them.
+    """
+
+    def __init__(self, transactions: List[Dict[str, Any]]):
+        self.records: List[TransactionRecord] = prepare_transactions(transactions)
+        self.size = estimate_bytes(self.records)
+        self._planners: Dict[BlockingPlan, BlockingPlanner] = {}
+        self._scorers: Dict[BlockingPlan, Any] = {}
+        self._vendor_index: Optional[VendorMentionIndex] = None
+        # Cache holding this entry, told when attached indexes grow it
+        self.owner: Optional["TenantIndexCache"] = None
+
+    def planner(self, service, plan: BlockingPlan) -> BlockingPlanner:
+        """Blocking planner over these transactions."""
+        planner = self._planners.get(plan)
+        if planner is None:
+            built = BlockingPlanner(service, self.records, plan)
+            planner = self._planners.setdefault(plan, built)
+            if planner is built:
+                self._grow(INDEX_BYTES * len(self.records) * max(1, len(plan.keys)))
+        return planner
+
+    def vectorized(self, service, plan: BlockingPlan):
+        """NumPy scorer over these transactions."""
+        scorer = self._scorers.get(plan)
+        if scorer is None:
+            from app.services.vectorized import VectorizedScorer
+
+            built = VectorizedScorer(service, self.records, plan)
+            scorer = self._scorers.setdefault(plan, built)
+            if scorer is built:
+                self._grow(estimate_scorer_bytes(built, self.records))
+        return scorer
+
+    def vendor_index(self, automaton: VendorAutomaton) -> VendorMentionIndex:
+        """Vendor mentions of these transactions for the given automaton."""
+        index = self._vendor_index
+        if index is None or index.automaton is not automaton:
+            # A replaced index is dropped, so only the first one adds to the size
+            grow = index is None
+            index = VendorMentionIndex(automaton, self.records)
+            self._vendor_index = index
+            if grow:
+                self._grow(INDEX_BYTES * len(self.records))
+        return index
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pool workers get the records and indexes, not the cache and its lock
+        state = self.__dict__.copy()
+        state["owner"] = None
+        return state
+
+    def _grow(self, extra: int):
+        if self.owner is not None:
+            self.owner.resize(self, extra)
+        else:
+            self.size += extra
+
+
+class TenantIndexCache:
+    """
+    Process-wide LRU cache of prepared tenant records and indexes.
+
+    Entries are keyed by tenant, record kind and content fingerprint, so a
+    changed batch never hits a stale entry. The least recently used entries
+    are evicted once the estimated size exceeds the memory budget.
+    """
+
+    def __init__(self, max_bytes: int = INDEX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invoices(
+        self, tenant_id: str, invoices: List[Dict[str, Any]], version: Optional[str] = None
+    ) -> PreparedInvoices:
+        """
+        Prepared invoices, from the cache when possible.
+
+        Callers that know a cheaper version stamp for the batch (such as the
+        latest updated_at) can pass it instead of hashing the content.
+        """
+        return self._get(tenant_id, "invoices", invoices, PreparedInvoices, version)
+
+    def transactions(
+        self, tenant_id: str, transactions: List[Dict[str, Any]], version: Optional[str] = None
+    ) -> PreparedTransactions:
+        """Prepared transactions, from the cache when possible."""
+        return self._get(tenant_id, "transactions", transactions, PreparedTransactions, version)
+
+    def invalidate(self, tenant_id: str) -> int:
+        """Drop every entry for a tenant; returns the number dropped."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == tenant_id]
+            for key in keys:
+                self.bytes -= self._entries.pop(key).size
+            return len(keys)
+
+    def resize(self, entry, extra: int):
+        """Account for memory an entry gained after it was cached, evicting if over budget."""
+        with self._lock:
+            entry.size += extra
+            if any(cached is entry for cached in self._entries.values()):
+                self.bytes += extra
+                self._evict()
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def _get(self, tenant_id: str, kind: str, records: List[Dict[str, Any]], build, version: Optional[str]):
+        key = (tenant_id, kind, fingerprint(records) if version is None else f"v:{version}")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Built outside the lock; a concurrent miss for the same key just builds twice
+        entry = build(records)
+        if entry.size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self.bytes += entry.size
+                entry.owner = self
+            self._entries.move_to_end(key)
+            cached = self._entries[key]
+            self._evict()
+            return cached
+
+    def _evict(self):
+        # Caller holds the lock
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
@@ -0,0 +1,127 @@
+import json
+from datetime import date
+from typing import List, Dict, Any, AsyncIterator
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # Arrow ingestion is optional
+    pa = None
+
+# Content types accepted for bulk scoring batches
+NDJSON = "application/x-ndjson"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+ARROW_AVAILABLE = pa is not None
+
+# Fields read per record type; the same dictionaries the GraphQL inputs become
+RECORD_FIELDS = {
+    "invoice": ("id", "amount", "invoice_date", "description", "vendor_name", "invoice_number"),
+    "transaction": ("id", "amount", "posted_at", "description", "reference"),
+}
+
+
+class ScoringBatch:
+    """Invoice and transaction dictionaries read from a bulk upload."""
+
+    __slots__ = ("invoices", "transactions")
+
+    def __init__(self):
+        self.invoices: List[Dict[str, Any]] = []
+        self.transactions: List[Dict[str, Any]] = []
+
+    def add(self, kind: Any, values: Dict[str, Any], where: str):
+        """Add one record of the given type ("invoice" or "transaction")."""
+        fields = RECORD_FIELDS.get(kind) if isinstance(kind, str) else None
+        if fields is None:
+            raise ValueError(f"{where}: type must be \"invoice\" or \"transaction\"")
+
+        # Null fields are left out, as when a client omits them
+        record = {field: values[field] for field in fields if values.get(field) is not None}
+        if "id" not in record:
+            raise ValueError(f"{where}: id is required")
+
+        if kind == "invoice":
+            self.invoices.append(record)
+        else:
+            self.transactions.append(record)
+
+
+async def read_ndjson(chunks: AsyncIterator[bytes]) -> ScoringBatch:
+    """
+    Read a batch from newline-delimited JSON as it arrives.
+
+    Each non-blank line is one object with a "type" of "invoice" or
+    "transaction" and that record's fields. Lines are decoded as soon as
+    they are complete, so only one partial line is ever buffered.
+    """
+    batch = ScoringBatch()
+    pending = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            line_number += 1
+            _add_line(batch, line, line_number)
+
+    if pending:
+        _add_line(batch, pending, line_number + 1)
+    return batch
+
+
+def read_arrow(data: bytes) -> ScoringBatch:
+    """
+    Read a batch from an Arrow IPC stream.
+
+    The stream has a string "type" column plus the union of the invoice
+    and transaction columns, null where a field does not apply. Batches are
+    converted column by column, and dates and timestamps become ISO
+    strings as the scorer expects.
+    """
+    if pa is None:
+        raise RuntimeError("Arrow ingestion requires pyarrow")
+
+    batch = ScoringBatch()
+    row_number = 0
+    try:
+        reader = pa.ipc.open_stream(pa.BufferReader(data))
+        for record_batch in reader:
+            columns = {
+                name: _arrow_values(record_batch.column(i))
+                for i, name in enumerate(record_batch.schema.names)
+            }
+            if "type" not in columns:
+                raise ValueError("Arrow stream must have a \"type\" column")
+
+            for i, kind in enumerate(columns["type"]):
+                row_number += 1
+                batch.add(
+                    kind, {name: values[i] for name, values in columns.items()}, f"row {row_number}"
+                )
+    except pa.ArrowInvalid as exc:
+        raise ValueError(f"Invalid Arrow stream: {exc}")
+    return batch
+
+
+def _add_line(batch: ScoringBatch, line: bytes, line_number: int):
+    if not line.strip():
+        return
+
+    where = f"line {line_number}"
+    try:
+        values = json.loads(line)
+    except ValueError as exc:
+        raise ValueError(f"{where}: invalid JSON ({exc})")
+    if not isinstance(values, dict):
+        raise ValueError(f"{where}: expected a JSON object")
+
+    batch.add(values.get("type"), values, where)
+
+
+def _arrow_values(column) -> List[Any]:
+    values = column.to_pylist()
+    if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+        return [value.isoformat() if isinstance(value, date) else value for value in values]
+    return values
@@ -0,0 +1,327 @@
+import asyncio
+import functools
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from app.graphql.types import ReconciliationCandidate, ReconciliationJob
+from app.services.scheduler import ScoringScheduler, SchedulerBusy
+
+# SQLite file holding job inputs, progress and results
+RECONCILE_JOB_DB = os.getenv("RECONCILE_JOB_DB", "reconciliation_jobs.sqlite3")
+
+# Invoices scored and saved per step; a restarted job resumes after the last saved shard
+JOB_SHARD_INVOICES = int(os.getenv("RECONCILE_JOB_SHARD_INVOICES", "500"))
+
+# Seconds a finished job and its results are kept
+JOB_RESULT_TTL = int(os.getenv("RECONCILE_JOB_TTL_SECONDS", "86400"))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Jobs in these states are picked up again after a restart
+UNFINISHED = (QUEUED, RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    total_invoices INTEGER NOT NULL,
+    processed_invoices INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_shards (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    start INTEGER NOT NULL,
+    candidates TEXT NOT NULL,
+    PRIMARY KEY (job_id, start)
+);
+"""
+
+
+class JobStore:
+    """
+    SQLite store for job inputs, progress and per-shard results.
+
+    The connection is opened on first use and shared by the event loop and
+    scoring threads under a lock.
+    """
+
+    def __init__(self, path: str = RECONCILE_JOB_DB):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _execute(self, sql: str, parameters: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+    def create(self, job_id: str, tenant_id: str, params: Dict[str, Any], total_invoices: int):
+        self._execute(
+            "INSERT INTO jobs (id, tenant_id, status, params, total_invoices, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, tenant_id, QUEUED, json.dumps(params), total_invoices, time.time()),
+        )
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def params(self, job_id: str) -> Dict[str, Any]:
+        return json.loads(self._execute("SELECT params FROM jobs WHERE id = ?", (job_id,))[0]["params"])
+
+    def unfinished(self) -> List[str]:
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", UNFINISHED
+        )
+        return [row["id"] for row in rows]
+
+    def start(self, job_id: str):
+        self._execute(
+            "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+            (RUNNING, time.time(), job_id),
+        )
+
+    def save_shard(self, job_id: str, start: int, count: int, candidates: List[List[Any]]):
+        """Store a shard's candidates and advance progress in one transaction."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO job_shards (job_id, start, candidates) VALUES (?, ?, ?)",
+                    (job_id, start, json.dumps(candidates)),
+                )
+                connection.execute(
+                    "UPDATE jobs SET processed_invoices = ? WHERE id = ?", (start + count, job_id)
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def shard_candidates(self, job_id: str) -> Iterator[List[Any]]:
+        rows = self._execute("SELECT candidates FROM job_shards WHERE job_id = ?", (job_id,))
+        for row in rows:
+            yield from json.loads(row["candidates"])
+
+    def request_cancel(self, job_id: str):
+        self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+
+    def cancel_requested(self, job_id: str) -> bool:
+        rows = self._execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+        return bool(rows and rows[0]["cancel_requested"])
+
+    def finish(self, job_id: str, status: str, ttl: int, error: Optional[str] = None):
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ? WHERE id = ?",
+            (status, error, now, now + ttl, job_id),
+        )
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs, with their results, whose retention has run out."""
+        with self._lock:
+            cursor = self._connect().execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class JobManager:
+    """
+    Runs large scoring requests as background jobs.
+
+    A job scores its invoices in shards of shard_size through the scoring
+    scheduler, so its shards take turns with interactive requests, and
+    saves each shard's candidates before starting the next. Cancellation
+    is checked between shards. Unfinished jobs are resumed by resume(),
+    starting after the last saved shard.
+    """
+
+    def __init__(
+        self,
+        service,
+        scheduler: ScoringScheduler,
+        store: JobStore,
+        shard_size: int = JOB_SHARD_INVOICES,
+        ttl: int = JOB_RESULT_TTL,
+    ):
+        self.service = service
+        self.scheduler = scheduler
+        self.store = store
+        self.shard_size = max(1, shard_size)
+        self.ttl = ttl
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        top_n: int = 5,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+    ) -> ReconciliationJob:
+        """Store a scoring request and start it in the background."""
+        self.service.validate_scoring_options(backend, text_engine)
+        self.store.purge_expired()
+
+        job_id = str(uuid.uuid4())
+        params = {
+            "invoices": invoices,
+            "transactions": transactions,
+            "top_n": top_n,
+            "backend": backend,
+            "min_partial_score": min_partial_score,
+            "text_engine": text_engine,
+        }
+        self.store.create(job_id, tenant_id, params, len(invoices))
+        self._launch(job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[ReconciliationJob]:
+        """The job's status and results so far, or None if unknown or expired."""
+        self.store.purge_expired()
+        row = self.store.get(job_id)
+        return self.describe(row) if row is not None else None
+
+    def cancel(self, job_id: str) -> Optional[ReconciliationJob]:
+        """Ask a job to stop after its current shard; finished jobs are unchanged."""
+        row = self.store.get(job_id)
+        if row is None:
+            return None
+        if row["status"] in UNFINISHED:
+            self.store.request_cancel(job_id)
+            if job_id not in self._tasks:
+                # Nothing is running it in this process
+                self.store.finish(job_id, CANCELLED, self.ttl)
+        return self.get(job_id)
+
+    def resume(self) -> int:
+        """Restart every unfinished job from its last saved shard."""
+        job_ids = [job_id for job_id in self.store.unfinished() if job_id not in self._tasks]
+        for job_id in job_ids:
+            self._launch(job_id)
+        return len(job_ids)
+
+    async def wait(self, job_id: str):
+        """Wait until the job's background task ends."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.wait({task})
+
+    def describe(self, row: sqlite3.Row) -> ReconciliationJob:
+        total = row["total_invoices"]
+        processed = row["processed_invoices"]
+        started = row["started_at"]
+        if started is None:
+            elapsed_ms = 0
+        else:
+            elapsed_ms = int(((row["finished_at"] or time.time()) - started) * 1000)
+
+        if total:
+            percent = round(processed * 100 / total, 2)
+        else:
+            percent = 100.0 if row["status"] == COMPLETED else 0.0
+
+        expires_at = row["expires_at"]
+        return ReconciliationJob(
+            id=row["id"],
+            tenant_id=row["tenant_id"],
+            status=row["status"],
+            total_invoices=total,
+            processed_invoices=processed,
+            percent_complete=percent,
+            elapsed_ms=elapsed_ms,
+            error=row["error"],
+            expires_at=(
+                datetime.fromtimestamp(expires_at, timezone.utc) if expires_at is not None else None
+            ),
+            loader=functools.partial(self._candidates, row["id"]),
+        )
+
+    def _launch(self, job_id: str):
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str):
+        row = self.store.get(job_id)
+        params = self.store.params(job_id)
+        tenant_id = row["tenant_id"]
+        processed = row["processed_invoices"]
+        stream: Optional[Iterator] = None
+
+        def score_shard(start: int) -> int:
+            # Runs on a scoring thread; the stream is only advanced by one
+            # shard at a time, so it never crosses threads concurrently
+            nonlocal stream
+            if stream is None:
+                stream = self.service.iter_candidates(
+                    tenant_id,
+                    params["invoices"],
+                    params["transactions"],
+                    top_n=params["top_n"],
+                    backend=params["backend"],
+                    min_partial_score=params["min_partial_score"],
+                    text_engine=params["text_engine"],
+                    start=start,
+                )
+            shard = list(itertools.islice(stream, self.shard_size))
+            if shard:
+                self.store.save_shard(job_id, start, len(shard), self.service.candidate_rows(
+                    [c for _, candidates in shard for c in candidates]
+                ))
+            return len(shard)
+
+        self.store.start(job_id)
+        while processed < row["total_invoices"]:
+            if self.store.cancel_requested(job_id):
+                self.store.finish(job_id, CANCELLED, self.ttl)
+                return
+            try:
+                processed += await self.scheduler.run(tenant_id, score_shard, processed)
+            except SchedulerBusy as exc:
+                await asyncio.sleep(exc.retry_after)
+            except Exception as exc:
+                self.store.finish(job_id, FAILED, self.ttl, str(exc))
+                return
+
+        self.store.finish(job_id, COMPLETED, self.ttl)
+
+    def _candidates(self, job_id: str) -> List[ReconciliationCandidate]:
+        """Saved candidates in score_candidates order, explained from the stored inputs."""
+        params = self.store.params(job_id)
+        rows = sorted(self.store.shard_candidates(job_id), key=lambda r: (-r[6], str(r[0]), str(r[1])))
+        return self.service.candidates_from_rows(rows, params["invoices"], params["transactions"])
@@ -0,0 +1,71 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+# Worker processes for scoring; 0 or 1 keeps scoring in-process
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0"))
+
+# Smallest invoice batch worth the cost of starting a pool
+PARALLEL_MIN_INVOICES = int(os.getenv("SCORING_PARALLEL_MIN_INVOICES", "500"))
+
+# Shards handed to each worker, so uneven shards still balance
+SHARDS_PER_WORKER = 4
+
+# Request state of the pool this worker process belongs to
+_shared: Optional[Tuple] = None
+
+
+def _init_worker(state: Tuple):
+    global _shared
+    _shared = state
+
+
+def _score_shard(bounds: Tuple[int, int]) -> List[List[Tuple]]:
+    service, invoices, transactions, plan, backend, min_partial_score, context, top_n = _shared
+    start, end = bounds
+    return service._rank_runs(
+        invoices[start:end], transactions, plan, backend, min_partial_score, context, top_n, start
+    )
+
+
+def shard_bounds(count: int, workers: int) -> List[Tuple[int, int]]:
+    """Split range(count) into contiguous shards for the given worker count."""
+    size = max(1, math.ceil(count / (workers * SHARDS_PER_WORKER)))
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def rank_runs_parallel(
+    service,
+    invoices: List,
+    transactions: List,
+    plan,
+    backend: str,
+    min_partial_score: int,
+    context,
+    top_n: int,
+    workers: int,
+) -> List[List[Tuple]]:
+    """
+    Score invoice shards in a process pool.
+
+    Returns the same per-invoice runs, in invoice order, as
+    ReconciliationService._rank_runs over the whole batch. Prepared records
+    reach each worker once through the pool initializer: inherited on
+    platforms that fork, pickled otherwise.
+    """
+    state = (service, invoices, transactions, plan, backend, min_partial_score, context, top_n)
+    bounds = shard_bounds(len(invoices), workers)
+
+    # State travels with this pool only, so concurrent requests stay apart
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context(method),
+        initializer=_init_worker,
+        initargs=(state,),
+    ) as pool:
+        shards = list(pool.map(_score_shard, bounds))
+
+    return [run for shard in shards for run in shard]
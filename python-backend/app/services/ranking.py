@@ -0,0 +1,38 @@
+import heapq
+from typing import List, Dict, Iterable, Iterator, Tuple
+
+# (position, score breakdown) pairs produced by the scoring backends
+ScoredPairs = Iterable[Tuple[int, Dict[str, int]]]
+
+# Sort key: highest score first, then invoice id, then transaction id
+RankKey = Tuple[int, str, str]
+
+
+def rank_key(score: int, invoice_id, transaction_id) -> RankKey:
+    """Deterministic ordering key for a candidate; ids compare as strings."""
+    return (-score, str(invoice_id), str(transaction_id))
+
+
+def top_pairs(
+    invoice_id,
+    transaction_ids: List,
+    scored: ScoredPairs,
+    top_n: int,
+) -> List[Tuple[RankKey, int, Dict[str, int]]]:
+    """
+    Select an invoice's best positive-scoring pairs.
+
+    Keeps a bounded heap of size top_n while consuming the pairs, so only
+    the survivors are ever held; the result is ordered by rank key.
+    """
+    ranked = (
+        (rank_key(score_result["total_score"], invoice_id, transaction_ids[position]), position, score_result)
+        for position, score_result in scored
+        if score_result["total_score"] > 0
+    )
+    return heapq.nsmallest(top_n, ranked, key=lambda entry: entry[0])
+
+
+def merge_ranked(runs: Iterable[List[Tuple]]) -> Iterator[Tuple]:
+    """K-way merge of per-invoice runs that are each ordered by rank key."""
+    return heapq.merge(*runs, key=lambda entry: entry[0])
@@ -0,0 +1,144 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Any, Generic, Optional, Tuple, TypeVar
+from sqlalchemy import Select, exists, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Invoice, BankTransaction, MatchCandidate, InvoiceStatus, MatchStatus
+
+# Rows per page when the caller does not choose
+PAGE_SIZE = 500
+
+# Rendered inline rather than bound, so the planner can match the partial
+# open-invoice index
+OPEN_INVOICES = Invoice.status == literal(InvoiceStatus.OPEN, Invoice.status.type, literal_execute=True)
+
+Row = TypeVar("Row")
+
+
+class Page(Generic[Row]):
+    """One page of rows and the cursor to pass for the next page, None on the last page."""
+
+    __slots__ = ("rows", "next_cursor")
+
+    def __init__(self, rows: List[Row], next_cursor: Optional[Any]):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+
+def open_invoices_query(tenant_id: str, after: Optional[str] = None, limit: int = PAGE_SIZE) -> Select:
+    """Open invoices of a tenant in id order, starting after the given id."""
+    statement = select(Invoice).where(Invoice.tenant_id == tenant_id, OPEN_INVOICES)
+    if after is not None:
+        statement = statement.where(Invoice.id > after)
+    return statement.order_by(Invoice.id).limit(limit + 1)
+
+
+def unmatched_transactions_query(
+    tenant_id: str, after: Optional[Tuple[datetime, str]] = None, limit: int = PAGE_SIZE
+) -> Select:
+    """Transactions of a tenant without a confirmed match, in posting order."""
+    confirmed = exists().where(
+        MatchCandidate.bank_transaction_id == BankTransaction.id,
+        MatchCandidate.status == MatchStatus.CONFIRMED,
+    )
+    statement = select(BankTransaction).where(BankTransaction.tenant_id == tenant_id, ~confirmed)
+    if after is not None:
+        statement = statement.where(tuple_(BankTransaction.posted_at, BankTransaction.id) > tuple_(*after))
+    return statement.order_by(BankTransaction.posted_at, BankTransaction.id).limit(limit + 1)
+
+
+def transactions_by_amount_query(
+    tenant_id: str,
+    low: Decimal,
+    high: Decimal,
+    after: Optional[Tuple[Decimal, str]] = None,
+    limit: int = PAGE_SIZE,
+) -> Select:
+    """Transactions of a tenant with an amount in [low, high], in amount order."""
+    statement = select(BankTransaction).where(
+        BankTransaction.tenant_id == tenant_id,
+        BankTransaction.amount.between(low, high),
+    )
+    if after is not None:
+        statement = statement.where(tuple_(BankTransaction.amount, BankTransaction.id) > tuple_(*after))
+    return statement.order_by(BankTransaction.amount, BankTransaction.id).limit(limit + 1)
+
+
+def invoice_candidates_query(
+    tenant_id: str, invoice_id: str, after: Optional[Tuple[int, str]] = None, limit: int = PAGE_SIZE
+) -> Select:
+    """Match candidates of an invoice, best score first."""
+    statement = select(MatchCandidate).where(
+        MatchCandidate.tenant_id == tenant_id,
+        MatchCandidate.invoice_id == invoice_id,
+    )
+    if after is not None:
+        score, candidate_id = after
+        # Score descends and id ascends, so this cannot be a single row comparison
+        statement = statement.where(or_(
+            MatchCandidate.score < score,
+            (MatchCandidate.score == score) & (MatchCandidate.id > candidate_id),
+        ))
+    return statement.order_by(MatchCandidate.score.desc(), MatchCandidate.id).limit(limit + 1)
+
+
+async def open_invoices(
+    session: AsyncSession, tenant_id: str, after: Optional[str] = None, limit: int = PAGE_SIZE
+) -> Page[Invoice]:
+    """
+    A page of a tenant's open invoices.
+
+    Pages are keyed on the last invoice id, so reading page N costs the
+    same as reading the first.
+    """
+    rows = await _fetch(session, open_invoices_query(tenant_id, after, limit))
+    return _page(rows, limit, lambda invoice: invoice.id)
+
+
+async def unmatched_transactions(
+    session: AsyncSession,
+    tenant_id: str,
+    after: Optional[Tuple[datetime, str]] = None,
+    limit: int = PAGE_SIZE,
+) -> Page[BankTransaction]:
+    """A page of a tenant's transactions without a confirmed match, keyed on (posted_at, id)."""
+    rows = await _fetch(session, unmatched_transactions_query(tenant_id, after, limit))
+    return _page(rows, limit, lambda transaction: (transaction.posted_at, transaction.id))
+
+
+async def transactions_by_amount(
+    session: AsyncSession,
+    tenant_id: str,
+    low: Decimal,
+    high: Decimal,
+    after: Optional[Tuple[Decimal, str]] = None,
+    limit: int = PAGE_SIZE,
+) -> Page[BankTransaction]:
+    """A page of a tenant's transactions within an amount range, keyed on (amount, id)."""
+    rows = await _fetch(session, transactions_by_amount_query(tenant_id, low, high, after, limit))
+    return _page(rows, limit, lambda transaction: (transaction.amount, transaction.id))
+
+
+async def invoice_candidates(
+    session: AsyncSession,
+    tenant_id: str,
+    invoice_id: str,
+    after: Optional[Tuple[int, str]] = None,
+    limit: int = PAGE_SIZE,
+) -> Page[MatchCandidate]:
+    """A page of an invoice's match candidates, keyed on (score, id)."""
+    rows = await _fetch(session, invoice_candidates_query(tenant_id, invoice_id, after, limit))
+    return _page(rows, limit, lambda candidate: (candidate.score, candidate.id))
+
+
+async def _fetch(session: AsyncSession, statement: Select) -> List:
+    result = await session.execute(statement)
+    return list(result.scalars())
+
+
+def _page(rows: List, limit: int, key) -> Page:
+    # One extra row was fetched to tell whether another page follows
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, key(rows[-1]))
+    return Page(rows, None)
@@ -1,15 +1,68 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
-import re
-from difflib import SequenceMatcher
+import asyncio
+import dataclasses
+import functools
+import random
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.graphql.types import (
     ReconciliationCandidate,
     ScoreBreakdown,
     ScoringResult,
+    ScoringResultColumnar,
     ExplanationResult,
     AiExplanationRequest,
+    BlockingPlanResult,
+    RecallAuditResult,
+    WorkingSetResult,
+    IncrementalScoringResult,
+    IndexCacheStats,
+    ResultCacheStats,
+    SimilarityMemoStats,
+    AssignmentResult,
+    ReconcileTenantResult,
 )
+from app.services.blocking import (
+    BlockingPlan,
+    BlockingPlanner,
+    DEFAULT_BLOCKING_PLAN,
+    EXHAUSTIVE_PLAN,
+)
+from app.services.features import (
+    DAY_MICROSECONDS,
+    InvoiceRecord,
+    TransactionRecord,
+    clean_text,
+    parse_date,
+)
+from app.services.text_similarity import (
+    DEFAULT_TEXT_SIMILARITY_ENGINE,
+    TEXT_SIMILARITY_ENGINES,
+    TextSimilarityEngine,
+    create_text_engine,
+    sequence_ratio,
+)
+from app.services.vendor_index import VendorAutomaton, VendorMentionIndex
+from app.services.scoring_context import ScoringContext
+from app.services.ranking import top_pairs, merge_ranked
+from app.services.parallel import SCORING_WORKERS, PARALLEL_MIN_INVOICES, rank_runs_parallel
+from app.services.working_set import TenantWorkingSet, WorkingSetStore
+from app.services.incremental import IncrementalRanker, ranker_settings
+from app.services.index_cache import PreparedTransactions, TenantIndexCache
+from app.services.result_cache import create_result_cache, request_key
+from app.services.similarity_memo import create_similarity_memo
+from app.services.assignment import EXACT_MAX_CELLS, assign
+from app.services.tenant_store import (
+    load_open_invoices,
+    load_unmatched_transactions,
+    load_vendor_names,
+    write_candidates,
+)
+
+# Engines that can compute the amount and date components
+SCORING_BACKENDS = ("python", "numpy")
 
 
 class ReconciliationService:
@@ -26,6 +79,218 @@ class ReconciliationService:
         # Date tolerance in days
         self.DATE_TOLERANCE_DAYS = 3
         self.AMOUNT_TOLERANCE_PERCENT = 0.01  # 1% tolerance
+        
+        # Per-tenant blocking plans (tenants without one use the default)
+        self.blocking_plans: Dict[str, BlockingPlan] = {}
+        
+        # Per-tenant description similarity engines
+        self.text_engines: Dict[str, str] = {}
+        
+        # Per-tenant automata over the preloaded vendor names
+        self.vendor_automata: Dict[str, VendorAutomaton] = {}
+        
+        # Per-tenant automaton for the last batch with vendors outside the
+        # preloaded set; one slot per tenant keeps the size bounded
+        self.batch_automata: Dict[str, VendorAutomaton] = {}
+        
+        # Process-pool scoring for large batches
+        self.scoring_workers = SCORING_WORKERS
+        self.parallel_min_invoices = PARALLEL_MIN_INVOICES
+        
+        # Retained per-tenant records for delta uploads
+        self.working_sets = WorkingSetStore()
+        
+        # Prepared records and indexes reused across requests
+        self.index_cache = TenantIndexCache()
+        
+        # Finished scoring results for repeated identical requests
+        self.result_cache = create_result_cache()
+        
+        # Description-pair similarity ratios of recurring descriptions
+        self.similarity_memo = create_similarity_memo()
+        
+        # One database reconciliation at a time per tenant
+        self.reconcile_locks: Dict[str, asyncio.Lock] = {}
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pool workers only need the scoring configuration; the per-tenant
+        # stores hold locks and are never read while scoring
+        state = self.__dict__.copy()
+        state["vendor_automata"] = {}
+        state["batch_automata"] = {}
+        state["working_sets"] = None
+        state["index_cache"] = None
+        state["result_cache"] = None
+        state["reconcile_locks"] = {}
+        return state
+    
+    def set_blocking_plan(self, tenant_id: str, plan: BlockingPlan) -> BlockingPlanResult:
+        """Set the blocking plan used when scoring candidates for a tenant."""
+        self.blocking_plans[tenant_id] = plan
+        return self.describe_blocking_plan(tenant_id, plan)
+    
+    def get_blocking_plan(self, tenant_id: str) -> BlockingPlan:
+        """Get the blocking plan for a tenant."""
+        return self.blocking_plans.get(tenant_id, DEFAULT_BLOCKING_PLAN)
+    
+    def describe_blocking_plan(self, tenant_id: str, plan: BlockingPlan) -> BlockingPlanResult:
+        """Convert a blocking plan to its GraphQL representation."""
+        return BlockingPlanResult(
+            tenant_id=tenant_id,
+            keys=list(plan.keys),
+            match=plan.match,
+            full_scan_fallback=plan.full_scan_fallback,
+        )
+    
+    def set_text_engine(self, tenant_id: str, engine: str) -> str:
+        """Set the description similarity engine used for a tenant."""
+        if engine not in TEXT_SIMILARITY_ENGINES:
+            raise ValueError(f"Text similarity engine must be one of: {', '.join(TEXT_SIMILARITY_ENGINES)}")
+        
+        self.text_engines[tenant_id] = engine
+        return engine
+    
+    def get_text_engine(self, tenant_id: str) -> str:
+        """Get the description similarity engine for a tenant."""
+        return self.text_engines.get(tenant_id, DEFAULT_TEXT_SIMILARITY_ENGINE)
+    
+    def set_tenant_vendors(self, tenant_id: str, vendor_names: List[str]) -> int:
+        """Preload a tenant's vendor names (e.g. from the Vendor table) into its automaton."""
+        patterns = frozenset(clean_text(name) for name in vendor_names if name) - {""}
+        automaton = self.vendor_automata.get(tenant_id)
+        
+        # Keep the current automaton, and indexes built for it, when nothing changed
+        if automaton is None or automaton.patterns != patterns:
+            automaton = VendorAutomaton(patterns)
+            self.vendor_automata[tenant_id] = automaton
+        
+        return len(automaton)
+    
+    def _vendor_automaton(self, tenant_id: str, invoices: List[InvoiceRecord]) -> VendorAutomaton:
+        """Get an automaton over the tenant's preloaded vendors plus those in the batch."""
+        preloaded = self.vendor_automata.get(tenant_id)
+        known = preloaded.patterns if preloaded is not None else frozenset()
+        vendors = {invoice.vendor for invoice in invoices if invoice.vendor}
+        
+        if preloaded is not None and vendors <= known:
+            return preloaded
+        
+        # Repeat batches with the same vendors reuse the automaton and the
+        # vendor-mention index cached for it
+        patterns = known | vendors
+        automaton = self.batch_automata.get(tenant_id)
+        if automaton is None or automaton.patterns != patterns:
+            automaton = VendorAutomaton(patterns)
+            self.batch_automata[tenant_id] = automaton
+        
+        return automaton
+    
+    def invalidate_tenant_indexes(self, tenant_id: str) -> int:
+        """Drop a tenant's cached records, indexes, vendor automata and scoring results."""
+        self.vendor_automata.pop(tenant_id, None)
+        self.batch_automata.pop(tenant_id, None)
+        return self.index_cache.invalidate(tenant_id) + self.result_cache.invalidate(tenant_id)
+    
+    def index_cache_stats(self) -> IndexCacheStats:
+        """Hit, miss and memory counters for the tenant index cache."""
+        cache = self.index_cache
+        return IndexCacheStats(
+            entries=len(cache),
+            bytes=cache.bytes,
+            max_bytes=cache.max_bytes,
+            hits=cache.hits,
+            misses=cache.misses,
+            evictions=cache.evictions,
+        )
+    
+    def result_cache_stats(self) -> ResultCacheStats:
+        """Hit, miss and memory counters for the scoring result cache."""
+        cache = self.result_cache
+        return ResultCacheStats(
+            entries=len(cache),
+            bytes=cache.bytes,
+            max_bytes=cache.max_bytes,
+            ttl_seconds=cache.ttl,
+            shared=cache.disk is not None,
+            hits=cache.hits,
+            disk_hits=cache.disk_hits,
+            misses=cache.misses,
+            evictions=cache.evictions,
+            expirations=cache.expirations,
+        )
+    
+    def similarity_memo_stats(self) -> SimilarityMemoStats:
+        """Hit rate and size of the description-pair similarity memo."""
+        memo = self.similarity_memo
+        return SimilarityMemoStats(
+            entries=len(memo),
+            max_entries=memo.max_entries,
+            hits=memo.hits,
+            misses=memo.misses,
+            hit_rate=round(memo.hit_rate, 4),
+            evictions=memo.evictions,
+            persistent=memo.path is not None,
+        )
+    
+    def scoring_settings(
+        self,
+        tenant_id: str,
+        top_n: int,
+        full_scan_fallback: bool,
+        plan: Optional[BlockingPlan],
+        min_partial_score: int,
+        text_engine: Optional[str],
+    ) -> Dict[str, Any]:
+        """Everything besides the records that decides a request's candidates."""
+        plan = plan or self.get_blocking_plan(tenant_id)
+        return {
+            "top_n": top_n,
+            "keys": list(plan.keys),
+            "match": plan.match,
+            "full_scan_fallback": full_scan_fallback or plan.full_scan_fallback,
+            "min_partial_score": min_partial_score,
+            "text_engine": text_engine or self.get_text_engine(tenant_id),
+            "weights": [
+                self.EXACT_AMOUNT_SCORE,
+                self.AMOUNT_TOLERANCE_SCORE,
+                self.DATE_PROXIMITY_SCORE,
+                self.TEXT_SIMILARITY_SCORE,
+                self.VENDOR_MATCH_SCORE,
+                self.DATE_TOLERANCE_DAYS,
+                self.AMOUNT_TOLERANCE_PERCENT,
+            ],
+        }
+    
+    def request_key(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        top_n: int = 5,
+        full_scan_fallback: bool = False,
+        plan: Optional[BlockingPlan] = None,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> str:
+        """
+        Content key of a score_candidates call; calls with equal keys return equal candidates.
+        
+        The backend and worker count are left out since they never change
+        the candidates.
+        """
+        settings = self.scoring_settings(
+            tenant_id, top_n, full_scan_fallback, plan, min_partial_score, text_engine
+        )
+        return request_key(tenant_id, settings, invoices, transactions)
+    
+    def validate_scoring_options(self, backend: str, text_engine: Optional[str] = None):
+        """Raise ValueError for an unknown scoring backend or text engine."""
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"Scoring backend must be one of: {', '.join(SCORING_BACKENDS)}")
+        if text_engine is not None and text_engine not in TEXT_SIMILARITY_ENGINES:
+            raise ValueError(f"Text similarity engine must be one of: {', '.join(TEXT_SIMILARITY_ENGINES)}")
     
     def score_candidates(
         self,
@@ -33,195 +298,1019 @@ class ReconciliationService:
         invoices: List[Dict[str, Any]],
         transactions: List[Dict[str, Any]],
         top_n: int = 5,
+        full_scan_fallback: bool = False,
+        plan: Optional[BlockingPlan] = None,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+        workers: Optional[int] = None,
+        cache_key: Optional[str] = None,
     ) -> ScoringResult:
         """
         Score invoice-transaction pairs using deterministic heuristics.
         
+        Only pairs that pass the blocking plan are fully scored. The default
+        plan keeps transactions whose amount is within tolerance of an invoice.
+        Candidates are ordered by score, then invoice id, then transaction id.
+        
         Args:
             tenant_id: Tenant identifier (for logging/auditing)
             invoices: List of invoice dictionaries
             transactions: List of transaction dictionaries
             top_n: Number of top candidates to return per invoice
+            full_scan_fallback: Score invoices with no blocked candidates
+                against every transaction instead of skipping them
+            plan: Blocking plan to use instead of the tenant's plan
+            backend: Engine for the amount and date components
+                ("python" or "numpy"); both give identical breakdowns
+            min_partial_score: Skip text and vendor scoring for pairs whose
+                amount plus date score is below this threshold
+            text_engine: Description similarity engine to use instead of
+                the tenant's engine ("sequence" or "tfidf")
+            workers: Worker processes to shard invoices across; batches
+                smaller than parallel_min_invoices are scored in-process.
+                Output is identical to serial scoring
+            cache_key: request_key() for these arguments, if the caller
+                already computed it
             
         Returns:
             ScoringResult with ranked candidates
         """
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"Scoring backend must be one of: {', '.join(SCORING_BACKENDS)}")
+        
         start_time = datetime.now()
         
+        # Identical requests are answered from the result cache
+        cache = self.result_cache
+        if cache.enabled:
+            key = cache_key or self.request_key(
+                tenant_id, invoices, transactions, top_n, full_scan_fallback, plan,
+                min_partial_score=min_partial_score, text_engine=text_engine,
+            )
+            cached = cache.get(key, functools.partial(self._result_from_payload, invoices, transactions))
+            if cached is not None:
+                duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+                return dataclasses.replace(cached, duration_ms=duration_ms)
+        
+        # Prepared records and indexes are reused while the content is unchanged
+        prepared_invoices = self.index_cache.invoices(tenant_id, invoices)
+        prepared_transactions = self.index_cache.transactions(tenant_id, transactions)
+        candidates = self._score_records(
+            tenant_id, prepared_invoices.records, prepared_transactions.records, top_n,
+            full_scan_fallback, plan, backend, min_partial_score, text_engine, workers,
+            prepared_transactions,
+        )
+        
+        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        
+        result = ScoringResult(
+            candidates=candidates,
+            processed_invoices=len(invoices),
+            processed_transactions=len(transactions),
+            duration_ms=duration_ms,
+        )
+        if cache.enabled:
+            cache.put(key, tenant_id, result, self._result_payload)
+        return result
+    
+    def candidate_rows(self, candidates: List[ReconciliationCandidate]) -> List[List[Any]]:
+        """Candidates as JSON rows of ids, breakdown and total, for storage."""
+        return [
+            [
+                c.invoice_id,
+                c.transaction_id,
+                c.score_breakdown.exact_amount,
+                c.score_breakdown.date_proximity,
+                c.score_breakdown.text_similarity,
+                c.score_breakdown.vendor_match,
+                c.score,
+            ]
+            for c in candidates
+        ]
+    
+    def candidates_from_rows(
+        self,
+        rows: List[List[Any]],
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+    ) -> List[ReconciliationCandidate]:
+        """Rebuild stored candidate rows, explained from the records they were scored from."""
+        invoices_by_id = {invoice["id"]: invoice for invoice in invoices}
+        transactions_by_id = {transaction["id"]: transaction for transaction in transactions}
+        
         candidates = []
+        for invoice_id, transaction_id, exact_amount, date_proximity, text_similarity, vendor_match, total in rows:
+            score_result = {
+                "exact_amount": exact_amount,
+                "date_proximity": date_proximity,
+                "text_similarity": text_similarity,
+                "vendor_match": vendor_match,
+                "total_score": total,
+            }
+            candidates.append(ReconciliationCandidate(
+                invoice_id=invoice_id,
+                transaction_id=transaction_id,
+                score=total,
+                score_breakdown=ScoreBreakdown(
+                    exact_amount=exact_amount,
+                    date_proximity=date_proximity,
+                    text_similarity=text_similarity,
+                    vendor_match=vendor_match,
+                    total=total,
+                ),
+                explainer=functools.partial(
+                    self.generate_explanation,
+                    invoices_by_id[invoice_id],
+                    transactions_by_id[transaction_id],
+                    score_result,
+                ),
+            ))
+        return candidates
+    
+    def _result_payload(self, result: ScoringResult) -> Dict[str, Any]:
+        return {
+            "candidates": self.candidate_rows(result.candidates),
+            "processed_invoices": result.processed_invoices,
+            "processed_transactions": result.processed_transactions,
+            "duration_ms": result.duration_ms,
+        }
+    
+    def _result_from_payload(
+        self,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        payload: Dict[str, Any],
+    ) -> ScoringResult:
+        # The key covers the records' content, so the request's own records
+        # are the ones the stored candidates were scored from
+        return ScoringResult(
+            candidates=self.candidates_from_rows(payload["candidates"], invoices, transactions),
+            processed_invoices=payload["processed_invoices"],
+            processed_transactions=payload["processed_transactions"],
+            duration_ms=payload["duration_ms"],
+        )
+    
+    def score_candidates_columnar(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        top_n: int = 5,
+        full_scan_fallback: bool = False,
+        plan: Optional[BlockingPlan] = None,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> ScoringResultColumnar:
+        """
+        Score like score_candidates, returning parallel arrays.
         
-        # Score each invoice against all transactions
-        for invoice in invoices:
-            invoice_candidates = []
+        Element i of every array describes the i-th candidate in
+        score_candidates order. No candidate or breakdown object is built,
+        and explanations are only formatted if requested.
+        
+        Returns:
+            ScoringResultColumnar with one array per candidate field
+        """
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"Scoring backend must be one of: {', '.join(SCORING_BACKENDS)}")
+        
+        start_time = datetime.now()
+        
+        prepared_invoices = self.index_cache.invoices(tenant_id, invoices)
+        prepared_transactions = self.index_cache.transactions(tenant_id, transactions)
+        ranked = self._rank_records(
+            tenant_id, prepared_invoices.records, prepared_transactions.records, top_n,
+            full_scan_fallback, plan, backend, min_partial_score, text_engine, workers,
+            prepared_transactions,
+        )
+        
+        result = ScoringResultColumnar(
+            invoice_ids=[],
+            transaction_ids=[],
+            scores=[],
+            exact_amount=[],
+            date_proximity=[],
+            text_similarity=[],
+            vendor_match=[],
+            processed_invoices=len(invoices),
+            processed_transactions=len(transactions),
+            duration_ms=0,
+            explainers=[],
+        )
+        for invoice, transaction, score_result in ranked:
+            result.invoice_ids.append(invoice.id)
+            result.transaction_ids.append(transaction.id)
+            result.scores.append(score_result["total_score"])
+            result.exact_amount.append(score_result["exact_amount"])
+            result.date_proximity.append(score_result["date_proximity"])
+            result.text_similarity.append(score_result["text_similarity"])
+            result.vendor_match.append(score_result["vendor_match"])
+            result.explainers.append(functools.partial(
+                self.generate_explanation, invoice.source, transaction.source, score_result
+            ))
+        
+        result.duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        return result
+    
+    async def reconcile_tenant(
+        self,
+        session: AsyncSession,
+        tenant_id: str,
+        top_n: int = 5,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+    ) -> ReconcileTenantResult:
+        """
+        Score a tenant's open invoices against its unmatched transactions from the database.
+        
+        Rows are streamed with server-side cursors selecting only the scored
+        columns, scoring runs off the event loop, and the result is bulk
+        upserted as the tenant's proposed match candidates.
+        
+        Args:
+            session: Database session; committed on success
+            tenant_id: Tenant identifier
+            top_n: Number of top candidates to keep per invoice
+            backend: Engine for the amount and date components
+            min_partial_score: Skip text and vendor scoring below this
+                amount plus date score
+            text_engine: Description similarity engine to use instead of
+                the tenant's engine
             
-            for transaction in transactions:
-                score_result = self.calculate_score(invoice, transaction)
-                
-                if score_result["total_score"] > 0:
-                    candidate = ReconciliationCandidate(
-                        invoice_id=invoice["id"],
-                        transaction_id=transaction["id"],
-                        score=score_result["total_score"],
-                        explanation=self.generate_explanation(
-                            invoice, transaction, score_result
-                        ),
-                        score_breakdown=ScoreBreakdown(
-                            exact_amount=score_result["exact_amount"],
-                            date_proximity=score_result["date_proximity"],
-                            text_similarity=score_result["text_similarity"],
-                            vendor_match=score_result["vendor_match"],
-                            total=score_result["total_score"],
-                        ),
-                    )
-                    invoice_candidates.append(candidate)
+        Returns:
+            ReconcileTenantResult with counts of rows read, written and removed
+        """
+        start_time = datetime.now()
+        
+        async with self.reconcile_locks.setdefault(tenant_id, asyncio.Lock()):
+            invoices = await load_open_invoices(session, tenant_id)
+            transactions = await load_unmatched_transactions(session, tenant_id)
+            self.set_tenant_vendors(tenant_id, await load_vendor_names(session, tenant_id))
+            
+            scoring = await asyncio.to_thread(
+                self.score_candidates,
+                tenant_id,
+                invoices,
+                transactions,
+                top_n=top_n,
+                backend=backend,
+                min_partial_score=min_partial_score,
+                text_engine=text_engine,
+            )
             
-            # Sort by score and take top N for this invoice
-            invoice_candidates.sort(key=lambda x: x.score, reverse=True)
-            candidates.extend(invoice_candidates[:top_n])
+            written, removed = await write_candidates(session, tenant_id, scoring.candidates)
+            await session.commit()
         
-        # Global sort and limit
-        candidates.sort(key=lambda x: x.score, reverse=True)
+        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        
+        return ReconcileTenantResult(
+            tenant_id=tenant_id,
+            processed_invoices=len(invoices),
+            processed_transactions=len(transactions),
+            candidates_written=written,
+            candidates_removed=removed,
+            duration_ms=duration_ms,
+        )
+    
+    def propose_assignment(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        top_n: int = 5,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+        exact_max_cells: int = EXACT_MAX_CELLS,
+    ) -> AssignmentResult:
+        """
+        Propose at most one transaction per invoice and one invoice per transaction.
+        
+        Scores candidates as score_candidates does, then solves a one-to-one
+        assignment over the candidate graph, one connected component at a time.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: List of invoice dictionaries
+            transactions: List of transaction dictionaries
+            top_n: Candidates per invoice kept as edges of the graph
+            backend: Engine for the amount and date components
+            min_partial_score: Skip text and vendor scoring below this
+                amount plus date score
+            text_engine: Description similarity engine to use instead of
+                the tenant's engine
+            exact_max_cells: Largest invoice x transaction component solved
+                exactly; larger components are solved greedily
+            
+        Returns:
+            AssignmentResult with conflict-free proposals and their total score
+        """
+        start_time = datetime.now()
+        
+        scoring = self.score_candidates(
+            tenant_id, invoices, transactions, top_n=top_n, backend=backend,
+            min_partial_score=min_partial_score, text_engine=text_engine,
+        )
+        edges = [(c.invoice_id, c.transaction_id, c.score) for c in scoring.candidates]
+        chosen, stats = assign(edges, exact_max_cells)
+        
+        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        
+        return AssignmentResult(
+            proposals=[scoring.candidates[index] for index in chosen],
+            total_score=stats.total_score,
+            candidate_edges=len(edges),
+            components=stats.components,
+            exact_components=stats.exact_components,
+            duration_ms=duration_ms,
+        )
+    
+    def sync_working_set(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+    ) -> WorkingSetResult:
+        """Replace the tenant's retained working set with a full upload."""
+        return self.describe_working_set(
+            tenant_id, self.working_sets.sync(tenant_id, invoices, transactions)
+        )
+    
+    def apply_working_set_delta(
+        self,
+        tenant_id: str,
+        base_version: str,
+        upsert_invoices: List[Dict[str, Any]],
+        remove_invoice_ids: List[str],
+        upsert_transactions: List[Dict[str, Any]],
+        remove_transaction_ids: List[str],
+    ) -> WorkingSetResult:
+        """
+        Apply added, changed and removed records to the tenant's working set.
+        
+        Args:
+            tenant_id: Tenant identifier
+            base_version: Version the client's delta was computed against
+            upsert_invoices: Invoices added or changed since base_version
+            remove_invoice_ids: Ids of invoices removed since base_version
+            upsert_transactions: Transactions added or changed since base_version
+            remove_transaction_ids: Ids of transactions removed since base_version
+            
+        Returns:
+            WorkingSetResult with the new version
+            
+        Raises:
+            StaleWorkingSetError: If the server is not at base_version; the
+                client must resync with sync_working_set
+        """
+        working_set = self.working_sets.apply_delta(
+            tenant_id, base_version, upsert_invoices, remove_invoice_ids,
+            upsert_transactions, remove_transaction_ids,
+        )
+        return self.describe_working_set(tenant_id, working_set)
+    
+    def describe_working_set(self, tenant_id: str, working_set: TenantWorkingSet) -> WorkingSetResult:
+        """Describe a tenant working set for the GraphQL API."""
+        return WorkingSetResult(
+            tenant_id=tenant_id,
+            version=working_set.version,
+            invoices=len(working_set.invoices),
+            transactions=len(working_set.transactions),
+        )
+    
+    def score_working_set(
+        self,
+        tenant_id: str,
+        version: str,
+        top_n: int = 5,
+        full_scan_fallback: bool = False,
+        plan: Optional[BlockingPlan] = None,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> ScoringResult:
+        """
+        Score the tenant's retained working set.
+        
+        Takes the same options as score_candidates, with the working set
+        version in place of the records.
+        
+        Raises:
+            StaleWorkingSetError: If the working set is not at this version
+        """
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"Scoring backend must be one of: {', '.join(SCORING_BACKENDS)}")
+        
+        start_time = datetime.now()
+        
+        invoice_records, transaction_records = self.working_sets.snapshot(tenant_id, version)
+        candidates = self._score_records(
+            tenant_id, invoice_records, transaction_records, top_n,
+            full_scan_fallback, plan, backend, min_partial_score, text_engine, workers,
+        )
         
         duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
         
         return ScoringResult(
             candidates=candidates,
-            processed_invoices=len(invoices),
-            processed_transactions=len(transactions),
+            processed_invoices=len(invoice_records),
+            processed_transactions=len(transaction_records),
             duration_ms=duration_ms,
         )
     
+    def rescore_working_set(
+        self,
+        tenant_id: str,
+        version: str,
+        top_n: int = 5,
+        full_scan_fallback: bool = False,
+        plan: Optional[BlockingPlan] = None,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+    ) -> IncrementalScoringResult:
+        """
+        Re-rank the tenant's working set, scoring only pairs touched since the last run.
+        
+        Invoices keep their top-N between calls. Only records changed by
+        deltas since the previous call are scored, and the result equals a
+        full score_working_set run. Options that make pair scores depend on
+        the whole batch (the TF-IDF engine, full-scan fallback) and any
+        change of options re-rank every invoice.
+        
+        Args:
+            tenant_id: Tenant identifier
+            version: Working set version the client expects to be scored
+            top_n: Number of top candidates to return per invoice
+            full_scan_fallback: Score invoices with no blocked candidates
+                against every transaction
+            plan: Blocking plan to use instead of the tenant's plan
+            backend: Engine for the amount and date components
+            min_partial_score: Skip text and vendor scoring below this
+                amount plus date score
+            text_engine: Description similarity engine to use instead of
+                the tenant's engine
+            
+        Returns:
+            IncrementalScoringResult with every current candidate and the
+            invoices whose candidates changed
+            
+        Raises:
+            StaleWorkingSetError: If the working set is not at this version
+        """
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"Scoring backend must be one of: {', '.join(SCORING_BACKENDS)}")
+        
+        start_time = datetime.now()
+        
+        plan = plan or self.get_blocking_plan(tenant_id)
+        if full_scan_fallback and not plan.full_scan_fallback:
+            plan = dataclasses.replace(plan, full_scan_fallback=True)
+        text_engine = text_engine or self.get_text_engine(tenant_id)
+        settings = ranker_settings(top_n, plan, backend, min_partial_score, text_engine)
+        
+        def rank(invoices: List[InvoiceRecord], transactions: List[TransactionRecord]):
+            _, context = self._request_context(
+                tenant_id, invoices, transactions, False, plan, text_engine
+            )
+            runs = self._iter_runs(
+                invoices, transactions, plan, backend, min_partial_score, context, top_n
+            )
+            for invoice, run in zip(invoices, runs):
+                yield invoice.id, [
+                    (key, transactions[position].id, score_result)
+                    for key, _, position, score_result in run
+                ]
+        
+        working_set = self.working_sets.current(tenant_id, version)
+        with working_set.rank_lock:
+            invoices, transactions, changed_invoices, changed_transactions = (
+                self.working_sets.take_changes(tenant_id, working_set, version)
+            )
+            
+            ranker = working_set.ranker
+            rebuild = settings is None or ranker is None or ranker.settings != settings
+            if ranker is None:
+                ranker = IncrementalRanker(settings, top_n)
+            ranker.settings, ranker.top_n = settings, top_n
+            
+            try:
+                changed, rescored = ranker.update(
+                    rank, invoices, transactions, changed_invoices, changed_transactions, rebuild
+                )
+            except Exception:
+                # A half-applied update cannot be patched later
+                working_set.ranker = None
+                raise
+            working_set.ranker = ranker
+            
+            invoice_by_id = {invoice.id: invoice for invoice in invoices}
+            transaction_by_id = {transaction.id: transaction for transaction in transactions}
+            candidates = [
+                self._build_candidate(
+                    invoice_by_id[invoice_id], transaction_by_id[transaction_id], score_result
+                )
+                for _, invoice_id, transaction_id, score_result in ranker.ranked(invoices)
+            ]
+        
+        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        
+        return IncrementalScoringResult(
+            tenant_id=tenant_id,
+            version=version,
+            candidates=candidates,
+            changed_invoice_ids=sorted(changed, key=str),
+            rescored_invoices=rescored,
+            incremental=not rebuild,
+            duration_ms=duration_ms,
+        )
+    
+    def _score_records(
+        self,
+        tenant_id: str,
+        invoice_records: List[InvoiceRecord],
+        transaction_records: List[TransactionRecord],
+        top_n: int,
+        full_scan_fallback: bool,
+        plan: Optional[BlockingPlan],
+        backend: str,
+        min_partial_score: int,
+        text_engine: Optional[str],
+        workers: Optional[int],
+        indexes: Optional[PreparedTransactions] = None,
+    ) -> List[ReconciliationCandidate]:
+        """Rank candidates for prepared records."""
+        return [
+            self._build_candidate(invoice, transaction, score_result)
+            for invoice, transaction, score_result in self._rank_records(
+                tenant_id, invoice_records, transaction_records, top_n, full_scan_fallback,
+                plan, backend, min_partial_score, text_engine, workers, indexes,
+            )
+        ]
+    
+    def _rank_records(
+        self,
+        tenant_id: str,
+        invoice_records: List[InvoiceRecord],
+        transaction_records: List[TransactionRecord],
+        top_n: int,
+        full_scan_fallback: bool,
+        plan: Optional[BlockingPlan],
+        backend: str,
+        min_partial_score: int,
+        text_engine: Optional[str],
+        workers: Optional[int],
+        indexes: Optional[PreparedTransactions] = None,
+    ) -> Iterator[Tuple[InvoiceRecord, TransactionRecord, Dict[str, int]]]:
+        """Ranked (invoice, transaction, score result) triples for prepared records."""
+        plan, context = self._request_context(
+            tenant_id, invoice_records, transaction_records, full_scan_fallback, plan, text_engine,
+            indexes,
+        )
+        
+        workers = self.scoring_workers if workers is None else workers
+        if workers > 1 and len(invoice_records) >= self.parallel_min_invoices:
+            runs = rank_runs_parallel(
+                self, invoice_records, transaction_records, plan, backend,
+                min_partial_score, context, top_n, workers,
+            )
+        else:
+            runs = self._rank_runs(
+                invoice_records, transaction_records, plan, backend, min_partial_score, context, top_n
+            )
+        
+        # Global order is a k-way merge of the per-invoice runs
+        return (
+            (invoice_records[index], transaction_records[position], score_result)
+            for _, index, position, score_result in merge_ranked(runs)
+        )
+    
+    def iter_candidates(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        top_n: int = 5,
+        full_scan_fallback: bool = False,
+        plan: Optional[BlockingPlan] = None,
+        backend: str = "python",
+        min_partial_score: int = 0,
+        text_engine: Optional[str] = None,
+        start: int = 0,
+    ) -> Iterator[Tuple[str, List[ReconciliationCandidate]]]:
+        """
+        Stream each invoice's top-N candidates as soon as it is scored.
+        
+        Takes the same arguments as score_candidates. Invoices are yielded
+        in input order, including those without candidates; within an
+        invoice, candidates are ordered as in score_candidates. With start,
+        scoring resumes at that invoice, and the candidates are the ones
+        the whole batch would give.
+        
+        Yields:
+            (invoice id, ranked candidates) for each invoice
+        """
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"Scoring backend must be one of: {', '.join(SCORING_BACKENDS)}")
+        
+        invoice_records = self.index_cache.invoices(tenant_id, invoices).records
+        prepared_transactions = self.index_cache.transactions(tenant_id, transactions)
+        transaction_records = prepared_transactions.records
+        plan, context = self._request_context(
+            tenant_id, invoice_records, transaction_records, full_scan_fallback, plan, text_engine,
+            prepared_transactions,
+        )
+        
+        # Validation above runs eagerly; scoring starts when iteration does
+        remaining = invoice_records[start:]
+        runs = self._iter_runs(
+            remaining, transaction_records, plan, backend, min_partial_score, context, top_n, start
+        )
+        return self._stream_candidates(remaining, transaction_records, runs)
+    
+    def _stream_candidates(
+        self,
+        invoice_records: List[InvoiceRecord],
+        transaction_records: List[TransactionRecord],
+        runs: Iterator[List[Tuple]],
+    ) -> Iterator[Tuple[str, List[ReconciliationCandidate]]]:
+        for invoice, run in zip(invoice_records, runs):
+            yield invoice.id, [
+                self._build_candidate(invoice, transaction_records[position], score_result)
+                for _, _, position, score_result in run
+            ]
+    
+    def _request_context(
+        self,
+        tenant_id: str,
+        invoice_records: List[InvoiceRecord],
+        transaction_records: List[TransactionRecord],
+        full_scan_fallback: bool,
+        plan: Optional[BlockingPlan],
+        text_engine: Optional[str],
+        indexes: Optional[PreparedTransactions] = None,
+    ) -> Tuple[BlockingPlan, ScoringContext]:
+        """Resolve the plan and build the per-request scoring context."""
+        plan = plan or self.get_blocking_plan(tenant_id)
+        if full_scan_fallback and not plan.full_scan_fallback:
+            plan = dataclasses.replace(plan, full_scan_fallback=True)
+        
+        automaton = self._vendor_automaton(tenant_id, invoice_records)
+        if indexes is not None:
+            vendor_index = indexes.vendor_index(automaton)
+        else:
+            vendor_index = VendorMentionIndex(automaton, transaction_records)
+        
+        context = ScoringContext(
+            text_engine=create_text_engine(
+                text_engine or self.get_text_engine(tenant_id), invoice_records, transaction_records,
+                self.similarity_memo,
+            ),
+            vendor_index=vendor_index,
+            indexes=indexes,
+        )
+        
+        return plan, context
+    
+    def _build_candidate(
+        self,
+        invoice: InvoiceRecord,
+        transaction: TransactionRecord,
+        score_result: Dict[str, int],
+    ) -> ReconciliationCandidate:
+        """Build the GraphQL candidate for a returned pair."""
+        return ReconciliationCandidate(
+            invoice_id=invoice.id,
+            transaction_id=transaction.id,
+            score=score_result["total_score"],
+            score_breakdown=ScoreBreakdown(
+                exact_amount=score_result["exact_amount"],
+                date_proximity=score_result["date_proximity"],
+                text_similarity=score_result["text_similarity"],
+                vendor_match=score_result["vendor_match"],
+                total=score_result["total_score"],
+            ),
+            explainer=functools.partial(
+                self.generate_explanation, invoice.source, transaction.source, score_result
+            ),
+        )
+    
+    def _rank_runs(
+        self,
+        invoices: List[InvoiceRecord],
+        transactions: List[TransactionRecord],
+        plan: BlockingPlan,
+        backend: str,
+        min_partial_score: int,
+        context: Optional[ScoringContext],
+        top_n: int,
+        offset: int = 0,
+    ) -> List[List[Tuple]]:
+        """Each invoice's top N as a run of (key, invoice index, position, breakdown)."""
+        return list(self._iter_runs(
+            invoices, transactions, plan, backend, min_partial_score, context, top_n, offset
+        ))
+    
+    def _iter_runs(
+        self,
+        invoices: List[InvoiceRecord],
+        transactions: List[TransactionRecord],
+        plan: BlockingPlan,
+        backend: str,
+        min_partial_score: int,
+        context: Optional[ScoringContext],
+        top_n: int,
+        offset: int = 0,
+    ) -> Iterator[List[Tuple]]:
+        """Yield each invoice's run as soon as the invoice is scored."""
+        transaction_ids = [transaction.id for transaction in transactions]
+        
+        # Keep each invoice's top N in a bounded heap as it is scored
+        for index, (invoice, scored) in enumerate(
+            self._iter_scores(invoices, transactions, plan, backend, min_partial_score, context),
+            offset,
+        ):
+            yield [
+                (key, index, position, score_result)
+                for key, position, score_result in top_pairs(
+                    invoice.id, transaction_ids, scored, top_n
+                )
+            ]
+    
+    def _iter_scores(
+        self,
+        invoices: List[InvoiceRecord],
+        transactions: List[TransactionRecord],
+        plan: BlockingPlan,
+        backend: str,
+        min_partial_score: int,
+        context: Optional[ScoringContext] = None,
+    ) -> Iterator[Tuple[InvoiceRecord, List[Tuple[int, Dict[str, int]]]]]:
+        """Yield each invoice with the (position, breakdown) pairs that pass blocking."""
+        indexes = context.indexes if context is not None else None
+        if indexes is not None and indexes.records is not transactions:
+            # Cached indexes only apply to the transactions they were built over
+            indexes = None
+        
+        if backend == "numpy":
+            if indexes is not None:
+                scorer = indexes.vectorized(self, plan)
+            else:
+                # Imported lazily so the pure-Python engine works without NumPy
+                from app.services.vectorized import VectorizedScorer
+                
+                scorer = VectorizedScorer(self, transactions, plan)
+            yield from scorer.iter_scores(invoices, min_partial_score, context)
+            return
+        
+        if indexes is not None:
+            planner = indexes.planner(self, plan)
+        else:
+            planner = BlockingPlanner(self, transactions, plan)
+        for invoice in invoices:
+            yield invoice, self._score_positions(
+                invoice, transactions, planner.candidates(invoice), min_partial_score, context
+            )
+    
+    def _score_positions(
+        self,
+        invoice: InvoiceRecord,
+        transactions: List[TransactionRecord],
+        positions: List[int],
+        min_partial_score: int = 0,
+        context: Optional[ScoringContext] = None,
+    ) -> List[Tuple[int, Dict[str, int]]]:
+        """Score an invoice against the transactions at the given positions."""
+        partial = []
+        for position in positions:
+            transaction = transactions[position]
+            amount_score = self._score_amount_match(invoice, transaction)
+            date_score = self._score_date_proximity(invoice, transaction)
+            if amount_score + date_score >= min_partial_score:
+                partial.append((position, amount_score, date_score))
+        
+        return self._complete_scores(invoice, transactions, partial, context)
+    
+    def _complete_scores(
+        self,
+        invoice: InvoiceRecord,
+        transactions: List[TransactionRecord],
+        partial: List[Tuple[int, int, int]],
+        context: Optional[ScoringContext] = None,
+    ) -> List[Tuple[int, Dict[str, int]]]:
+        """Add text and vendor components to (position, amount, date) partial scores."""
+        context = context or ScoringContext()
+        matched = [transactions[position] for position, _, _ in partial]
+        text_scores = self._score_text_batch(invoice, matched, context.text_engine)
+        
+        scored = []
+        for (position, amount_score, date_score), transaction, text_score in zip(
+            partial, matched, text_scores
+        ):
+            vendor_score = self._score_vendor_match(invoice, transaction, context.vendor_index)
+            scored.append((position, {
+                "exact_amount": amount_score,
+                "date_proximity": date_score,
+                "text_similarity": text_score,
+                "vendor_match": vendor_score,
+                "total_score": amount_score + date_score + text_score + vendor_score,
+            }))
+        return scored
+    
+    def audit_recall(
+        self,
+        tenant_id: str,
+        invoices: List[Dict[str, Any]],
+        transactions: List[Dict[str, Any]],
+        top_n: int = 5,
+        sample_size: int = 100,
+        plan: Optional[BlockingPlan] = None,
+        seed: int = 0,
+    ) -> RecallAuditResult:
+        """
+        Compare a blocking plan against the exhaustive scorer on a sample.
+        
+        Args:
+            tenant_id: Tenant identifier
+            invoices: List of invoice dictionaries
+            transactions: List of transaction dictionaries
+            top_n: Number of top candidates compared per invoice
+            sample_size: Maximum number of invoices to audit
+            plan: Blocking plan to audit instead of the tenant's plan
+            seed: Seed for the invoice sample
+            
+        Returns:
+            RecallAuditResult with lost candidates and timings
+        """
+        plan = plan or self.get_blocking_plan(tenant_id)
+        
+        if len(invoices) > sample_size:
+            picked = sorted(random.Random(seed).sample(range(len(invoices)), sample_size))
+            invoices = [invoices[i] for i in picked]
+        
+        # Prepare the records up front so both timings cover scoring alone
+        invoice_records = self.index_cache.invoices(tenant_id, invoices).records
+        prepared_transactions = self.index_cache.transactions(tenant_id, transactions)
+        
+        def timed_run(run_plan: BlockingPlan) -> Tuple[List[ReconciliationCandidate], float]:
+            started = time.perf_counter()
+            candidates = self._score_records(
+                tenant_id, invoice_records, prepared_transactions.records, top_n,
+                False, run_plan, "python", 0, None, None, prepared_transactions,
+            )
+            return candidates, (time.perf_counter() - started) * 1000
+        
+        exhaustive, exhaustive_ms = timed_run(EXHAUSTIVE_PLAN)
+        blocked, blocked_ms = timed_run(plan)
+        
+        expected = {(c.invoice_id, c.transaction_id) for c in exhaustive}
+        retained = {(c.invoice_id, c.transaction_id) for c in blocked}
+        lost = len(expected - retained)
+        
+        return RecallAuditResult(
+            tenant_id=tenant_id,
+            plan=self.describe_blocking_plan(tenant_id, plan),
+            sampled_invoices=len(invoices),
+            exhaustive_candidates=len(expected),
+            lost_candidates=lost,
+            recall=1 - lost / len(expected) if expected else 1.0,
+            exhaustive_duration_ms=exhaustive_ms,
+            blocked_duration_ms=blocked_ms,
+            speedup=exhaustive_ms / blocked_ms if blocked_ms > 0 else 0.0,
+        )
+    
     def calculate_score(self, invoice: Dict[str, Any], transaction: Dict[str, Any]) -> Dict[str, int]:
         """Calculate matching score between invoice and transaction."""
+        return self.score_records(InvoiceRecord(invoice), TransactionRecord(transaction))
+    
+    def score_records(
+        self,
+        invoice: InvoiceRecord,
+        transaction: TransactionRecord,
+        context: Optional[ScoringContext] = None,
+    ) -> Dict[str, int]:
+        """Calculate matching score between prepared invoice and transaction records."""
+        context = context or ScoringContext()
         scores = {
             "exact_amount": self._score_amount_match(invoice, transaction),
             "date_proximity": self._score_date_proximity(invoice, transaction),
-            "text_similarity": self._score_text_similarity(invoice, transaction),
-            "vendor_match": self._score_vendor_match(invoice, transaction),
+            "text_similarity": self._score_text_similarity(invoice, transaction, context.text_engine),
+            "vendor_match": self._score_vendor_match(invoice, transaction, context.vendor_index),
         }
         
         scores["total_score"] = sum(scores.values())
         return scores
     
-    def _score_amount_match(self, invoice: Dict[str, Any], transaction: Dict[str, Any]) -> int:
+    def _score_amount_match(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> int:
         """Score based on amount matching (exact and tolerance)."""
-        try:
-            invoice_amount = float(invoice["amount"])
-            transaction_amount = float(transaction["amount"])
-            
-            # Exact match (strongest signal)
-            if abs(invoice_amount - transaction_amount) < 0.01:
-                return self.EXACT_AMOUNT_SCORE
-            
-            # Tolerance match (within 1%)
-            if abs(invoice_amount - transaction_amount) / invoice_amount <= self.AMOUNT_TOLERANCE_PERCENT:
-                return self.AMOUNT_TOLERANCE_SCORE
-            
-        except (ValueError, TypeError):
-            # Handle invalid amount formats
-            pass
+        invoice_amount = invoice.amount
+        transaction_amount = transaction.amount
         
-        return 0
-    
-    def _score_date_proximity(self, invoice: Dict[str, Any], transaction: Dict[str, Any]) -> int:
-        """Score based on date proximity."""
-        try:
-            invoice_date = self._parse_date(invoice.get("invoice_date"))
-            transaction_date = self._parse_date(transaction.get("posted_at"))
-            
-            if not invoice_date or not transaction_date:
-                return 0
-            
-            days_diff = abs((invoice_date - transaction_date).days)
-            
-            if days_diff <= 1:
-                return self.DATE_PROXIMITY_SCORE
-            elif days_diff <= 3:
-                return int(self.DATE_PROXIMITY_SCORE * 0.7)
-            elif days_diff <= 7:
-                return int(self.DATE_PROXIMITY_SCORE * 0.4)
-            
-        except (ValueError, TypeError):
-            pass
+        # Handle invalid amount formats
+        if invoice_amount is None or transaction_amount is None:
+            return 0
+        
+        # Exact match (strongest signal)
+        if abs(invoice_amount - transaction_amount) < 0.01:
+            return self.EXACT_AMOUNT_SCORE
+        
+        # Tolerance match (within 1%)
+        if abs(invoice_amount - transaction_amount) / invoice_amount <= self.AMOUNT_TOLERANCE_PERCENT:
+            return self.AMOUNT_TOLERANCE_SCORE
         
         return 0
     
-    def _score_text_similarity(self, invoice: Dict[str, Any], transaction: Dict[str, Any]) -> int:
-        """Score based on text similarity between descriptions."""
-        invoice_desc = invoice.get("description", "")
-        transaction_desc = transaction.get("description", "")
+    def _score_date_proximity(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> int:
+        """Score based on date proximity."""
+        if invoice.date_us is None or transaction.date_us is None:
+            return 0
         
-        if not invoice_desc or not transaction_desc:
+        # Naive and timezone-aware dates cannot be compared
+        if invoice.date_aware != transaction.date_aware:
             return 0
         
-        # Clean and normalize text
-        invoice_clean = self._clean_text(invoice_desc)
-        transaction_clean = self._clean_text(transaction_desc)
+        days_diff = abs((invoice.date_us - transaction.date_us) // DAY_MICROSECONDS)
+        
+        if days_diff <= 1:
+            return self.DATE_PROXIMITY_SCORE
+        elif days_diff <= 3:
+            return int(self.DATE_PROXIMITY_SCORE * 0.7)
+        elif days_diff <= 7:
+            return int(self.DATE_PROXIMITY_SCORE * 0.4)
         
-        if not invoice_clean or not transaction_clean:
+        return 0
+    
+    def _score_text_similarity(
+        self,
+        invoice: InvoiceRecord,
+        transaction: TransactionRecord,
+        text_engine: Optional[TextSimilarityEngine] = None,
+    ) -> int:
+        """Score based on text similarity between descriptions."""
+        if not invoice.description or not transaction.description:
             return 0
         
         # Calculate similarity ratio
-        similarity = SequenceMatcher(None, invoice_clean, transaction_clean).ratio()
+        if text_engine is None:
+            similarity = self.similarity_memo.ratio(
+                invoice.description, transaction.description, sequence_ratio
+            )
+        else:
+            similarity = text_engine.similarity(invoice, transaction)
         
         # Scale to maximum score
         return int(similarity * self.TEXT_SIMILARITY_SCORE)
     
-    def _score_vendor_match(self, invoice: Dict[str, Any], transaction: Dict[str, Any]) -> int:
-        """Score based on vendor name appearing in transaction description."""
-        vendor_name = invoice.get("vendor_name", "")
-        transaction_desc = transaction.get("description", "")
+    def _score_text_batch(
+        self,
+        invoice: InvoiceRecord,
+        transactions: List[TransactionRecord],
+        text_engine: Optional[TextSimilarityEngine] = None,
+    ) -> List[int]:
+        """Score text similarity of one invoice against several transactions."""
+        if text_engine is None or not invoice.description:
+            return [self._score_text_similarity(invoice, t) for t in transactions]
+        
+        comparable = [t for t in transactions if t.description]
+        similarities = iter(text_engine.similarities(invoice, comparable))
         
-        if not vendor_name or not transaction_desc:
+        return [
+            int(next(similarities) * self.TEXT_SIMILARITY_SCORE) if t.description else 0
+            for t in transactions
+        ]
+    
+    def _score_vendor_match(
+        self,
+        invoice: InvoiceRecord,
+        transaction: TransactionRecord,
+        vendor_index: Optional[VendorMentionIndex] = None,
+    ) -> int:
+        """Score based on vendor name appearing in transaction description."""
+        if invoice.vendor is None or not transaction.has_description:
             return 0
         
-        vendor_clean = self._clean_text(vendor_name)
-        transaction_clean = self._clean_text(transaction_desc)
+        if vendor_index is None:
+            matched = invoice.vendor in transaction.description
+        else:
+            matched = vendor_index.matches(invoice.vendor, transaction)
         
-        if vendor_clean in transaction_clean:
+        if matched:
             return self.VENDOR_MATCH_SCORE
         
         return 0
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime object."""
-        if not date_str:
-            return None
-        
-        try:
-            # Try ISO format first
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except ValueError:
-            pass
-        
-        # Try other common formats
-        formats = [
-            "%Y-%m-%d",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S",
-            "%m/%d/%Y",
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        return None
+        return parse_date(date_str)
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text for comparison."""
-        if not text:
-            return ""
-        
-        # Convert to lowercase and remove special characters
-        cleaned = re.sub(r'[^\\w\\s]', ' ', text.lower())
-        
-        # Remove extra whitespace
-        cleaned = re.sub(r'\\s+', ' ', cleaned).strip()
-        
-        return cleaned
+        return clean_text(text)
     
     def generate_explanation(
         self, invoice: Dict[str, Any], transaction: Dict[str, Any], score_result: Dict[str, int]
@@ -291,6 +1380,12 @@ class ReconciliationService:
         return ExplanationResult(
             explanation=explanation,
             confidence=confidence,
-            score_breakdown=request.score_breakdown,
+            score_breakdown=ScoreBreakdown(
+                exact_amount=request.score_breakdown.exact_amount,
+                date_proximity=request.score_breakdown.date_proximity,
+                text_similarity=request.score_breakdown.text_similarity,
+                vendor_match=request.score_breakdown.vendor_match,
+                total=request.score_breakdown.total,
+            ),
             ai_generated=False,
         )
\ No newline at end of file
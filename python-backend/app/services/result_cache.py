@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+# Memory budget for cached scoring results
+RESULT_CACHE_BYTES = int(os.getenv("SCORING_RESULT_CACHE_MB", "64")) * 1024 * 1024
+
+# Seconds a cached scoring result is served before it is recomputed
+RESULT_CACHE_TTL = float(os.getenv("SCORING_RESULT_CACHE_TTL_SECONDS", "300"))
+
+# SQLite file shared by every worker process; empty keeps the cache in-process
+RESULT_CACHE_DB = os.getenv("SCORING_RESULT_CACHE_DB", "")
+
+# Size budget for the shared on-disk cache (compressed payloads)
+RESULT_CACHE_DISK_BYTES = int(os.getenv("SCORING_RESULT_CACHE_DISK_MB", "512")) * 1024 * 1024
+
+# Rough footprint of a cached result and of each candidate with its
+# breakdown and explainer; input dictionaries are shared with the request
+RESULT_BYTES = 400
+CANDIDATE_BYTES = 700
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used_at_idx ON results (used_at);
+CREATE INDEX IF NOT EXISTS results_tenant_idx ON results (tenant_id);
+"""
+
+
+def request_key(
+    tenant_id: str,
+    settings: Dict[str, Any],
+    invoices: List[Dict[str, Any]],
+    transactions: List[Dict[str, Any]],
+) -> str:
+    """
+    Content hash of a scoring request.
+
+    Records are serialized with sorted keys, so dictionaries built in a
+    different field order give the same key; record order is kept.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for part in ([tenant_id, settings], invoices, transactions):
+        digest.update(json.dumps(part, sort_keys=True, separators=(",", ":"), default=str).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class DiskResultStore:
+    """
+    SQLite store for scoring results shared by the worker processes of a host.
+
+    Payloads are compressed JSON. Expired rows are deleted as they are
+    found, and the least recently used rows are deleted once the stored
+    size exceeds max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = RESULT_CACHE_DISK_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            # Other workers may hold the write lock briefly
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """The stored payload, or None; the flag is set when it had expired."""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT payload, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+            if row[1] <= now:
+                connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None, True
+            connection.execute("UPDATE results SET used_at = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[0])), False
+
+    def put(self, key: str, tenant_id: str, payload: Dict[str, Any], ttl: float) -> int:
+        """Store a payload; returns the number of rows evicted to make room."""
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+        if len(blob) > self.max_bytes:
+            return 0
+
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO results (key, tenant_id, payload, size, expires_at, used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, tenant_id, blob, len(blob), now + ttl, now),
+                )
+                evicted = self._evict(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return evicted
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        # Caller holds the lock and the write transaction
+        excess = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return 0
+        keys = []
+        for key, size in connection.execute("SELECT key, size FROM results ORDER BY used_at"):
+            keys.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        connection.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in keys])
+        return len(keys)
+
+    def invalidate(self, tenant_id: str) -> int:
+        """Delete every result for a tenant; returns the number deleted."""
+        with self._lock:
+            return self._connect().execute("DELETE FROM results WHERE tenant_id = ?", (tenant_id,)).rowcount
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class _Entry:
+    __slots__ = ("tenant_id", "result", "size", "expires_at")
+
+    def __init__(self, tenant_id: str, result: Any, size: int, expires_at: float):
+        self.tenant_id = tenant_id
+        self.result = result
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ScoringResultCache:
+    """
+    Process-wide LRU cache of scoring results, with an optional shared disk tier.
+
+    Results are keyed by request_key(), so any change to the inputs or the
+    scoring configuration misses. Entries expire after ttl seconds, and the
+    least recently used are evicted once the estimated size exceeds
+    max_bytes. With a disk store, results missing in memory are looked up
+    there and every new result is written there, so worker processes reuse
+    each other's work. Disk payloads hold the ranked rows only; rebuild
+    turns them back into a result using the request's own records.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_BYTES,
+        ttl: float = RESULT_CACHE_TTL,
+        disk: Optional[DiskResultStore] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and (self.max_bytes > 0 or self.disk is not None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, rebuild: Callable[[Dict[str, Any]], Any]) -> Optional[Any]:
+        """The cached result for key, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+
+        if self.disk is not None:
+            payload, expired = self.disk.get(key)
+            if payload is not None:
+                result = rebuild(payload)
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, payload["tenant_id"], result)
+                return result
+            if expired:
+                with self._lock:
+                    self.expirations += 1
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, tenant_id: str, result: Any, encode: Callable[[Any], Dict[str, Any]]):
+        """Cache a freshly computed result; encode gives its disk payload."""
+        self._remember(key, tenant_id, result)
+        if self.disk is not None:
+            payload = encode(result)
+            payload["tenant_id"] = tenant_id
+            evicted = self.disk.put(key, tenant_id, payload, self.ttl)
+            with self._lock:
+                self.evictions += evicted
+
+    def invalidate(self, tenant_id: str) -> int:
+        """Drop every result for a tenant, on disk too; returns the number dropped."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.tenant_id == tenant_id]
+            for key in keys:
+                self._drop(key)
+        dropped = len(keys)
+        if self.disk is not None:
+            dropped += self.disk.invalidate(tenant_id)
+        return dropped
+
+    def clear(self):
+        """Drop every entry, on disk too, and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = self.hits = self.disk_hits = self.misses = 0
+            self.evictions = self.expirations = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _remember(self, key: str, tenant_id: str, result: Any):
+        size = RESULT_BYTES + CANDIDATE_BYTES * len(result.candidates)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(tenant_id, result, size, time.monotonic() + self.ttl)
+            self.bytes += size
+            self._evict()
+
+    def _drop(self, key: str):
+        # Caller holds the lock
+        self.bytes -= self._entries.pop(key).size
+
+    def _evict(self):
+        # Caller holds the lock
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+
+def create_result_cache() -> ScoringResultCache:
+    """Result cache configured from the environment."""
+    disk = DiskResultStore(RESULT_CACHE_DB) if RESULT_CACHE_DB else None
+    return ScoringResultCache(disk=disk)
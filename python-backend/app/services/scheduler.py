@@ -0,0 +1,226 @@
+import asyncio
+import functools
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+# Threads running scoring jobs off the event loop
+SCORING_THREADS = int(os.getenv("SCORING_THREADS", "4"))
+
+# Jobs allowed to wait for a thread, across all tenants
+SCORING_QUEUE_LIMIT = int(os.getenv("SCORING_QUEUE_LIMIT", "64"))
+
+# Jobs of one tenant allowed to run at once; per-tenant scoring state is
+# not locked, so more than one is only safe for stateless calls
+SCORING_TENANT_CONCURRENCY = int(os.getenv("SCORING_TENANT_CONCURRENCY", "1"))
+
+# Jobs of one tenant allowed to wait, so one tenant cannot fill the queue
+SCORING_TENANT_QUEUE_LIMIT = int(os.getenv("SCORING_TENANT_QUEUE_LIMIT", "8"))
+
+# Weight of the latest job in the average run time behind retry hints
+RUN_TIME_SMOOTHING = 0.2
+
+
+class SchedulerBusy(Exception):
+    """Raised instead of queueing when the scoring queue is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("tenant_id", "call", "loop", "future")
+
+    def __init__(self, tenant_id: str, call: Callable[[], Any], loop: asyncio.AbstractEventLoop):
+        self.tenant_id = tenant_id
+        self.call = call
+        self.loop = loop
+        self.future = loop.create_future()
+
+
+class ScoringScheduler:
+    """
+    Runs CPU-bound scoring on a thread pool with per-tenant admission control.
+
+    Waiting jobs are kept in one queue per tenant, and free threads take
+    the next job from tenants in round-robin order, skipping tenants at
+    their concurrency limit. A month-end run therefore occupies at most
+    tenant_concurrency threads while small tenants keep being served. Jobs
+    that would exceed the global or per-tenant queue limit are rejected at
+    once with a retry hint instead of waiting.
+    """
+
+    def __init__(
+        self,
+        threads: int = SCORING_THREADS,
+        queue_limit: int = SCORING_QUEUE_LIMIT,
+        tenant_concurrency: int = SCORING_TENANT_CONCURRENCY,
+        tenant_queue_limit: int = SCORING_TENANT_QUEUE_LIMIT,
+    ):
+        self.threads = max(1, threads)
+        self.queue_limit = queue_limit
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.tenant_queue_limit = tenant_queue_limit
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Reentrant: a job that finishes at once completes inside _start
+        self._lock = threading.RLock()
+        self._waiting: Dict[str, Deque[_Job]] = {}
+        # Tenants with waiting jobs, in the order they will be served
+        self._turns: Deque[str] = deque()
+        self._running: Dict[str, int] = {}
+        self._active = 0
+        self._queued = 0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.average_seconds = 0.0
+
+    async def run(self, tenant_id: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on a scoring thread and return its result.
+
+        Raises:
+            SchedulerBusy: the job would wait beyond a queue limit
+        """
+        job = _Job(tenant_id, functools.partial(fn, *args, **kwargs), asyncio.get_running_loop())
+
+        with self._lock:
+            self._admit(job)
+            self._dispatch()
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            # A job still waiting is dropped; a running one finishes unobserved
+            with self._lock:
+                self._withdraw(job)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Thread occupancy, queue depth and admission counters."""
+        with self._lock:
+            return {
+                "threads": self.threads,
+                "active": self._active,
+                "queued": self._queued,
+                "queue_limit": self.queue_limit,
+                "waiting_tenants": len(self._turns),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "avg_run_ms": round(self.average_seconds * 1000, 2),
+            }
+
+    def shutdown(self):
+        """Stop the threads once running jobs finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _admit(self, job: _Job):
+        tenant_id = job.tenant_id
+        waiting = self._waiting.get(tenant_id)
+        # A job that can start right away never counts against the queue
+        can_start = (
+            self._active < self.threads
+            and self._running.get(tenant_id, 0) < self.tenant_concurrency
+        )
+        if not can_start:
+            if self._queued >= self.queue_limit:
+                self._reject(f"Scoring queue is full ({self._queued} waiting)")
+            if waiting is not None and len(waiting) >= self.tenant_queue_limit:
+                self._reject(f"Tenant {tenant_id} has {len(waiting)} scoring requests waiting")
+
+        if waiting is None:
+            waiting = self._waiting[tenant_id] = deque()
+            self._turns.append(tenant_id)
+        waiting.append(job)
+        self._queued += 1
+        self.admitted += 1
+
+    def _reject(self, message: str):
+        self.rejected += 1
+        # Time for the jobs ahead to clear the threads, at least one second
+        backlog = (self._queued + self._active) / self.threads
+        retry_after = max(1, math.ceil(backlog * self.average_seconds))
+        raise SchedulerBusy(message, retry_after)
+
+    def _withdraw(self, job: _Job):
+        waiting = self._waiting.get(job.tenant_id)
+        if waiting is None or job not in waiting:
+            return
+        waiting.remove(job)
+        self._queued -= 1
+        if not waiting:
+            del self._waiting[job.tenant_id]
+            self._turns.remove(job.tenant_id)
+
+    def _dispatch(self):
+        # One pass over the waiting tenants per free thread; each start
+        # moves the tenant to the back of the line
+        skipped = 0
+        while self._active < self.threads and self._turns and skipped < len(self._turns):
+            tenant_id = self._turns.popleft()
+            if self._running.get(tenant_id, 0) >= self.tenant_concurrency:
+                self._turns.append(tenant_id)
+                skipped += 1
+                continue
+
+            waiting = self._waiting[tenant_id]
+            job = waiting.popleft()
+            self._queued -= 1
+            if waiting:
+                self._turns.append(tenant_id)
+            else:
+                del self._waiting[tenant_id]
+            skipped = 0
+            self._start(job)
+
+    def _start(self, job: _Job):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="scoring")
+
+        self._active += 1
+        self._running[job.tenant_id] = self._running.get(job.tenant_id, 0) + 1
+        started = time.perf_counter()
+        future = self._executor.submit(job.call)
+        future.add_done_callback(functools.partial(self._finished, job, started))
+
+    def _finished(self, job: _Job, started: float, future: Future):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._active -= 1
+            running = self._running[job.tenant_id] - 1
+            if running:
+                self._running[job.tenant_id] = running
+            else:
+                del self._running[job.tenant_id]
+            self.completed += 1
+            if self.average_seconds:
+                self.average_seconds += RUN_TIME_SMOOTHING * (elapsed - self.average_seconds)
+            else:
+                self.average_seconds = elapsed
+            self._dispatch()
+
+        try:
+            job.loop.call_soon_threadsafe(self._settle, job, future)
+        except RuntimeError:
+            # The caller's event loop has closed; nobody is waiting
+            pass
+
+    @staticmethod
+    def _settle(job: _Job, future: Future):
+        if job.future.done():
+            return
+        error = future.exception()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(future.result())
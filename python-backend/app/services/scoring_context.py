@@ -0,0 +1,20 @@
+from typing import Optional
+from app.services.text_similarity import TextSimilarityEngine
+from app.services.vendor_index import VendorMentionIndex
+
+
+class ScoringContext:
+    """Per-request helpers shared by every pair scored in one call."""
+
+    __slots__ = ("text_engine", "vendor_index", "indexes")
+
+    def __init__(
+        self,
+        text_engine: Optional[TextSimilarityEngine] = None,
+        vendor_index: Optional[VendorMentionIndex] = None,
+        indexes=None,
+    ):
+        self.text_engine = text_engine
+        self.vendor_index = vendor_index
+        # Cached PreparedTransactions whose planners and scorers can be reused
+        self.indexes = indexes
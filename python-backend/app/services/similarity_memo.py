@@ -0,0 +1,159 @@
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# Description pairs whose similarity is remembered across requests
+SIMILARITY_MEMO_ENTRIES = int(os.getenv("SCORING_SIMILARITY_MEMO_ENTRIES", "1000000"))
+
+# File the memo is loaded from at startup and saved to at shutdown; empty
+# keeps it in memory only
+SIMILARITY_MEMO_PATH = os.getenv("SCORING_SIMILARITY_MEMO_PATH", "")
+
+# Identifies the file layout: entry count, then key pairs, then ratios
+FILE_MAGIC = b"SIMMEMO1"
+
+
+def description_hash(text: str) -> int:
+    """Stable 64-bit hash of a cleaned description, the same in every process."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class SimilarityMemo:
+    """
+    Bounded LRU memo of description-pair similarity ratios.
+
+    Entries are keyed by the stable hashes of the two cleaned descriptions,
+    in (invoice, transaction) order, so a description that recurs across
+    invoices, transactions or requests shares its entries. Each distinct
+    description is hashed once and its hash interned until the table of
+    hashes outgrows the memo. Ratios are exactly what the engine computed,
+    so scores are unchanged.
+    """
+
+    def __init__(self, max_entries: int = SIMILARITY_MEMO_ENTRIES, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._ratios: "OrderedDict[Tuple[int, int], float]" = OrderedDict()
+        self._hashes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ratios)
+
+    def __getstate__(self):
+        # Pool workers start with an empty memo of their own
+        return {"max_entries": self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_entries"])
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def ratio(self, first: str, second: str, compute: Callable[[str, str], float]) -> float:
+        """compute(first, second), from the memo when the pair was seen before."""
+        if self.max_entries <= 0:
+            return compute(first, second)
+
+        key = (self._hash(first), self._hash(second))
+        with self._lock:
+            ratio = self._ratios.get(key)
+            if ratio is not None:
+                self._ratios.move_to_end(key)
+                self.hits += 1
+                return ratio
+            self.misses += 1
+
+        # Computed outside the lock; a concurrent miss for the same pair just computes twice
+        ratio = compute(first, second)
+        with self._lock:
+            self._ratios[key] = ratio
+            if len(self._ratios) > self.max_entries:
+                self._ratios.popitem(last=False)
+                self.evictions += 1
+        return ratio
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._ratios.clear()
+            self._hashes.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def save(self, path: Optional[str] = None) -> int:
+        """Write the entries, least recently used first; returns the number written."""
+        path = path or self.path
+        if not path:
+            return 0
+
+        keys = array("Q")
+        ratios = array("d")
+        with self._lock:
+            for (first, second), ratio in self._ratios.items():
+                keys.append(first)
+                keys.append(second)
+                ratios.append(ratio)
+
+        # Written aside and renamed, so a reader never sees half a file
+        partial = f"{path}.tmp"
+        with open(partial, "wb") as handle:
+            handle.write(FILE_MAGIC)
+            handle.write(len(ratios).to_bytes(8, "little"))
+            handle.write(keys.tobytes())
+            handle.write(ratios.tobytes())
+        os.replace(partial, path)
+        return len(ratios)
+
+    def load(self, path: Optional[str] = None) -> int:
+        """Add the entries saved in a file, if it exists; returns the number loaded."""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return 0
+
+        with open(path, "rb") as handle:
+            data = handle.read()
+        count = int.from_bytes(data[len(FILE_MAGIC):len(FILE_MAGIC) + 8], "little")
+        keys = array("Q")
+        ratios = array("d")
+        offset = len(FILE_MAGIC) + 8
+        if data[:len(FILE_MAGIC)] != FILE_MAGIC or len(data) != offset + count * (2 * keys.itemsize + ratios.itemsize):
+            raise ValueError(f"{path} is not a similarity memo file")
+        keys.frombytes(data[offset:offset + 2 * count * keys.itemsize])
+        ratios.frombytes(data[offset + 2 * count * keys.itemsize:])
+
+        # Keep the most recently used entries that fit
+        start = max(0, count - self.max_entries)
+        with self._lock:
+            for index in range(start, count):
+                self._ratios[(keys[2 * index], keys[2 * index + 1])] = ratios[index]
+            while len(self._ratios) > self.max_entries:
+                self._ratios.popitem(last=False)
+        return count - start
+
+    def _hash(self, text: str) -> int:
+        hashed = self._hashes.get(text)
+        if hashed is None:
+            if len(self._hashes) >= self.max_entries:
+                # Hashes are cheap to recompute; start the table over
+                self._hashes = {}
+            hashed = self._hashes[text] = description_hash(text)
+        return hashed
+
+
+def create_similarity_memo() -> SimilarityMemo:
+    """Similarity memo configured from the environment, loaded from its file if there is one."""
+    memo = SimilarityMemo(path=SIMILARITY_MEMO_PATH or None)
+    try:
+        memo.load()
+    except (OSError, ValueError):
+        # A missing or damaged file only costs the warm start
+        pass
+    return memo
@@ -0,0 +1,69 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers with the same key.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs wait for the same task and get its result or exception.
+    A cancelled caller stops waiting without disturbing the others, and
+    the call itself is cancelled once nobody waits for it. Nothing is kept
+    after the call ends, so a failed call is retried by the next caller.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await call(), or the call already running for key."""
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is None or flight.task.get_loop() is not loop:
+            flight = _Flight(loop.create_task(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(functools.partial(self._landed, key, flight))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller's cancellation does not cancel the call
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # The last caller gave up; later callers start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Calls in flight, and how many callers started or joined one."""
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.joined,
+        }
+
+    def _landed(self, key: Hashable, flight: _Flight, task: asyncio.Task):
+        self._forget(key, flight)
+        if not task.cancelled():
+            # Retrieved here so a call whose callers all left is not reported
+            task.exception()
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
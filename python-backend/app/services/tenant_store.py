@@ -0,0 +1,214 @@
+import os
+import uuid
+from typing import List, Dict, Any, AsyncIterator, Tuple
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, Text, and_, delete, exists, func, insert,
+    literal, or_, select, text, true,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.graphql.types import ReconciliationCandidate
+from app.models import Invoice, Vendor, BankTransaction, MatchCandidate, MatchStatus
+from app.services.reconciliation_repository import OPEN_INVOICES
+
+# Rows fetched per round trip when streaming tenant data
+DB_BATCH_SIZE = int(os.getenv("RECONCILE_DB_BATCH_SIZE", "5000"))
+
+# Per-transaction staging table for bulk candidate writes; on Postgres it is
+# created LIKE match_candidates instead, and these types only describe it
+_staging = Table(
+    "match_candidates_staging",
+    MetaData(),
+    Column("id", String(36)),
+    Column("tenant_id", String(36)),
+    Column("invoice_id", String(36)),
+    Column("bank_transaction_id", String(36)),
+    Column("score", Integer),
+    Column("explanation", Text),
+    prefixes=["TEMPORARY"],
+)
+
+
+def _iso(value) -> Any:
+    # Scoring parses ISO strings; datetime objects would not score a date
+    return value.isoformat() if value is not None else None
+
+
+async def _stream_rows(session: AsyncSession, statement, batch_size: int) -> AsyncIterator:
+    result = await session.stream(statement.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        for row in partition:
+            yield row
+
+
+async def load_open_invoices(
+    session: AsyncSession, tenant_id: str, batch_size: int = DB_BATCH_SIZE
+) -> List[Dict[str, Any]]:
+    """Open invoices of a tenant as scoring dictionaries, streamed with a server-side cursor."""
+    statement = (
+        select(
+            Invoice.id,
+            Invoice.amount,
+            Invoice.currency,
+            Invoice.invoice_date,
+            Invoice.description,
+            Invoice.invoice_number,
+            Vendor.name.label("vendor_name"),
+        )
+        .outerjoin(Vendor, Invoice.vendor_id == Vendor.id)
+        .where(Invoice.tenant_id == tenant_id, OPEN_INVOICES)
+        .order_by(Invoice.id)
+    )
+
+    return [
+        {
+            "id": row.id,
+            "amount": float(row.amount),
+            "currency": row.currency.value,
+            "invoice_date": _iso(row.invoice_date),
+            "description": row.description or "",
+            "vendor_name": row.vendor_name or "",
+            "invoice_number": row.invoice_number,
+        }
+        async for row in _stream_rows(session, statement, batch_size)
+    ]
+
+
+async def load_unmatched_transactions(
+    session: AsyncSession, tenant_id: str, batch_size: int = DB_BATCH_SIZE
+) -> List[Dict[str, Any]]:
+    """Transactions of a tenant without a confirmed match, streamed with a server-side cursor."""
+    confirmed = exists().where(
+        MatchCandidate.bank_transaction_id == BankTransaction.id,
+        MatchCandidate.status == MatchStatus.CONFIRMED,
+    )
+    statement = (
+        select(
+            BankTransaction.id,
+            BankTransaction.amount,
+            BankTransaction.currency,
+            BankTransaction.posted_at,
+            BankTransaction.description,
+            BankTransaction.reference,
+        )
+        .where(BankTransaction.tenant_id == tenant_id, ~confirmed)
+        .order_by(BankTransaction.id)
+    )
+
+    return [
+        {
+            "id": row.id,
+            "amount": float(row.amount),
+            "currency": row.currency.value,
+            "posted_at": _iso(row.posted_at),
+            "description": row.description,
+            "reference": row.reference,
+        }
+        async for row in _stream_rows(session, statement, batch_size)
+    ]
+
+
+async def load_vendor_names(session: AsyncSession, tenant_id: str) -> List[str]:
+    """Names of a tenant's vendors."""
+    result = await session.execute(select(Vendor.name).where(Vendor.tenant_id == tenant_id))
+    return list(result.scalars())
+
+
+async def write_candidates(
+    session: AsyncSession, tenant_id: str, candidates: List[ReconciliationCandidate]
+) -> Tuple[int, int]:
+    """
+    Make the tenant's proposed match candidates equal to the given candidates.
+
+    Rows are bulk-loaded into a staging table, then upserted in one
+    statement. Unchanged rows are not rewritten, and confirmed or rejected
+    pairs are left alone. Proposed rows missing from the new candidates are
+    deleted. Everything runs in the session's transaction; the caller commits.
+
+    Returns:
+        Rows inserted or updated, and stale proposals deleted
+    """
+    connection = await session.connection()
+    rows = [
+        (
+            str(uuid.uuid4()),
+            tenant_id,
+            candidate.invoice_id,
+            candidate.transaction_id,
+            candidate.score,
+            candidate.explanation(),
+        )
+        for candidate in candidates
+    ]
+    await _stage_rows(connection, rows)
+
+    # SQLite only parses INSERT ... SELECT ... ON CONFLICT when the SELECT has a WHERE
+    target = MatchCandidate.__table__
+    dialect_insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    upsert = dialect_insert(target).from_select(
+        ["id", "tenant_id", "invoice_id", "bank_transaction_id", "score", "status",
+         "explanation", "created_at", "updated_at"],
+        select(
+            _staging.c.id,
+            _staging.c.tenant_id,
+            _staging.c.invoice_id,
+            _staging.c.bank_transaction_id,
+            _staging.c.score,
+            literal(MatchStatus.PROPOSED, target.c.status.type),
+            _staging.c.explanation,
+            func.now(),
+            func.now(),
+        ).where(true()),
+    )
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[target.c.tenant_id, target.c.invoice_id, target.c.bank_transaction_id],
+        set_={
+            "score": upsert.excluded.score,
+            "explanation": upsert.excluded.explanation,
+            "updated_at": func.now(),
+        },
+        where=and_(
+            target.c.status == MatchStatus.PROPOSED,
+            or_(
+                target.c.score.is_distinct_from(upsert.excluded.score),
+                target.c.explanation.is_distinct_from(upsert.excluded.explanation),
+            ),
+        ),
+    )
+    written = (await connection.execute(upsert)).rowcount
+
+    stale = delete(target).where(
+        target.c.tenant_id == tenant_id,
+        target.c.status == MatchStatus.PROPOSED,
+        ~exists().where(
+            _staging.c.invoice_id == target.c.invoice_id,
+            _staging.c.bank_transaction_id == target.c.bank_transaction_id,
+        ),
+    )
+    deleted = (await connection.execute(stale)).rowcount
+
+    await connection.execute(text(f"DROP TABLE {_staging.name}"))
+
+    return written, deleted
+
+
+async def _stage_rows(connection: AsyncConnection, rows: List[Tuple]):
+    if connection.dialect.name == "postgresql":
+        # Same column types as the target, so the join and upsert need no casts
+        await connection.execute(text(
+            f"CREATE TEMPORARY TABLE {_staging.name} "
+            f"(LIKE {MatchCandidate.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            _staging.name, records=rows, columns=[column.name for column in _staging.c]
+        )
+    else:
+        # Left behind if an earlier write on this connection failed
+        await connection.run_sync(_staging.drop, checkfirst=True)
+        await connection.run_sync(_staging.create)
+        if rows:
+            await connection.execute(
+                insert(_staging), [dict(zip(_staging.c.keys(), row)) for row in rows]
+            )
@@ -0,0 +1,145 @@
+import math
+from abc import ABC, abstractmethod
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import List, Dict, Optional
+from app.services.features import InvoiceRecord, TransactionRecord
+from app.services.similarity_memo import SimilarityMemo
+
+# Available description similarity engines
+TEXT_SIMILARITY_ENGINES = ("sequence", "tfidf")
+DEFAULT_TEXT_SIMILARITY_ENGINE = "sequence"
+
+# Character n-gram size for TF-IDF vectors
+NGRAM_SIZE = 3
+
+
+def sequence_ratio(first: str, second: str) -> float:
+    """difflib ratio of two descriptions."""
+    return SequenceMatcher(None, first, second).ratio()
+
+
+class TextSimilarityEngine(ABC):
+    """Similarity between cleaned, non-empty descriptions, in the range 0..1."""
+
+    @abstractmethod
+    def similarity(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> float:
+        """Similarity of one invoice and transaction description."""
+
+    def similarities(
+        self, invoice: InvoiceRecord, transactions: List[TransactionRecord]
+    ) -> List[float]:
+        """Similarities of one invoice against several transactions."""
+        return [self.similarity(invoice, transaction) for transaction in transactions]
+
+
+class SequenceMatcherEngine(TextSimilarityEngine):
+    """
+    difflib ratios with SequenceMatcher semantics.
+
+    Keeps one matcher per distinct transaction description, so the expensive
+    set_seq2 indexing runs once per description rather than once per pair.
+    With a memo, ratios of description pairs seen before, in this request
+    or an earlier one, are not recomputed.
+    """
+
+    def __init__(self, memo: Optional[SimilarityMemo] = None):
+        self._matchers: Dict[str, SequenceMatcher] = {}
+        self.memo = memo
+
+    def similarity(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> float:
+        if self.memo is None:
+            return self._ratio(invoice.description, transaction.description)
+        return self.memo.ratio(invoice.description, transaction.description, self._ratio)
+
+    def _ratio(self, invoice_description: str, transaction_description: str) -> float:
+        matcher = self._matchers.get(transaction_description)
+        if matcher is None:
+            matcher = SequenceMatcher(None)
+            matcher.set_seq2(transaction_description)
+            self._matchers[transaction_description] = matcher
+
+        matcher.set_seq1(invoice_description)
+        return matcher.ratio()
+
+
+class TfidfEngine(TextSimilarityEngine):
+    """
+    Cosine similarity of character n-gram TF-IDF vectors.
+
+    Each distinct description is vectorized once per request; an invoice is
+    compared to its candidates with sparse dot products over those vectors.
+    """
+
+    def __init__(
+        self,
+        invoices: List[InvoiceRecord],
+        transactions: List[TransactionRecord],
+        ngram_size: int = NGRAM_SIZE,
+    ):
+        self.ngram_size = ngram_size
+
+        documents = [r.description for r in invoices if r.description]
+        documents += [r.description for r in transactions if r.description]
+
+        distinct = set(documents)
+        document_frequency: Counter = Counter()
+        for document in distinct:
+            document_frequency.update(set(self._ngrams(document)))
+
+        # Smoothed inverse document frequency over distinct descriptions
+        total = len(distinct)
+        self._idf = {
+            gram: math.log((1 + total) / (1 + frequency)) + 1
+            for gram, frequency in document_frequency.items()
+        }
+        self._vectors: Dict[str, Dict[str, float]] = {}
+
+    def similarity(self, invoice: InvoiceRecord, transaction: TransactionRecord) -> float:
+        return self._dot(self._vector(invoice.description), self._vector(transaction.description))
+
+    def similarities(
+        self, invoice: InvoiceRecord, transactions: List[TransactionRecord]
+    ) -> List[float]:
+        vector = self._vector(invoice.description)
+        return [self._dot(vector, self._vector(t.description)) for t in transactions]
+
+    def _ngrams(self, text: str) -> List[str]:
+        padded = f" {text} "
+        if len(padded) <= self.ngram_size:
+            return [padded]
+        return [padded[i:i + self.ngram_size] for i in range(len(padded) - self.ngram_size + 1)]
+
+    def _vector(self, text: str) -> Dict[str, float]:
+        vector = self._vectors.get(text)
+        if vector is not None:
+            return vector
+
+        counts = Counter(self._ngrams(text))
+        weights = {gram: count * self._idf.get(gram, 1.0) for gram, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        vector = {gram: weight / norm for gram, weight in weights.items()}
+
+        self._vectors[text] = vector
+        return vector
+
+    def _dot(self, left: Dict[str, float], right: Dict[str, float]) -> float:
+        if len(left) > len(right):
+            left, right = right, left
+        return min(1.0, sum(weight * right.get(gram, 0.0) for gram, weight in left.items()))
+
+
+def create_text_engine(
+    name: str,
+    invoices: List[InvoiceRecord],
+    transactions: List[TransactionRecord],
+    memo: Optional[SimilarityMemo] = None,
+) -> TextSimilarityEngine:
+    """Build the named similarity engine for one scoring request."""
+    if name == "sequence":
+        return SequenceMatcherEngine(memo)
+
+    if name == "tfidf":
+        return TfidfEngine(invoices, transactions)
+
+    raise ValueError(f"Text similarity engine must be one of: {', '.join(TEXT_SIMILARITY_ENGINES)}")
@@ -0,0 +1,199 @@
+from typing import List, Dict, Iterator, Optional, Tuple
+import numpy as np
+from app.services.blocking import BlockingPlan, BlockingPlanner
+from app.services.features import InvoiceRecord, TransactionRecord, DAY_MICROSECONDS
+from app.services.scoring_context import ScoringContext
+
+# Upper bound on cells held in one chunk of the score matrix
+CHUNK_CELLS = 2_000_000
+
+# Currency code for records without a currency
+NO_CURRENCY = -1
+
+
+class VectorizedScorer:
+    """
+    NumPy scoring backend.
+
+    Computes the amount and date components for a chunk of invoices against
+    every transaction as matrix operations on integer-cents and microsecond
+    arrays, applies the blocking plan as a mask, and runs text and vendor
+    scoring only on the cells that survive. Component values are identical
+    to ReconciliationService.score_records.
+    """
+
+    def __init__(
+        self,
+        service,
+        transactions: List[TransactionRecord],
+        plan: BlockingPlan,
+        chunk_cells: int = CHUNK_CELLS,
+    ):
+        self.service = service
+        self.transactions = transactions
+        self.plan = plan
+        self.chunk_cells = chunk_cells
+
+        # Invalid amounts become NaN, which never earns an amount score
+        self._amounts = np.array(
+            [np.nan if t.amount is None else t.amount for t in transactions], dtype=np.float64
+        )
+        self._dates = np.array([t.date_us or 0 for t in transactions], dtype=np.int64)
+        self._has_date = np.array([t.date_us is not None for t in transactions], dtype=bool)
+        self._date_aware = np.array([t.date_aware for t in transactions], dtype=bool)
+
+        if "currency" in plan.keys:
+            self._currency_codes: Dict[str, int] = {}
+            self._currencies = np.array(
+                [self._currency_code(t.currency, add=True) for t in transactions], dtype=np.int64
+            )
+
+        if "vendor" in plan.keys:
+            self._vendor_planner = BlockingPlanner(
+                service, transactions, BlockingPlan(keys=("vendor",))
+            )
+
+        self._python_planner: Optional[BlockingPlanner] = None
+
+    def iter_scores(
+        self,
+        invoices: List[InvoiceRecord],
+        min_partial_score: int = 0,
+        context: Optional[ScoringContext] = None,
+    ) -> Iterator[Tuple[InvoiceRecord, List[Tuple[int, Dict[str, int]]]]]:
+        """Yield each invoice with its (position, score breakdown) pairs in input order."""
+        if not self.transactions:
+            for invoice in invoices:
+                yield invoice, []
+            return
+
+        rows = max(1, self.chunk_cells // len(self.transactions))
+        for start in range(0, len(invoices), rows):
+            chunk = invoices[start:start + rows]
+            amount_scores = self._amount_scores(chunk)
+            date_scores = self._date_scores(chunk)
+
+            mask = self._plan_mask(chunk, amount_scores, date_scores)
+            if min_partial_score > 0:
+                mask &= (amount_scores + date_scores) >= min_partial_score
+
+            for row, invoice in enumerate(chunk):
+                if invoice.amount == 0:
+                    # Tolerance against a zero amount is undefined; keep the
+                    # pure-Python behaviour for these invoices
+                    yield invoice, self._python_scores(invoice, min_partial_score, context)
+                    continue
+
+                positions = np.flatnonzero(mask[row])
+                partial = zip(
+                    positions.tolist(),
+                    amount_scores[row, positions].tolist(),
+                    date_scores[row, positions].tolist(),
+                )
+                yield invoice, self.service._complete_scores(
+                    invoice, self.transactions, list(partial), context
+                )
+
+    def _amount_scores(self, chunk: List[InvoiceRecord]) -> np.ndarray:
+        service = self.service
+        invoice_amounts = np.array(
+            [np.nan if i.amount is None else i.amount for i in chunk], dtype=np.float64
+        )[:, None]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            difference = np.abs(invoice_amounts - self._amounts)
+            within_tolerance = difference / invoice_amounts <= service.AMOUNT_TOLERANCE_PERCENT
+
+        return np.where(
+            difference < 0.01,
+            service.EXACT_AMOUNT_SCORE,
+            np.where(within_tolerance, service.AMOUNT_TOLERANCE_SCORE, 0),
+        )
+
+    def _date_scores(self, chunk: List[InvoiceRecord]) -> np.ndarray:
+        service = self.service
+        invoice_dates = np.array([i.date_us or 0 for i in chunk], dtype=np.int64)[:, None]
+        invoice_has_date = np.array([i.date_us is not None for i in chunk], dtype=bool)[:, None]
+        invoice_aware = np.array([i.date_aware for i in chunk], dtype=bool)[:, None]
+
+        days_diff = np.abs(np.floor_divide(invoice_dates - self._dates, DAY_MICROSECONDS))
+        comparable = invoice_has_date & self._has_date & (invoice_aware == self._date_aware)
+
+        scores = np.select(
+            [days_diff <= 1, days_diff <= 3, days_diff <= 7],
+            [
+                service.DATE_PROXIMITY_SCORE,
+                int(service.DATE_PROXIMITY_SCORE * 0.7),
+                int(service.DATE_PROXIMITY_SCORE * 0.4),
+            ],
+            0,
+        )
+        return np.where(comparable, scores, 0)
+
+    def _plan_mask(
+        self, chunk: List[InvoiceRecord], amount_scores: np.ndarray, date_scores: np.ndarray
+    ) -> np.ndarray:
+        if self.plan.is_exhaustive:
+            return np.ones(amount_scores.shape, dtype=bool)
+
+        masks = [
+            self._key_mask(key, chunk, amount_scores, date_scores) for key in self.plan.keys
+        ]
+        if self.plan.match == "all":
+            mask = np.logical_and.reduce(masks)
+        else:
+            mask = np.logical_or.reduce(masks)
+
+        if self.plan.full_scan_fallback:
+            mask[~mask.any(axis=1)] = True
+
+        return mask
+
+    def _key_mask(
+        self,
+        key: str,
+        chunk: List[InvoiceRecord],
+        amount_scores: np.ndarray,
+        date_scores: np.ndarray,
+    ) -> np.ndarray:
+        if key == "amount":
+            return amount_scores > 0
+
+        if key == "date":
+            return date_scores > 0
+
+        if key == "currency":
+            codes = np.array([self._currency_code(i.currency) for i in chunk], dtype=np.int64)[:, None]
+            return (codes == NO_CURRENCY) | (self._currencies == NO_CURRENCY) | (codes == self._currencies)
+
+        mask = np.zeros(amount_scores.shape, dtype=bool)
+        for row, invoice in enumerate(chunk):
+            mask[row, self._vendor_planner.candidates(invoice)] = True
+        return mask
+
+    def _currency_code(self, currency: Optional[str], add: bool = False) -> int:
+        if currency is None:
+            return NO_CURRENCY
+
+        if add:
+            return self._currency_codes.setdefault(currency, len(self._currency_codes))
+
+        # Unknown invoice currencies only match transactions without one
+        return self._currency_codes.get(currency, NO_CURRENCY - 1)
+
+    def _python_scores(
+        self,
+        invoice: InvoiceRecord,
+        min_partial_score: int,
+        context: Optional[ScoringContext],
+    ) -> List[Tuple[int, Dict[str, int]]]:
+        if self._python_planner is None:
+            self._python_planner = BlockingPlanner(self.service, self.transactions, self.plan)
+
+        return self.service._score_positions(
+            invoice,
+            self.transactions,
+            self._python_planner.candidates(invoice),
+            min_partial_score,
+            context,
+        )
@@ -0,0 +1,116 @@
+from collections import deque
+from typing import List, Dict, Iterable, FrozenSet, Optional
+from app.services.features import TransactionRecord
+
+
+class VendorAutomaton:
+    """
+    Aho-Corasick automaton over cleaned vendor names.
+
+    Finds every vendor name occurring in a description in a single pass,
+    however many vendors the tenant has.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: FrozenSet[str] = frozenset(p for p in patterns if p)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]
+        # Nearest state along the failure chain that ends a pattern
+        self._dict_link: List[int] = [0]
+
+        for pattern in sorted(self.patterns):
+            self._insert(pattern)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Return the vendor names occurring anywhere in the text."""
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        found = set()
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if output[state] is not None:
+                found.add(output[state])
+
+            link = dict_link[state]
+            while link:
+                found.add(output[link])
+                link = dict_link[link]
+
+        return frozenset(found)
+
+    def _insert(self, pattern: str):
+        state = 0
+        for char in pattern:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[state][char] = following
+            state = following
+        self._output[state] = pattern
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+
+                self._fail[following] = target
+                self._dict_link[following] = (
+                    target if self._output[target] is not None else self._dict_link[target]
+                )
+
+
+class VendorMentionIndex:
+    """
+    Vendors mentioned by each transaction description in a request.
+
+    Every distinct description is scanned once; the vendor component then
+    becomes a set-membership check per pair.
+    """
+
+    def __init__(self, automaton: VendorAutomaton, transactions: List[TransactionRecord]):
+        self.automaton = automaton
+        self._mentions: Dict[str, FrozenSet[str]] = {}
+
+        for transaction in transactions:
+            if transaction.description not in self._mentions:
+                self._mentions[transaction.description] = automaton.find(transaction.description)
+
+    def mentions(self, transaction: TransactionRecord) -> FrozenSet[str]:
+        """Return the vendor names the transaction description mentions."""
+        found = self._mentions.get(transaction.description)
+        if found is None:
+            found = self.automaton.find(transaction.description)
+            self._mentions[transaction.description] = found
+        return found
+
+    def matches(self, vendor: str, transaction: TransactionRecord) -> bool:
+        """Whether the cleaned vendor name occurs in the transaction description."""
+        if not vendor:
+            # An empty name is a substring of every description
+            return True
+
+        if vendor not in self.automaton.patterns:
+            return vendor in transaction.description
+
+        return vendor in self.mentions(transaction)
@@ -0,0 +1,177 @@
+import threading
+import uuid
+from typing import List, Dict, Any, Optional, Set, Tuple
+from app.services.features import InvoiceRecord, TransactionRecord
+
+
+class StaleWorkingSetError(ValueError):
+    """A delta or scoring request was based on a version the server no longer holds."""
+
+    def __init__(self, tenant_id: str, expected: str, actual: Optional[str]):
+        self.tenant_id = tenant_id
+        self.expected = expected
+        self.actual = actual
+        held = "has not been uploaded" if actual is None else f"is at version {actual}"
+        super().__init__(
+            f"Working set for tenant {tenant_id} {held}, expected version {expected}; "
+            "full resync required"
+        )
+
+
+class TenantWorkingSet:
+    """
+    Prepared invoices and transactions retained for one tenant.
+
+    Records are keyed by id and kept in insertion order. Every change bumps
+    the version, which clients echo back to prove they are in sync. Versions
+    are opaque tokens: each sync starts a new random epoch, so a token from
+    before a restart, or from another worker process, never matches.
+    """
+
+    def __init__(self, invoices: List[Dict[str, Any]], transactions: List[Dict[str, Any]]):
+        self.invoices: Dict[str, InvoiceRecord] = {}
+        self.transactions: Dict[str, TransactionRecord] = {}
+        self.epoch = uuid.uuid4().hex
+        self.revision = 1
+        self._upsert(*self._prepare(invoices, transactions))
+
+        # Ids touched since the incremental ranker last caught up
+        self.changed_invoices: Set[str] = set()
+        self.changed_transactions: Set[str] = set()
+        self.ranker = None
+        self.rank_lock = threading.Lock()
+
+    def apply(
+        self,
+        upsert_invoices: List[Dict[str, Any]],
+        remove_invoice_ids: List[str],
+        upsert_transactions: List[Dict[str, Any]],
+        remove_transaction_ids: List[str],
+    ) -> str:
+        """Apply a delta and return the new version; a delta that fails changes nothing."""
+        invoices, transactions = self._prepare(upsert_invoices, upsert_transactions)
+
+        for invoice_id in remove_invoice_ids:
+            self.invoices.pop(invoice_id, None)
+        for transaction_id in remove_transaction_ids:
+            self.transactions.pop(transaction_id, None)
+
+        self._upsert(invoices, transactions)
+
+        self.changed_invoices.update(remove_invoice_ids)
+        self.changed_invoices.update(invoice["id"] for invoice in upsert_invoices)
+        self.changed_transactions.update(remove_transaction_ids)
+        self.changed_transactions.update(transaction["id"] for transaction in upsert_transactions)
+        self.revision += 1
+        return self.version
+
+    @property
+    def version(self) -> str:
+        """Opaque version token."""
+        return f"{self.epoch}:{self.revision}"
+
+    def snapshot(self) -> Tuple[str, List[InvoiceRecord], List[TransactionRecord]]:
+        """Current version with lists of the retained records."""
+        return self.version, list(self.invoices.values()), list(self.transactions.values())
+
+    @staticmethod
+    def _prepare(
+        invoices: List[Dict[str, Any]], transactions: List[Dict[str, Any]]
+    ) -> Tuple[List[InvoiceRecord], List[TransactionRecord]]:
+        # Records are prepared once here rather than on every scoring run
+        return [InvoiceRecord(invoice) for invoice in invoices], [
+            TransactionRecord(transaction) for transaction in transactions
+        ]
+
+    def _upsert(self, invoices: List[InvoiceRecord], transactions: List[TransactionRecord]):
+        for invoice in invoices:
+            self.invoices[invoice.id] = invoice
+        for transaction in transactions:
+            self.transactions[transaction.id] = transaction
+
+
+class WorkingSetStore:
+    """Versioned working sets for all tenants."""
+
+    def __init__(self):
+        self._sets: Dict[str, TenantWorkingSet] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str) -> Optional[TenantWorkingSet]:
+        """The tenant's working set, if one has been uploaded."""
+        return self._sets.get(tenant_id)
+
+    def sync(
+        self, tenant_id: str, invoices: List[Dict[str, Any]], transactions: List[Dict[str, Any]]
+    ) -> TenantWorkingSet:
+        """Replace the tenant's working set with a full upload."""
+        # Prepared outside the lock; a concurrent sync simply wins or loses
+        working_set = TenantWorkingSet(invoices, transactions)
+        with self._lock:
+            self._sets[tenant_id] = working_set
+            return working_set
+
+    def apply_delta(
+        self,
+        tenant_id: str,
+        base_version: str,
+        upsert_invoices: List[Dict[str, Any]],
+        remove_invoice_ids: List[str],
+        upsert_transactions: List[Dict[str, Any]],
+        remove_transaction_ids: List[str],
+    ) -> TenantWorkingSet:
+        """Apply a delta made against base_version; refuse it if the tenant has moved on."""
+        with self._lock:
+            working_set = self._sets.get(tenant_id)
+            self._check_version(tenant_id, working_set, base_version)
+            working_set.apply(
+                upsert_invoices, remove_invoice_ids, upsert_transactions, remove_transaction_ids
+            )
+            return working_set
+
+    def snapshot(
+        self, tenant_id: str, version: str
+    ) -> Tuple[List[InvoiceRecord], List[TransactionRecord]]:
+        """Records of the tenant's working set, which must be at the given version."""
+        with self._lock:
+            working_set = self._sets.get(tenant_id)
+            self._check_version(tenant_id, working_set, version)
+            _, invoices, transactions = working_set.snapshot()
+            return invoices, transactions
+
+    def current(self, tenant_id: str, version: str) -> TenantWorkingSet:
+        """The tenant's working set, which must be at the given version."""
+        with self._lock:
+            working_set = self._sets.get(tenant_id)
+            self._check_version(tenant_id, working_set, version)
+            return working_set
+
+    def take_changes(
+        self, tenant_id: str, working_set: TenantWorkingSet, version: str
+    ) -> Tuple[List[InvoiceRecord], List[TransactionRecord], Set[str], Set[str]]:
+        """
+        Snapshot a working set and claim the ids changed since the last claim.
+
+        The working set must still be the tenant's current one, at the given version.
+        """
+        with self._lock:
+            current = self._sets.get(tenant_id)
+            self._check_version(tenant_id, current, version)
+            if current is not working_set:
+                raise StaleWorkingSetError(tenant_id, version, current.version)
+
+            _, invoices, transactions = working_set.snapshot()
+            changed_invoices, working_set.changed_invoices = working_set.changed_invoices, set()
+            changed_transactions, working_set.changed_transactions = working_set.changed_transactions, set()
+            return invoices, transactions, changed_invoices, changed_transactions
+
+    def drop(self, tenant_id: str) -> bool:
+        """Forget the tenant's working set."""
+        with self._lock:
+            return self._sets.pop(tenant_id, None) is not None
+
+    def _check_version(self, tenant_id: str, working_set: Optional[TenantWorkingSet], version: str):
+        if working_set is None or working_set.version != version:
+            raise StaleWorkingSetError(
+                tenant_id, version, None if working_set is None else working_set.version
+            )
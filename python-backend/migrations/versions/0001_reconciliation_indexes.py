@@ -0,0 +1,58 @@
+"""Reconciliation indexes
+
+Revision ID: 0001_reconciliation_indexes
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_reconciliation_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_INVOICES = sa.text("status = 'open'")
+
+# (name, table, columns, options)
+INDEXES = [
+    (
+        "invoices_tenant_open_idx",
+        "invoices",
+        ["tenant_id", "status"],
+        {"postgresql_where": OPEN_INVOICES, "sqlite_where": OPEN_INVOICES},
+    ),
+    ("bank_transactions_tenant_posted_at_idx", "bank_transactions", ["tenant_id", "posted_at"], {}),
+    ("bank_transactions_tenant_amount_idx", "bank_transactions", ["tenant_id", "amount"], {}),
+    # Backs the unique constraint the NestJS schema already declares; a no-op there
+    (
+        "match_candidates_tenant_invoice_transaction_unique",
+        "match_candidates",
+        ["tenant_id", "invoice_id", "bank_transaction_id"],
+        {"unique": True},
+    ),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently on Postgres so writes to these tables are not blocked,
+    # which cannot happen inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name, table, columns, if_not_exists=True, postgresql_concurrently=True, **options
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, options in INDEXES:
+            if options.get("unique"):
+                # Owned by the NestJS schema
+                continue
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -43,6 +43,8 @@ async def setup_database() -> AsyncGenerator:
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # Close the pooled connection so aiosqlite's worker thread can exit
+    await engine.dispose()
 
 
 @pytest.fixture
@@ -0,0 +1,86 @@
+import random
+from app.services.assignment import assign, connected_components, solve_exact, solve_greedy
+from app.services.reconciliation_service import ReconciliationService
+
+
+def best_total(edges):
+    """Brute-force maximum total score of a conflict-free edge subset."""
+    best = 0
+    for mask in range(1 << len(edges)):
+        picked = [edges[i] for i in range(len(edges)) if mask >> i & 1]
+        if len({e[0] for e in picked}) == len({e[1] for e in picked}) == len(picked):
+            best = max(best, sum(e[2] for e in picked))
+    return best
+
+
+def is_conflict_free(edges, chosen):
+    return len({edges[i][0] for i in chosen}) == len({edges[i][1] for i in chosen}) == len(chosen)
+
+
+class TestAssignment:
+    """Test the sparse one-to-one assignment solvers."""
+
+    def test_exact_is_optimal(self):
+        """Test the exact solver against brute force on small graphs."""
+        rng = random.Random(11)
+        for _ in range(100):
+            pairs = {(rng.randint(0, 3), rng.randint(0, 4)) for _ in range(rng.randint(1, 10))}
+            edges = [(f"inv-{a}", f"tx-{b}", rng.choice([100, 550, 900, 1000])) for a, b in sorted(pairs)]
+
+            chosen = solve_exact(edges, list(range(len(edges))))
+
+            assert is_conflict_free(edges, chosen)
+            assert sum(edges[i][2] for i in chosen) == best_total(edges)
+
+    def test_exact_beats_greedy(self):
+        """Test a graph where best-first is suboptimal."""
+        edges = [("inv-1", "tx-1", 1000), ("inv-1", "tx-2", 900), ("inv-2", "tx-1", 900)]
+
+        greedy = solve_greedy(edges, [0, 1, 2])
+        exact = solve_exact(edges, [0, 1, 2])
+
+        assert sum(edges[i][2] for i in greedy) == 1000
+        assert sum(edges[i][2] for i in exact) == 1800
+
+    def test_components(self):
+        """Test that disconnected sub-graphs are split, with shared ids linking them."""
+        edges = [("inv-1", "tx-1", 1), ("inv-2", "tx-1", 1), ("inv-3", "tx-3", 1), ("tx-1", "inv-1", 1)]
+
+        components = sorted(sorted(c) for c in connected_components(edges))
+
+        # Invoice and transaction ids are separate namespaces
+        assert components == [[0, 1], [2], [3]]
+
+    def test_large_components_use_greedy(self):
+        """Test that components over the exact limit are still conflict-free."""
+        rng = random.Random(5)
+        edges = list({
+            (f"inv-{rng.randint(0, 200)}", f"tx-{rng.randint(0, 300)}"): None for _ in range(2000)
+        })
+        edges = [(i, t, rng.randint(1, 1500)) for i, t in edges]
+
+        chosen, stats = assign(edges, exact_max_cells=100)
+
+        assert is_conflict_free(edges, chosen)
+        assert stats.exact_components < stats.components
+        assert stats.total_score == sum(edges[i][2] for i in chosen)
+
+    def test_propose_assignment(self):
+        """Test end-to-end proposals never reuse a transaction."""
+        service = ReconciliationService()
+        invoices = [
+            {"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15"},
+            {"id": "inv-002", "amount": 100, "invoice_date": "2024-01-17"},
+        ]
+        transactions = [
+            {"id": "tx-001", "amount": 100, "posted_at": "2024-01-16"},
+            {"id": "tx-002", "amount": 100, "posted_at": "2024-01-15"},
+        ]
+
+        result = service.propose_assignment("tenant-001", invoices, transactions)
+
+        assert result.candidate_edges == 4
+        assert sorted((c.invoice_id, c.transaction_id) for c in result.proposals) == [
+            ("inv-001", "tx-002"), ("inv-002", "tx-001"),
+        ]
+        assert result.total_score == sum(c.score for c in result.proposals)
@@ -0,0 +1,102 @@
+import pytest
+from app.services.blocking import BlockingPlan, BlockingPlanner, EXHAUSTIVE_PLAN
+from app.services.features import prepare_invoices, prepare_transactions
+from app.services.reconciliation_service import ReconciliationService
+
+
+class TestBlockingPlanner:
+    """Test the multi-key blocking planner and recall auditor."""
+
+    @pytest.fixture
+    def service(self):
+        return ReconciliationService()
+
+    @pytest.fixture
+    def invoices(self):
+        return [
+            {
+                "id": "inv-001",
+                "amount": 1000.00,
+                "invoice_date": "2024-01-15",
+                "description": "Cloud hosting",
+                "vendor_name": "www",
+                "currency": "USD",
+            },
+            {
+                "id": "inv-002",
+                "amount": 480.00,
+                "invoice_date": "2024-02-01",
+                "description": "Consulting",
+                "vendor_name": "sss",
+                "currency": "EUR",
+            },
+        ]
+
+    @pytest.fixture
+    def transactions(self):
+        return [
+            {"id": "tx-001", "amount": 1000.00, "posted_at": "2024-01-16", "description": "www payment", "currency": "USD"},
+            {"id": "tx-002", "amount": 1000.00, "posted_at": "2024-03-01", "description": "Payment", "currency": "USD"},
+            {"id": "tx-003", "amount": 120.00, "posted_at": "2024-01-20", "description": "sss", "currency": "EUR"},
+            {"id": "tx-004", "amount": 480.00, "posted_at": "2024-02-03", "description": "Transfer"},
+        ]
+
+    def test_plan_validation(self):
+        """Test that invalid plans are rejected."""
+        with pytest.raises(ValueError):
+            BlockingPlan(keys=("amount", "colour"))
+
+        with pytest.raises(ValueError):
+            BlockingPlan(keys=("amount", "amount"))
+
+        with pytest.raises(ValueError):
+            BlockingPlan(keys=("amount",), match="most")
+
+    def test_single_keys(self, service, invoices, transactions):
+        """Test candidate generation for each key on its own."""
+        invoices = prepare_invoices(invoices)
+        transactions = prepare_transactions(transactions)
+
+        def candidates(keys, invoice):
+            return BlockingPlanner(service, transactions, BlockingPlan(keys=keys)).candidates(invoice)
+
+        assert candidates(("amount",), invoices[0]) == [0, 1]
+        assert candidates(("date",), invoices[0]) == [0, 2]
+        assert candidates(("currency",), invoices[1]) == [2, 3]
+        assert candidates(("vendor",), invoices[1]) == [2]
+
+    def test_match_modes(self, service, invoices, transactions):
+        """Test combining keys with all and any."""
+        invoices = prepare_invoices(invoices)
+        transactions = prepare_transactions(transactions)
+        all_plan = BlockingPlan(keys=("amount", "date"), match="all")
+        any_plan = BlockingPlan(keys=("amount", "date"), match="any")
+
+        assert BlockingPlanner(service, transactions, all_plan).candidates(invoices[0]) == [0]
+        assert BlockingPlanner(service, transactions, any_plan).candidates(invoices[0]) == [0, 1, 2]
+        assert BlockingPlanner(service, transactions, EXHAUSTIVE_PLAN).candidates(invoices[0]) == [0, 1, 2, 3]
+
+    def test_tenant_plans(self, service, invoices, transactions):
+        """Test that each tenant scores with its own plan."""
+        service.set_blocking_plan("tenant-002", BlockingPlan(keys=("amount", "date")))
+
+        default = service.score_candidates("tenant-001", invoices, transactions)
+        strict = service.score_candidates("tenant-002", invoices, transactions)
+
+        assert {c.transaction_id for c in default.candidates} == {"tx-001", "tx-002", "tx-004"}
+        assert {c.transaction_id for c in strict.candidates} == {"tx-001", "tx-004"}
+
+    def test_recall_audit(self, service, invoices, transactions):
+        """Test that the audit reports candidates lost by the plan."""
+        exhaustive = service.audit_recall("tenant-001", invoices, transactions, plan=EXHAUSTIVE_PLAN)
+        blocked = service.audit_recall(
+            "tenant-001", invoices, transactions, plan=BlockingPlan(keys=("amount", "date"))
+        )
+
+        assert exhaustive.lost_candidates == 0
+        assert exhaustive.recall == 1.0
+        assert blocked.sampled_invoices == 2
+        assert blocked.exhaustive_candidates == exhaustive.exhaustive_candidates
+        assert blocked.lost_candidates > 0
+        assert blocked.recall < 1.0
+        assert blocked.plan.keys == ["amount", "date"]
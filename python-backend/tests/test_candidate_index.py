@@ -0,0 +1,77 @@
+import pytest
+from app.services.candidate_index import TransactionAmountIndex
+from app.services.features import prepare_transactions
+from app.services.reconciliation_service import ReconciliationService
+
+
+class TestTransactionAmountIndex:
+    """Test the amount-sorted candidate index."""
+
+    @pytest.fixture
+    def transactions(self):
+        return [
+            {"id": "tx-001", "amount": 1000.00, "posted_at": "2024-01-16", "description": "Payment"},
+            {"id": "tx-002", "amount": 1005.00, "posted_at": "2024-01-16", "description": "Payment"},
+            {"id": "tx-003", "amount": 1011.00, "posted_at": "2024-01-16", "description": "Payment"},
+            {"id": "tx-004", "amount": 1000.00, "posted_at": "2024-01-17", "description": "Payment"},
+            {"id": "tx-005", "amount": "not-a-number", "posted_at": "2024-01-16", "description": "Payment"},
+            {"id": "tx-006", "amount": 250.00, "posted_at": "2024-01-16", "description": "Payment"},
+        ]
+
+    def test_exact_matches_use_hash_lookup(self, transactions):
+        """Test exact cents lookup."""
+        index = TransactionAmountIndex(prepare_transactions(transactions), 0.01)
+
+        assert index.exact_matches(100000) == [0, 3]
+        assert index.exact_matches(12345) == []
+
+    def test_neighbours_within_tolerance(self, transactions):
+        """Test that only transactions near the invoice amount are returned."""
+        index = TransactionAmountIndex(prepare_transactions(transactions), 0.01)
+
+        assert index.neighbours(1000.00) == [0, 1, 3]
+        assert index.neighbours(250.00) == [5]
+        assert index.neighbours(5000.00) == []
+
+    def test_invalid_and_non_positive_amounts(self, transactions):
+        """Test invalid invoice amounts and the unbounded non-positive case."""
+        index = TransactionAmountIndex(prepare_transactions(transactions), 0.01)
+
+        assert index.neighbours(None) == []
+        assert index.neighbours(float("nan")) == []
+        assert index.neighbours(-10.00) == [0, 1, 2, 3, 5]
+
+    def test_indexed_scoring_matches_amount_matches_of_full_scan(self, transactions):
+        """Test that indexed scoring keeps every pair with an amount score."""
+        service = ReconciliationService()
+        invoices = [
+            {"id": f"inv-{i}", "amount": amount, "invoice_date": "2024-01-15", "description": "Payment"}
+            for i, amount in enumerate([1000.00, 999.99, 1010.00, 250.00, 249.00, 7.50])
+        ]
+
+        result = service.score_candidates("tenant-001", invoices, transactions, top_n=10)
+        indexed = {(c.invoice_id, c.transaction_id, c.score) for c in result.candidates}
+
+        expected = set()
+        for invoice in invoices:
+            for transaction in transactions:
+                score_result = service.calculate_score(invoice, transaction)
+                if score_result["exact_amount"] > 0:
+                    expected.add((invoice["id"], transaction["id"], score_result["total_score"]))
+
+        assert indexed == expected
+
+    def test_full_scan_fallback(self, transactions):
+        """Test the opt-in fallback for invoices without amount neighbours."""
+        service = ReconciliationService()
+        invoices = [
+            {"id": "inv-001", "amount": 42.00, "invoice_date": "2024-01-16", "description": "Payment"},
+        ]
+
+        without_fallback = service.score_candidates("tenant-001", invoices, transactions)
+        with_fallback = service.score_candidates(
+            "tenant-001", invoices, transactions, full_scan_fallback=True
+        )
+
+        assert without_fallback.candidates == []
+        assert len(with_fallback.candidates) == 5
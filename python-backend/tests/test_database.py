@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.database import InstrumentedQueuePool, engine_options, get_pool_stats, pool_stats
+
+
+class TestEngineOptions:
+    """Test connection pool configuration."""
+
+    def test_queue_pool_by_default(self):
+        """Test that the default mode pools connections with the configured limits."""
+        options = engine_options("queue", "postgresql+asyncpg://u:p@localhost/db")
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] > 0
+        assert options["pool_pre_ping"] is True
+        assert "statement_cache_size" in options["connect_args"]
+
+    def test_null_pool_is_opt_in(self):
+        """Test that the null mode opens a connection per session."""
+        options = engine_options("null", "postgresql+asyncpg://u:p@localhost/db")
+
+        assert options["poolclass"] is NullPool
+        assert "pool_size" not in options
+
+    def test_unknown_mode_rejected(self):
+        """Test that a misspelt pool mode fails at startup."""
+        with pytest.raises(ValueError):
+            engine_options("bounded")
+
+
+class TestPoolStats:
+    """Test checkout wait and saturation reporting."""
+
+    async def test_saturation_and_timeouts(self):
+        """Test that a full pool reports saturation and counts timed-out checkouts."""
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+        pool_stats.reset()
+        try:
+            async with engine.connect() as held:
+                await held.execute(text("SELECT 1"))
+                stats = get_pool_stats(engine)
+                assert (stats["checked_out"], stats["saturation"]) == (1, 1.0)
+
+                with pytest.raises(PoolTimeoutError):
+                    async with engine.connect():
+                        pass
+
+            stats = get_pool_stats(engine)
+            assert stats["checkouts"] == 1
+            assert stats["timeouts"] == 1
+            assert stats["max_wait_ms"] >= 100
+            assert stats["saturation"] == 0.0
+        finally:
+            await engine.dispose()
+
+    def test_null_pool_stats(self):
+        """Test that unpooled engines report only their mode."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=NullPool)
+
+        assert get_pool_stats(engine) == {"mode": "null"}
+
+    def test_endpoint(self, test_client):
+        """Test that the stats endpoint reports the application pool."""
+        response = test_client.get("/db/pool")
+
+        assert response.status_code == 200
+        assert response.json()["mode"] == "queue"
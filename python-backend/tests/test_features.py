@@ -0,0 +1,47 @@
+from app.services.features import InvoiceRecord, TransactionRecord, DAY_MICROSECONDS
+
+
+class TestScoringRecords:
+    """Test the per-record feature stage."""
+
+    def test_invoice_record_fields(self):
+        """Test that invoice fields are derived once into the record."""
+        record = InvoiceRecord({
+            "id": "inv-001",
+            "amount": "1500.25",
+            "invoice_date": "2024-01-15",
+            "description": "ss ww",
+            "vendor_name": "",
+        })
+
+        assert record.amount == 1500.25
+        assert record.amount_cents == 150025
+        assert record.day * DAY_MICROSECONDS == record.date_us
+        assert record.description == "ss ww"
+        assert record.tokens == frozenset({"ss", "ww"})
+        assert record.vendor is None
+
+    def test_transaction_record_invalid_values(self):
+        """Test that invalid amounts and dates are recorded as missing."""
+        record = TransactionRecord({
+            "id": "tx-001",
+            "amount": "n/a",
+            "posted_at": "yesterday",
+            "description": "",
+        })
+
+        assert record.amount is None
+        assert record.amount_cents is None
+        assert record.date_us is None
+        assert record.day is None
+        assert record.has_description is False
+
+    def test_timezone_aware_dates_are_normalized(self):
+        """Test that aware dates in different offsets share a UTC instant."""
+        utc = TransactionRecord({"id": "tx-001", "amount": 1, "posted_at": "2024-01-16T10:30:00Z", "description": "x"})
+        offset = TransactionRecord({"id": "tx-002", "amount": 1, "posted_at": "2024-01-16T12:30:00+02:00", "description": "x"})
+        naive = TransactionRecord({"id": "tx-003", "amount": 1, "posted_at": "2024-01-16T10:30:00", "description": "x"})
+
+        assert utc.date_aware and offset.date_aware
+        assert utc.date_us == offset.date_us
+        assert not naive.date_aware
@@ -0,0 +1,107 @@
+from hypothesis import given, settings, strategies as st
+from app.services.blocking import BlockingPlan
+from app.services.reconciliation_service import ReconciliationService
+
+
+amounts = st.sampled_from([100, 100.5, 101, 250, 99.5, 1000])
+dates = st.sampled_from(["2024-01-14", "2024-01-15", "2024-01-18", "2024-01-25", None])
+descriptions = st.sampled_from(["ss ww", "s w", "sss", "", "ww s"])
+invoice_ids = st.sampled_from([f"inv-{i}" for i in range(8)])
+transaction_ids = st.sampled_from([f"tx-{i}" for i in range(12)])
+
+invoices = st.builds(
+    lambda id, amount, date, description, vendor: {
+        "id": id, "amount": amount, "invoice_date": date, "description": description, "vendor_name": vendor,
+    },
+    invoice_ids, amounts, dates, descriptions, st.sampled_from(["sss", "www", ""]),
+)
+transactions = st.builds(
+    lambda id, amount, date, description: {
+        "id": id, "amount": amount, "posted_at": date, "description": description,
+    },
+    transaction_ids, amounts, dates, descriptions,
+)
+deltas = st.tuples(
+    st.lists(invoices, max_size=3),
+    st.lists(invoice_ids, max_size=2),
+    st.lists(transactions, max_size=4),
+    st.lists(transaction_ids, max_size=3),
+)
+
+
+def candidate_rows(result):
+    return [
+        (c.invoice_id, c.transaction_id, c.score, c.explanation(),
+         c.score_breakdown.exact_amount, c.score_breakdown.date_proximity,
+         c.score_breakdown.text_similarity, c.score_breakdown.vendor_match)
+        for c in result.candidates
+    ]
+
+
+class TestIncrementalRescoring:
+    """Test incremental re-ranking of retained working sets."""
+
+    @settings(max_examples=60, deadline=None)
+    @given(
+        st.lists(invoices, max_size=6),
+        st.lists(transactions, max_size=8),
+        st.lists(deltas, min_size=1, max_size=4),
+        st.sampled_from([1, 3]),
+        st.sampled_from([None, ("amount", "date")]),
+    )
+    def test_matches_full_rerun(self, initial_invoices, initial_transactions, delta_list, top_n, keys):
+        """Test that incremental results equal a full re-run after every delta."""
+        service = ReconciliationService()
+        plan = BlockingPlan(keys=keys, match="any") if keys else None
+        version = service.sync_working_set("tenant-001", initial_invoices, initial_transactions).version
+        service.rescore_working_set("tenant-001", version, top_n=top_n, plan=plan)
+
+        for upserts, removed, tx_upserts, tx_removed in delta_list:
+            version = service.apply_working_set_delta(
+                "tenant-001", version, upserts, removed, tx_upserts, tx_removed
+            ).version
+
+            incremental = service.rescore_working_set("tenant-001", version, top_n=top_n, plan=plan)
+            full = service.score_working_set("tenant-001", version, top_n=top_n, plan=plan)
+
+            assert incremental.incremental
+            assert candidate_rows(incremental) == candidate_rows(full)
+
+    def test_reports_changed_invoices(self):
+        """Test that only invoices whose candidates changed are reported."""
+        service = ReconciliationService()
+        invoices = [
+            {"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15"},
+            {"id": "inv-002", "amount": 250, "invoice_date": "2024-01-15"},
+        ]
+        transactions = [{"id": "tx-001", "amount": 100, "posted_at": "2024-01-15"}]
+        version = service.sync_working_set("tenant-001", invoices, transactions).version
+
+        first = service.rescore_working_set("tenant-001", version)
+        assert first.changed_invoice_ids == ["inv-001", "inv-002"]
+        assert first.rescored_invoices == 2
+
+        version = service.apply_working_set_delta(
+            "tenant-001", version, [], [], [{"id": "tx-002", "amount": 250, "posted_at": "2024-01-16"}], []
+        ).version
+        second = service.rescore_working_set("tenant-001", version)
+
+        assert second.changed_invoice_ids == ["inv-002"]
+        assert second.rescored_invoices == 0
+
+        version = service.apply_working_set_delta("tenant-001", version, [], [], [], ["tx-001"]).version
+        third = service.rescore_working_set("tenant-001", version)
+
+        assert third.changed_invoice_ids == ["inv-001"]
+        assert [c.transaction_id for c in third.candidates] == ["tx-002"]
+
+    def test_tfidf_rebuilds(self):
+        """Test that batch-dependent engines re-rank every invoice."""
+        service = ReconciliationService()
+        version = service.sync_working_set(
+            "tenant-001", [{"id": "inv-001", "amount": 100}], [{"id": "tx-001", "amount": 100}]
+        ).version
+
+        result = service.rescore_working_set("tenant-001", version, text_engine="tfidf")
+
+        assert not result.incremental
@@ -0,0 +1,130 @@
+from app.services.blocking import DEFAULT_BLOCKING_PLAN
+from app.services.index_cache import TenantIndexCache, fingerprint
+from app.services.reconciliation_service import ReconciliationService
+from app.services.result_cache import ScoringResultCache
+
+
+INVOICES = [{"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15", "description": "ss ww"}]
+TRANSACTIONS = [
+    {"id": "tx-001", "amount": 100, "posted_at": "2024-01-15", "description": "ss ww"},
+    {"id": "tx-002", "amount": 101, "posted_at": "2024-01-18", "description": "s"},
+]
+
+
+class TestTenantIndexCache:
+    """Test the per-tenant prepared index cache."""
+
+    def test_hits_on_same_content(self):
+        """Test that identical content is prepared once."""
+        cache = TenantIndexCache()
+
+        first = cache.transactions("tenant-001", TRANSACTIONS)
+        second = cache.transactions("tenant-001", [dict(t) for t in TRANSACTIONS])
+
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_changed_content_misses(self):
+        """Test that a changed record gets a new fingerprint and entry."""
+        changed = [TRANSACTIONS[0], dict(TRANSACTIONS[1], amount=102)]
+
+        assert fingerprint(changed) != fingerprint(TRANSACTIONS)
+
+        cache = TenantIndexCache()
+        assert cache.transactions("tenant-001", TRANSACTIONS) is not cache.transactions("tenant-001", changed)
+
+    def test_lru_eviction(self):
+        """Test that least recently used entries go first once over budget."""
+        cache = TenantIndexCache()
+        size = cache.invoices("probe", INVOICES).size
+        cache.clear()
+        cache.max_bytes = 2 * size
+
+        cache.invoices("tenant-001", INVOICES)
+        cache.invoices("tenant-002", INVOICES)
+        cache.invoices("tenant-001", INVOICES)
+        cache.invoices("tenant-003", INVOICES)
+
+        assert cache.evictions == 1
+        assert {key[0] for key in cache._entries} == {"tenant-001", "tenant-003"}
+        assert cache.bytes == 2 * size
+
+    def test_oversized_entries_not_cached(self):
+        """Test that an entry larger than the budget is returned but not kept."""
+        cache = TenantIndexCache(max_bytes=1)
+
+        assert cache.transactions("tenant-001", TRANSACTIONS).records
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        """Test explicit invalidation of one tenant."""
+        cache = TenantIndexCache()
+        cache.invoices("tenant-001", INVOICES)
+        cache.transactions("tenant-001", TRANSACTIONS)
+        cache.invoices("tenant-002", INVOICES)
+
+        assert cache.invalidate("tenant-001") == 2
+        assert len(cache) == 1
+
+    def test_version_stamp_skips_fingerprint(self):
+        """Test that callers can key entries by a version stamp."""
+        cache = TenantIndexCache()
+
+        first = cache.invoices("tenant-001", INVOICES, version="2024-01-15T10:00:00")
+        assert cache.invoices("tenant-001", [], version="2024-01-15T10:00:00") is first
+
+    def test_attached_indexes_counted(self):
+        """Test that indexes built after caching count against the budget."""
+        cache = TenantIndexCache()
+        service = ReconciliationService()
+        entry = cache.transactions("tenant-001", TRANSACTIONS)
+        before = entry.size
+
+        entry.planner(service, DEFAULT_BLOCKING_PLAN)
+        entry.vectorized(service, DEFAULT_BLOCKING_PLAN)
+
+        assert entry.size > before
+        assert cache.bytes == entry.size
+
+    def test_growth_past_budget_evicts(self):
+        """Test that an entry growing past the budget is evicted."""
+        cache = TenantIndexCache()
+        entry = cache.transactions("tenant-001", TRANSACTIONS)
+        cache.max_bytes = entry.size
+
+        entry.planner(ReconciliationService(), DEFAULT_BLOCKING_PLAN)
+
+        assert len(cache) == 0
+        assert cache.bytes == 0
+        assert cache.evictions == 1
+
+
+class TestServiceIndexCache:
+    """Test index reuse across scoring requests."""
+
+    def test_repeat_runs_reuse_indexes(self):
+        """Test that a repeat run hits the cache and scores identically."""
+        service = ReconciliationService()
+        # Repeat requests would otherwise be answered before reaching the indexes
+        service.result_cache = ScoringResultCache(max_bytes=0)
+
+        for backend in ("python", "numpy"):
+            first = service.score_candidates("tenant-001", INVOICES, TRANSACTIONS, backend=backend)
+            second = service.score_candidates("tenant-001", INVOICES, TRANSACTIONS, backend=backend)
+            assert [(c.transaction_id, c.score) for c in first.candidates] == [
+                (c.transaction_id, c.score) for c in second.candidates
+            ]
+
+        stats = service.index_cache_stats()
+        assert stats.misses == 2
+        assert stats.hits == 6
+        assert service.invalidate_tenant_indexes("tenant-001") == 2
+
+    def test_recall_audit_prepares_records_once(self):
+        """Test that both audit runs score the same prepared records."""
+        service = ReconciliationService()
+
+        service.audit_recall("tenant-001", INVOICES, TRANSACTIONS)
+
+        stats = service.index_cache_stats()
+        assert (stats.misses, stats.hits) == (2, 0)
@@ -0,0 +1,123 @@
+import io
+import json
+import pytest
+from app.graphql.schema import reconciliation_service
+from app.services.ingest import ARROW_STREAM, NDJSON, read_arrow, read_ndjson
+
+
+INVOICES = [
+    {"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15", "description": "ss ww"},
+    {"id": "inv-002", "amount": 250, "invoice_date": "2024-01-16", "description": "s w"},
+]
+
+TRANSACTIONS = [
+    {"id": "tx-001", "amount": 100, "posted_at": "2024-01-15", "description": "ss ww"},
+    {"id": "tx-002", "amount": 250, "posted_at": "2024-01-16", "description": "s w"},
+]
+
+
+def ndjson_body() -> bytes:
+    lines = [{"type": "invoice", **invoice} for invoice in INVOICES]
+    lines += [{"type": "transaction", **transaction} for transaction in TRANSACTIONS]
+    return "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestNdjsonReader:
+    """Test incremental NDJSON parsing into scoring dictionaries."""
+
+    async def test_lines_split_across_chunks(self):
+        """Test that records are read whatever the chunk boundaries."""
+        batch = await read_ndjson(chunked(ndjson_body(), 7))
+
+        assert [i["id"] for i in batch.invoices] == ["inv-001", "inv-002"]
+        assert batch.transactions[0] == TRANSACTIONS[0]
+
+    async def test_last_line_without_newline(self):
+        """Test that a final line without a trailing newline is read."""
+        batch = await read_ndjson(chunked(ndjson_body().rstrip(), 1024))
+
+        assert len(batch.transactions) == 2
+
+    async def test_errors_name_the_line(self):
+        """Test that unknown types, missing ids and bad JSON report their line."""
+        for body, message in [
+            (b'{"type": "refund", "id": "x"}\n', "line 1: type"),
+            (b'\n{"type": "invoice"}\n', "line 2: id is required"),
+            (b'{"type": "invoice", "id": "x"}\n{nope\n', "line 2: invalid JSON"),
+        ]:
+            with pytest.raises(ValueError, match=message):
+                await read_ndjson(chunked(body, 1024))
+
+
+class TestArrowReader:
+    """Test Arrow IPC parsing into scoring dictionaries."""
+
+    def test_stream_with_timestamps(self):
+        """Test that a mixed-type stream is split by type with ISO dates."""
+        pa = pytest.importorskip("pyarrow")
+        from datetime import datetime
+
+        table = pa.table({
+            "type": ["invoice", "transaction"],
+            "id": ["inv-001", "tx-001"],
+            "amount": [100.0, 100.0],
+            "invoice_date": pa.array([datetime(2024, 1, 15), None], pa.timestamp("us")),
+            "posted_at": pa.array([None, datetime(2024, 1, 15)], pa.timestamp("us")),
+        })
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        batch = read_arrow(sink.getvalue())
+
+        assert batch.invoices[0]["invoice_date"] == "2024-01-15T00:00:00"
+        assert batch.transactions[0]["posted_at"] == "2024-01-15T00:00:00"
+        assert "invoice_date" not in batch.transactions[0]
+
+
+class TestScoreBatchEndpoint:
+    """Test the bulk scoring endpoint."""
+
+    def test_ndjson_matches_score_candidates(self, test_client):
+        """Test that an NDJSON upload returns the candidates of score_candidates."""
+        response = test_client.post(
+            "/score/batch?tenant_id=tenant-ingest&top_n=2",
+            content=ndjson_body(),
+            headers={"Content-Type": NDJSON},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        expected = reconciliation_service.score_candidates("tenant-ingest", INVOICES, TRANSACTIONS, top_n=2)
+        assert [(c["invoice_id"], c["transaction_id"], c["score"]) for c in body["candidates"]] == [
+            (c.invoice_id, c.transaction_id, c.score) for c in expected.candidates
+        ]
+        assert body["candidates"][0]["explanation"] == expected.candidates[0].explanation()
+        assert (body["processed_invoices"], body["processed_transactions"]) == (2, 2)
+
+    def test_invalid_line_is_a_bad_request(self, test_client):
+        """Test that a malformed record returns 400."""
+        response = test_client.post(
+            "/score/batch?tenant_id=tenant-ingest",
+            content=b'{"type": "invoice"}\n',
+            headers={"Content-Type": NDJSON},
+        )
+
+        assert response.status_code == 400
+        assert "id is required" in response.json()["detail"]
+
+    def test_unsupported_content_type(self, test_client):
+        """Test that other content types return 415."""
+        response = test_client.post(
+            "/score/batch?tenant_id=tenant-ingest",
+            content=b"[]",
+            headers={"Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 415
+        assert ARROW_STREAM in response.json()["detail"]
@@ -0,0 +1,165 @@
+import asyncio
+import time
+import pytest
+import app.graphql.schema as graphql_schema
+from app.graphql.schema import schema
+from app.services.jobs import JobManager, JobStore
+from app.services.reconciliation_service import ReconciliationService
+from app.services.scheduler import ScoringScheduler
+
+
+INVOICES = [
+    {"id": f"inv-{i}", "amount": 100 + i, "invoice_date": "2024-01-15", "description": f"order {i}"}
+    for i in range(5)
+]
+
+TRANSACTIONS = [
+    {"id": f"tx-{i}", "amount": 100 + i, "posted_at": "2024-01-16", "description": f"order {i}"}
+    for i in range(5)
+]
+
+
+class StoppingScheduler(ScoringScheduler):
+    """Scheduler that runs a number of shards, then calls stop as the next one starts."""
+
+    def __init__(self, shards: int, stop):
+        super().__init__(threads=1)
+        self.shards = shards
+        self.stop = stop
+
+    async def run(self, *args, **kwargs):
+        if self.shards == 0:
+            self.stop()
+        self.shards -= 1
+        return await super().run(*args, **kwargs)
+
+
+def crash():
+    # As if the process died while the job was running
+    raise asyncio.CancelledError
+
+
+def fail():
+    raise RuntimeError("scoring crashed")
+
+
+def summary(candidates) -> list:
+    return [(c.invoice_id, c.transaction_id, c.score, c.explanation()) for c in candidates]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def manager(store: JobStore, scheduler=None, **kwargs) -> JobManager:
+    return JobManager(
+        ReconciliationService(), scheduler or ScoringScheduler(threads=1), store, shard_size=2, **kwargs
+    )
+
+
+class TestReconciliationJobs:
+    """Test background scoring jobs."""
+
+    async def test_job_matches_score_candidates(self, store):
+        """Test that a finished job holds the candidates of one scoreCandidates call."""
+        jobs = manager(store)
+
+        job = jobs.submit("tenant-jobs", INVOICES, TRANSACTIONS, top_n=2)
+        assert job.status == "queued"
+        await jobs.wait(job.id)
+
+        finished = jobs.get(job.id)
+        expected = ReconciliationService().score_candidates("tenant-jobs", INVOICES, TRANSACTIONS, top_n=2)
+        assert finished.status == "completed"
+        assert (finished.processed_invoices, finished.percent_complete) == (5, 100.0)
+        assert finished.expires_at is not None
+        assert summary(finished.candidates()) == summary(expected.candidates)
+
+    async def test_cancel_keeps_partial_results(self, store):
+        """Test that a job cancelled during a shard stops after it and keeps what it scored."""
+        jobs = manager(store, StoppingScheduler(1, lambda: jobs.cancel(job_id)))
+
+        job_id = jobs.submit("tenant-jobs", INVOICES, TRANSACTIONS).id
+        await jobs.wait(job_id)
+
+        cancelled = jobs.get(job_id)
+        assert cancelled.status == "cancelled"
+        assert (cancelled.processed_invoices, cancelled.percent_complete) == (4, 80.0)
+        assert {c.invoice_id for c in cancelled.candidates()} == {"inv-0", "inv-1", "inv-2", "inv-3"}
+
+    async def test_resume_after_restart(self, store):
+        """Test that a job interrupted after a shard resumes there in a new process."""
+        first = manager(store, StoppingScheduler(1, crash))
+        job_id = first.submit("tenant-jobs", INVOICES, TRANSACTIONS, text_engine="tfidf").id
+        await first.wait(job_id)
+        assert first.get(job_id).status == "running"
+        assert first.get(job_id).processed_invoices == 2
+        store.close()
+
+        restarted = manager(JobStore(store.path))
+        assert restarted.resume() == 1
+        await restarted.wait(job_id)
+
+        expected = ReconciliationService().score_candidates(
+            "tenant-jobs", INVOICES, TRANSACTIONS, text_engine="tfidf"
+        )
+        finished = restarted.get(job_id)
+        assert finished.status == "completed"
+        assert summary(finished.candidates()) == summary(expected.candidates)
+        restarted.store.close()
+
+    async def test_failed_and_expired_jobs(self, store):
+        """Test that scoring errors fail the job and results vanish after their TTL."""
+        jobs = manager(store, StoppingScheduler(0, fail), ttl=0)
+
+        job_id = jobs.submit("tenant-jobs", INVOICES, TRANSACTIONS).id
+        await jobs.wait(job_id)
+        assert jobs.store.get(job_id)["status"] == "failed"
+        assert jobs.store.get(job_id)["error"] == "scoring crashed"
+
+        time.sleep(0.01)
+        assert jobs.get(job_id) is None
+
+    async def test_invalid_options_are_rejected(self, store):
+        """Test that unknown backends fail at submission, not in the background."""
+        with pytest.raises(ValueError, match="Scoring backend"):
+            manager(store).submit("tenant-jobs", INVOICES, TRANSACTIONS, backend="gpu")
+
+
+class TestJobSchema:
+    """Test the job API through the GraphQL schema."""
+
+    async def test_submit_and_poll(self, store, monkeypatch):
+        """Test submitting a job and reading its progress and candidates."""
+        jobs = manager(store)
+        monkeypatch.setattr(graphql_schema, "reconciliation_jobs", jobs)
+
+        submitted = await schema.execute("""mutation {
+            submitReconciliationJob(
+                tenantId: "schema-jobs",
+                invoices: [{id: "inv-001", amount: 100, invoiceDate: "2024-01-15"}],
+                transactions: [{id: "tx-001", amount: 100, postedAt: "2024-01-15", description: "x"}]
+            ) { id status totalInvoices }
+        }""")
+        assert submitted.errors is None
+        job = submitted.data["submitReconciliationJob"]
+        assert (job["status"], job["totalInvoices"]) == ("queued", 1)
+        await jobs.wait(job["id"])
+
+        polled = await schema.execute(f"""{{
+            reconciliationJob(id: "{job['id']}") {{
+                status percentComplete elapsedMs candidates {{ invoiceId transactionId explanation }}
+            }}
+        }}""")
+        assert polled.errors is None
+        result = polled.data["reconciliationJob"]
+        assert (result["status"], result["percentComplete"]) == ("completed", 100.0)
+        assert result["candidates"][0]["transactionId"] == "tx-001"
+
+        cancelled = await schema.execute(f"""mutation {{
+            cancelReconciliationJob(id: "{job['id']}") {{ status }}
+        }}""")
+        assert cancelled.data["cancelReconciliationJob"]["status"] == "completed"
@@ -0,0 +1,100 @@
+import multiprocessing
+import pickle
+import threading
+from app.services.parallel import shard_bounds
+from app.services.reconciliation_service import ReconciliationService
+
+
+def sample_batch(tenant: int):
+    invoices = [
+        {"id": f"inv-{tenant}-{i}", "amount": 100 + i % 3, "invoice_date": f"2024-01-{10 + i % 5}",
+         "description": "ss ww", "vendor_name": "sss"}
+        for i in range(20)
+    ]
+    transactions = [
+        {"id": f"tx-{tenant}-{i}", "amount": 100 + i % 4, "posted_at": f"2024-01-{10 + i % 7}",
+         "description": "sss ww" if i % 2 else "s w"}
+        for i in range(30)
+    ]
+    return invoices, transactions
+
+
+def candidate_rows(result):
+    return [
+        (c.invoice_id, c.transaction_id, c.score, c.explanation(), c.score_breakdown.total)
+        for c in result.candidates
+    ]
+
+
+class TestParallelScoring:
+    """Test process-pool scoring."""
+
+    def test_shard_bounds_cover_range(self):
+        """Test that shards are contiguous and cover every invoice once."""
+        bounds = shard_bounds(103, 4)
+
+        assert bounds[0][0] == 0 and bounds[-1][1] == 103
+        assert all(left[1] == right[0] for left, right in zip(bounds, bounds[1:]))
+        assert shard_bounds(0, 4) == []
+
+    def test_parallel_matches_serial(self):
+        """Test that sharded scoring returns exactly the serial output."""
+        service = ReconciliationService()
+        service.parallel_min_invoices = 1
+        invoices, transactions = sample_batch(1)
+
+        serial = service.score_candidates("tenant-001", invoices, transactions, top_n=3, workers=1)
+        parallel = service.score_candidates("tenant-001", invoices, transactions, top_n=3, workers=2)
+
+        assert candidate_rows(parallel) == candidate_rows(serial)
+
+    def test_spawned_workers_match_serial(self, monkeypatch):
+        """Test that the pickling path works once the service holds caches and locks."""
+        service = ReconciliationService()
+        service.parallel_min_invoices = 1
+        service.sync_working_set("tenant-001", [], [])
+        invoices, transactions = sample_batch(1)
+        serial = service.score_candidates("tenant-001", invoices, transactions, top_n=3, workers=1)
+
+        monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+        parallel = service.score_candidates("tenant-001", invoices, transactions, top_n=3, workers=2)
+
+        assert pickle.loads(pickle.dumps(service)).working_sets is None
+        assert candidate_rows(parallel) == candidate_rows(serial)
+
+    def test_concurrent_requests_stay_separate(self):
+        """Test that parallel requests from several threads only see their own records."""
+        service = ReconciliationService()
+        service.parallel_min_invoices = 1
+        batches = {tenant: sample_batch(tenant) for tenant in range(3)}
+        expected = {
+            tenant: candidate_rows(service.score_candidates(f"tenant-{tenant}", *batch, top_n=3, workers=1))
+            for tenant, batch in batches.items()
+        }
+        results = {}
+
+        def score(tenant):
+            result = service.score_candidates(f"tenant-{tenant}", *batches[tenant], top_n=3, workers=2)
+            results[tenant] = candidate_rows(result)
+
+        threads = [threading.Thread(target=score, args=(tenant,)) for tenant in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == expected
+
+    def test_small_batches_stay_in_process(self, monkeypatch):
+        """Test that batches below the minimum size skip the pool."""
+        def fail(*args):
+            raise AssertionError("pool should not be used")
+
+        monkeypatch.setattr("app.services.reconciliation_service.rank_runs_parallel", fail)
+        service = ReconciliationService()
+
+        result = service.score_candidates(
+            "tenant-001", [{"id": "inv-001", "amount": 100}], [{"id": "tx-001", "amount": 100}], workers=8
+        )
+
+        assert len(result.candidates) == 1
@@ -0,0 +1,65 @@
+from app.services.ranking import rank_key, top_pairs, merge_ranked
+from app.services.reconciliation_service import ReconciliationService
+
+
+def breakdown(total):
+    return {"total_score": total}
+
+
+class TestRanking:
+    """Test bounded top-N selection and k-way merging."""
+
+    def test_top_pairs_bounded_and_tie_broken(self):
+        """Test that top pairs keep the best scores and break ties by transaction id."""
+        transaction_ids = ["tx-3", "tx-1", "tx-2", "tx-4", "tx-0"]
+        scored = [(0, breakdown(50)), (1, breakdown(80)), (2, breakdown(50)), (3, breakdown(0)), (4, breakdown(10))]
+
+        top = top_pairs("inv-001", transaction_ids, scored, 3)
+
+        assert [position for _, position, _ in top] == [1, 2, 0]
+
+    def test_top_pairs_skips_zero_scores(self):
+        """Test that non-positive totals are never candidates."""
+        assert top_pairs("inv-001", ["tx-1"], [(0, breakdown(0))], 5) == []
+
+    def test_merge_ranked(self):
+        """Test the global order is score, then invoice id, then transaction id."""
+        runs = [
+            [(rank_key(90, "inv-2", "tx-1"),), (rank_key(40, "inv-2", "tx-3"),)],
+            [(rank_key(90, "inv-1", "tx-2"),), (rank_key(40, "inv-1", "tx-1"),)],
+        ]
+
+        merged = [entry[0] for entry in merge_ranked(runs)]
+
+        assert merged == sorted(merged)
+        assert merged[0] == (-90, "inv-1", "tx-2")
+
+    def test_score_candidates_order_independent_of_input(self):
+        """Test that shuffling the input does not change the result."""
+        service = ReconciliationService()
+        invoices = [{"id": f"inv-{i}", "amount": 100, "invoice_date": "2024-01-15"} for i in range(3)]
+        transactions = [{"id": f"tx-{i}", "amount": 100, "posted_at": "2024-01-15"} for i in range(6)]
+
+        forward = service.score_candidates("tenant-001", invoices, transactions, top_n=2)
+        backward = service.score_candidates("tenant-001", invoices[::-1], transactions[::-1], top_n=2)
+
+        ids = [(c.invoice_id, c.transaction_id) for c in forward.candidates]
+        assert ids == [(c.invoice_id, c.transaction_id) for c in backward.candidates]
+        assert ids[:2] == [("inv-0", "tx-0"), ("inv-0", "tx-1")]
+
+    def test_explanations_are_lazy(self, monkeypatch):
+        """Test that explanations are only formatted when read."""
+        service = ReconciliationService()
+        calls = []
+        generate = service.generate_explanation
+        monkeypatch.setattr(
+            service, "generate_explanation", lambda *args: calls.append(args) or generate(*args)
+        )
+        invoices = [{"id": "inv-0", "amount": 100, "invoice_date": "2024-01-15"}]
+        transactions = [{"id": f"tx-{i}", "amount": 100, "posted_at": "2024-01-15"} for i in range(4)]
+
+        result = service.score_candidates("tenant-001", invoices, transactions, top_n=2)
+        assert calls == []
+
+        assert "identical amounts" in result.candidates[0].explanation()
+        assert len(calls) == 1
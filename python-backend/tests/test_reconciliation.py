@@ -1,7 +1,7 @@
 import pytest
 from datetime import datetime
 from app.services.reconciliation_service import ReconciliationService
-from app.graphql.types import InvoiceInput, TransactionInput, AiExplanationRequest
+from app.graphql.types import InvoiceInput, TransactionInput, ScoreBreakdownInput, AiExplanationRequest
 
 
 class TestReconciliationService:
@@ -231,7 +231,39 @@ class TestReconciliationService:
         # Should have correct metadata
         assert result.processed_invoices == len(sample_invoices)
         assert result.processed_transactions == len(sample_transactions)
-        assert result.duration_ms > 0
+        assert result.duration_ms >= 0
+    
+    def test_columnar_matches_candidates(self, service, sample_invoices, sample_transactions):
+        """Test that the columnar result holds the candidates' fields in the same order."""
+        result = service.score_candidates("tenant-001", sample_invoices, sample_transactions, top_n=3)
+        columnar = service.score_candidates_columnar(
+            "tenant-001", sample_invoices, sample_transactions, top_n=3
+        )
+        
+        rows = list(zip(
+            columnar.invoice_ids,
+            columnar.transaction_ids,
+            columnar.scores,
+            columnar.exact_amount,
+            columnar.date_proximity,
+            columnar.text_similarity,
+            columnar.vendor_match,
+            columnar.explanations(),
+        ))
+        assert rows == [
+            (
+                c.invoice_id,
+                c.transaction_id,
+                c.score,
+                c.score_breakdown.exact_amount,
+                c.score_breakdown.date_proximity,
+                c.score_breakdown.text_similarity,
+                c.score_breakdown.vendor_match,
+                c.explanation(),
+            )
+            for c in result.candidates
+        ]
+        assert columnar.processed_invoices == len(sample_invoices)
     
     def test_perfect_match_explanation(self, service):
         """Test explanation generation for perfect matches."""
@@ -277,7 +309,7 @@ class TestReconciliationService:
                 description="Test transaction",
             ),
             score=1200,
-            score_breakdown=ScoreBreakdown(
+            score_breakdown=ScoreBreakdownInput(
                 exact_amount=1000,
                 date_proximity=200,
                 text_similarity=0,
@@ -0,0 +1,174 @@
+import importlib.util
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, inspect
+from app.models import Base, Tenant, Invoice, BankTransaction, MatchCandidate, InvoiceStatus, MatchStatus, Currency
+from app.services.reconciliation_repository import (
+    invoice_candidates,
+    invoice_candidates_query,
+    open_invoices,
+    open_invoices_query,
+    transactions_by_amount,
+    transactions_by_amount_query,
+    unmatched_transactions,
+    unmatched_transactions_query,
+)
+
+MIGRATION = Path(__file__).parent.parent / "migrations" / "versions" / "0001_reconciliation_indexes.py"
+
+
+async def seed_tenant(session) -> str:
+    """Create a tenant with five open invoices, one paid invoice and five transactions."""
+    tenant_id = str(uuid.uuid4())
+    session.add(Tenant(id=tenant_id, name="Acme", slug=f"acme-{tenant_id}"))
+    await session.flush()
+
+    for i in range(6):
+        session.add(Invoice(
+            id=f"{tenant_id}-inv-{i}", tenant_id=tenant_id, amount=Decimal(100 * (i + 1)),
+            currency=Currency.USD, status=InvoiceStatus.PAID if i == 5 else InvoiceStatus.OPEN,
+        ))
+    for i in range(5):
+        session.add(BankTransaction(
+            id=f"{tenant_id}-tx-{i}", tenant_id=tenant_id, posted_at=datetime(2024, 1, 10 - i),
+            amount=Decimal(100 * (5 - i)), currency=Currency.USD, description=f"Payment {i}",
+        ))
+    await session.flush()
+
+    for i, score in enumerate([90, 70, 90, 50]):
+        session.add(MatchCandidate(
+            id=f"{tenant_id}-mc-{i}", tenant_id=tenant_id, invoice_id=f"{tenant_id}-inv-0",
+            bank_transaction_id=f"{tenant_id}-tx-{i}", score=score,
+            status=MatchStatus.CONFIRMED if i == 3 else MatchStatus.PROPOSED,
+        ))
+    await session.commit()
+    return tenant_id
+
+
+async def read_all(fetch, **kwargs) -> list:
+    """Follow cursors from the first page to the last."""
+    rows, after = [], None
+    while True:
+        page = await fetch(after=after, limit=2, **kwargs)
+        rows.extend(page.rows)
+        if page.next_cursor is None:
+            return rows
+        after = page.next_cursor
+
+
+class TestKeysetPagination:
+    """Test that paging through the repository queries returns each row once, in order."""
+
+    async def test_open_invoices(self, db_session):
+        """Test that open invoices are paged in id order without paid invoices."""
+        tenant_id = await seed_tenant(db_session)
+
+        rows = await read_all(lambda **kw: open_invoices(db_session, tenant_id, **kw))
+
+        assert [r.id for r in rows] == [f"{tenant_id}-inv-{i}" for i in range(5)]
+
+    async def test_unmatched_transactions(self, db_session):
+        """Test that transactions are paged by posting date, skipping confirmed matches."""
+        tenant_id = await seed_tenant(db_session)
+
+        rows = await read_all(lambda **kw: unmatched_transactions(db_session, tenant_id, **kw))
+
+        assert [r.id for r in rows] == [f"{tenant_id}-tx-{i}" for i in (4, 2, 1, 0)]
+
+    async def test_transactions_by_amount(self, db_session):
+        """Test that an amount range is paged in amount order."""
+        tenant_id = await seed_tenant(db_session)
+
+        rows = await read_all(
+            lambda **kw: transactions_by_amount(db_session, tenant_id, Decimal(200), Decimal(400), **kw)
+        )
+
+        assert [r.amount for r in rows] == [Decimal(200), Decimal(300), Decimal(400)]
+
+    async def test_invoice_candidates(self, db_session):
+        """Test that candidates are paged best first, ties broken by id."""
+        tenant_id = await seed_tenant(db_session)
+
+        rows = await read_all(
+            lambda **kw: invoice_candidates(db_session, tenant_id, f"{tenant_id}-inv-0", **kw)
+        )
+
+        assert [r.id for r in rows] == [f"{tenant_id}-mc-{i}" for i in (0, 2, 1, 3)]
+
+
+@pytest.fixture
+def sync_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def run_migration(engine, step: str) -> None:
+    spec = importlib.util.spec_from_file_location("reconciliation_indexes", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.connect() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            getattr(migration, step)()
+        conn.commit()
+
+
+def index_names(engine, table: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def query_plan(engine, statement) -> str:
+    """SQLite's plan for a statement, one detail line per step."""
+    sql = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+class TestReconciliationIndexes:
+    """Test the reconciliation index migration and that the repository queries use it."""
+
+    def test_migration_round_trip(self, sync_engine):
+        """Test that downgrade drops the indexes and upgrade recreates them."""
+        run_migration(sync_engine, "downgrade")
+        assert "invoices_tenant_open_idx" not in index_names(sync_engine, "invoices")
+        assert "bank_transactions_tenant_amount_idx" not in index_names(sync_engine, "bank_transactions")
+
+        run_migration(sync_engine, "upgrade")
+        run_migration(sync_engine, "upgrade")
+
+        assert "invoices_tenant_open_idx" in index_names(sync_engine, "invoices")
+        assert {
+            "bank_transactions_tenant_posted_at_idx",
+            "bank_transactions_tenant_amount_idx",
+        } <= index_names(sync_engine, "bank_transactions")
+
+    @pytest.mark.parametrize(
+        "statement, search",
+        [
+            (open_invoices_query("t", after="inv-1"), "USING INDEX invoices_tenant_open_idx"),
+            (
+                unmatched_transactions_query("t", after=(datetime(2024, 1, 1), "tx-1")),
+                "USING INDEX bank_transactions_tenant_posted_at_idx",
+            ),
+            (
+                transactions_by_amount_query("t", Decimal(1), Decimal(9), after=(Decimal(2), "tx-1")),
+                "USING INDEX bank_transactions_tenant_amount_idx",
+            ),
+            (
+                invoice_candidates_query("t", "inv-1", after=(50, "mc-1")),
+                # SQLite names the index backing a unique constraint itself
+                "USING INDEX sqlite_autoindex_match_candidates_2 (tenant_id=? AND invoice_id=?)",
+            ),
+        ],
+    )
+    def test_queries_use_indexes(self, sync_engine, statement, search):
+        """Test that each keyset query is planned as an index search, not a table scan."""
+        plan = query_plan(sync_engine, statement)
+
+        assert search in plan, plan
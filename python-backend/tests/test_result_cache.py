@@ -0,0 +1,153 @@
+import time
+import pytest
+from app.graphql.schema import schema
+from app.services.reconciliation_service import ReconciliationService
+from app.services.result_cache import DiskResultStore, ScoringResultCache, request_key
+
+
+INVOICES = [
+    {"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15", "description": "ss ww", "vendor_name": "sss"},
+    {"id": "inv-002", "amount": 250, "invoice_date": "2024-01-17", "description": "rent"},
+]
+
+TRANSACTIONS = [
+    {"id": "tx-001", "amount": 100, "posted_at": "2024-01-15", "description": "sss ww"},
+    {"id": "tx-002", "amount": 250, "posted_at": "2024-01-18", "description": "rent jan"},
+]
+
+
+def summary(result) -> list:
+    return [(c.invoice_id, c.transaction_id, c.score, c.explanation()) for c in result.candidates]
+
+
+def service_with(cache: ScoringResultCache) -> ReconciliationService:
+    service = ReconciliationService()
+    service.result_cache = cache
+    return service
+
+
+@pytest.fixture
+def disk(tmp_path):
+    store = DiskResultStore(str(tmp_path / "results.sqlite3"))
+    yield store
+    store.close()
+
+
+class TestRequestKey:
+    """Test the content hash of scoring requests."""
+
+    def test_field_order_does_not_matter(self):
+        """Test that records with the same fields in another order give the same key."""
+        reordered = [dict(reversed(list(invoice.items()))) for invoice in INVOICES]
+
+        assert request_key("t", {}, INVOICES, TRANSACTIONS) == request_key("t", {}, reordered, TRANSACTIONS)
+
+    def test_content_and_settings_change_the_key(self):
+        """Test that tenant, settings and record changes all give a new key."""
+        key = request_key("t", {"top_n": 5}, INVOICES, TRANSACTIONS)
+        changed = [dict(INVOICES[0], amount=101), INVOICES[1]]
+
+        assert key != request_key("u", {"top_n": 5}, INVOICES, TRANSACTIONS)
+        assert key != request_key("t", {"top_n": 3}, INVOICES, TRANSACTIONS)
+        assert key != request_key("t", {"top_n": 5}, changed, TRANSACTIONS)
+        assert key != request_key("t", {"top_n": 5}, TRANSACTIONS, INVOICES)
+
+
+class TestServiceResultCache:
+    """Test caching of score_candidates results."""
+
+    def test_repeat_request_is_served_from_cache(self):
+        """Test that an identical request skips scoring and returns the same candidates."""
+        service = service_with(ScoringResultCache())
+
+        first = service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+        second = service.score_candidates("tenant-cache", [dict(i) for i in INVOICES], TRANSACTIONS, backend="numpy")
+
+        assert summary(second) == summary(first)
+        assert (service.result_cache.hits, service.result_cache.misses) == (1, 1)
+        assert service.index_cache_stats().hits == 0
+
+    def test_configuration_changes_miss(self):
+        """Test that top_n, weights, plans and text engines are part of the key."""
+        service = service_with(ScoringResultCache())
+        service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+
+        service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS, top_n=1)
+        service.VENDOR_MATCH_SCORE = 50
+        weighted = service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+        service.set_text_engine("tenant-cache", "tfidf")
+        service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+
+        assert (service.result_cache.hits, service.result_cache.misses) == (0, 4)
+        assert weighted.candidates[0].score_breakdown.vendor_match == 50
+
+    def test_ttl_and_invalidation(self):
+        """Test that results expire after the TTL and are dropped with the tenant's indexes."""
+        service = service_with(ScoringResultCache(ttl=0.01))
+        service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+        time.sleep(0.02)
+        service.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+
+        assert service.result_cache.expirations == 1
+        assert service.invalidate_tenant_indexes("tenant-cache") == 3
+        assert len(service.result_cache) == 0
+
+    def test_size_budget_evicts_least_recently_used(self):
+        """Test that results beyond the memory budget evict the oldest."""
+        service = service_with(ScoringResultCache())
+        service.score_candidates("tenant-a", INVOICES, TRANSACTIONS)
+        service.result_cache.max_bytes = service.result_cache.bytes
+
+        service.score_candidates("tenant-b", INVOICES, TRANSACTIONS)
+        service.score_candidates("tenant-a", INVOICES, TRANSACTIONS)
+
+        stats = service.result_cache_stats()
+        assert (stats.entries, stats.evictions, stats.hits, stats.misses) == (1, 2, 0, 3)
+
+    def test_disk_results_are_shared_between_processes(self, disk):
+        """Test that a second service, as in another worker, rebuilds results from disk."""
+        first = service_with(ScoringResultCache(disk=disk)).score_candidates(
+            "tenant-cache", INVOICES, TRANSACTIONS
+        )
+        other = service_with(ScoringResultCache(disk=DiskResultStore(disk.path)))
+
+        second = other.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+        third = other.score_candidates("tenant-cache", INVOICES, TRANSACTIONS)
+
+        assert summary(second) == summary(first) == summary(third)
+        assert (other.result_cache.disk_hits, other.result_cache.hits) == (1, 1)
+        assert other.invalidate_tenant_indexes("tenant-cache") == 2
+        other.result_cache.disk.close()
+
+    def test_disk_size_budget(self, disk):
+        """Test that the disk store deletes the least recently used rows past its budget."""
+        payload = {"rows": list(range(100))}
+        disk.put("a", "tenant", payload, ttl=60)
+        size = disk._connect().execute("SELECT size FROM results").fetchone()[0]
+        disk.max_bytes = size * 3 // 2
+
+        assert disk.put("b", "tenant", payload, ttl=60) == 1
+        assert disk.get("a") == (None, False)
+        assert disk.get("b")[0] == payload
+
+
+class TestResultCacheSchema:
+    """Test result cache statistics through the GraphQL schema."""
+
+    async def test_result_cache_stats(self):
+        """Test that repeat scoreCandidates calls show up as hits."""
+        mutation = """mutation {
+            scoreCandidates(
+                tenantId: "schema-result-cache",
+                invoices: [{id: "inv-001", amount: 100, invoiceDate: "2024-01-15"}],
+                transactions: [{id: "tx-001", amount: 100, postedAt: "2024-01-15", description: "x"}]
+            ) { candidates { transactionId } }
+        }"""
+        before = (await schema.execute("{ resultCacheStats { hits } }")).data["resultCacheStats"]["hits"]
+        await schema.execute(mutation)
+        await schema.execute(mutation)
+
+        result = await schema.execute("{ resultCacheStats { hits misses entries maxBytes ttlSeconds shared } }")
+        assert result.errors is None
+        assert result.data["resultCacheStats"]["hits"] == before + 1
+        assert result.data["resultCacheStats"]["shared"] is False
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import pytest
+import app.graphql.schema as graphql_schema
+from app.graphql.schema import schema
+from app.services.scheduler import ScoringScheduler, SchedulerBusy
+
+
+class Gate:
+    """Jobs that record their start order and block until released."""
+
+    def __init__(self):
+        self.started = []
+        self.released = threading.Event()
+
+    def job(self, name: str):
+        self.started.append(name)
+        self.released.wait(5)
+        return name
+
+
+async def submit(scheduler: ScoringScheduler, tenant_id: str, fn, *args) -> asyncio.Task:
+    task = asyncio.create_task(scheduler.run(tenant_id, fn, *args))
+    # Let the task reach admission before the next one is submitted
+    await asyncio.sleep(0.01)
+    return task
+
+
+@pytest.fixture
+def gate():
+    gate = Gate()
+    yield gate
+    gate.released.set()
+
+
+class TestScoringScheduler:
+    """Test off-loop scoring with per-tenant admission control."""
+
+    async def test_runs_off_the_event_loop(self):
+        """Test that jobs run on a scoring thread and return their result."""
+        scheduler = ScoringScheduler(threads=2)
+
+        thread = await scheduler.run("tenant-a", threading.get_ident)
+
+        assert thread != threading.get_ident()
+        assert scheduler.stats()["completed"] == 1
+        scheduler.shutdown()
+
+    async def test_errors_propagate(self):
+        """Test that a job's exception is raised to the caller."""
+        scheduler = ScoringScheduler(threads=1)
+
+        def fail():
+            raise ValueError("bad backend")
+
+        with pytest.raises(ValueError, match="bad backend"):
+            await scheduler.run("tenant-a", fail)
+        scheduler.shutdown()
+
+    async def test_round_robin_between_tenants(self, gate):
+        """Test that a tenant arriving behind a backlog waits for one job, not all of them."""
+        scheduler = ScoringScheduler(threads=1)
+
+        tasks = [await submit(scheduler, "big", gate.job, f"big-{i}") for i in range(4)]
+        tasks.append(await submit(scheduler, "small", gate.job, "small-0"))
+        gate.released.set()
+        await asyncio.gather(*tasks)
+
+        assert gate.started == ["big-0", "big-1", "small-0", "big-2", "big-3"]
+        scheduler.shutdown()
+
+    async def test_tenant_concurrency_leaves_threads_for_others(self, gate):
+        """Test that a busy tenant's backlog does not hold a free thread from another tenant."""
+        scheduler = ScoringScheduler(threads=2, tenant_concurrency=1)
+
+        tasks = [await submit(scheduler, "big", gate.job, f"big-{i}") for i in range(3)]
+        small = await scheduler.run("small", threading.get_ident)
+
+        assert small != threading.get_ident()
+        assert gate.started == ["big-0"]
+        gate.released.set()
+        await asyncio.gather(*tasks)
+        scheduler.shutdown()
+
+    async def test_full_queues_reject_with_retry_hint(self, gate):
+        """Test that the per-tenant and global queue limits reject instead of waiting."""
+        scheduler = ScoringScheduler(threads=1, queue_limit=2, tenant_queue_limit=1)
+
+        tasks = [
+            await submit(scheduler, "big", gate.job, "big-0"),
+            await submit(scheduler, "big", gate.job, "big-1"),
+        ]
+        with pytest.raises(SchedulerBusy) as tenant_full:
+            await scheduler.run("big", gate.job, "big-2")
+
+        tasks.append(await submit(scheduler, "small", gate.job, "small-0"))
+        with pytest.raises(SchedulerBusy, match="queue is full") as queue_full:
+            await scheduler.run("other", gate.job, "other-0")
+
+        assert tenant_full.value.retry_after >= 1
+        assert queue_full.value.retry_after >= 1
+        assert scheduler.stats()["rejected"] == 2
+        gate.released.set()
+        await asyncio.gather(*tasks)
+        scheduler.shutdown()
+
+    async def test_cancelled_job_leaves_the_queue(self, gate):
+        """Test that cancelling a waiting job frees its queue slot."""
+        scheduler = ScoringScheduler(threads=1)
+
+        running = await submit(scheduler, "big", gate.job, "big-0")
+        waiting = await submit(scheduler, "big", gate.job, "big-1")
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert scheduler.stats()["queued"] == 0
+        gate.released.set()
+        await running
+        assert gate.started == ["big-0"]
+        scheduler.shutdown()
+
+
+class TestSchedulerIntegration:
+    """Test how rejections reach GraphQL and HTTP callers."""
+
+    async def test_graphql_rejection_has_retry_after(self, gate, monkeypatch):
+        """Test that a full queue surfaces as a SCORING_BUSY error with a retry hint."""
+        scheduler = ScoringScheduler(threads=1, queue_limit=0)
+        monkeypatch.setattr(graphql_schema, "scoring_scheduler", scheduler)
+        running = await submit(scheduler, "big", gate.job, "big-0")
+
+        result = await schema.execute("""mutation {
+            scoreCandidates(tenantId: "small", invoices: [], transactions: []) { processedInvoices }
+        }""")
+
+        assert result.errors[0].extensions["code"] == "SCORING_BUSY"
+        assert result.errors[0].extensions["retryAfter"] >= 1
+        gate.released.set()
+        await running
+        scheduler.shutdown()
+
+    def test_queue_stats_endpoint(self, test_client):
+        """Test the scoring queue statistics endpoint."""
+        response = test_client.get("/scoring/queue")
+
+        assert response.status_code == 200
+        assert {"threads", "active", "queued", "rejected"} <= set(response.json())
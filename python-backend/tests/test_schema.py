@@ -0,0 +1,152 @@
+from app.graphql.schema import schema
+
+
+INVOICES = """[
+    {id: "inv-001", amount: 100, invoiceDate: "2024-01-15", description: "ss ww", vendorName: "sss"},
+    {id: "inv-002", amount: 250, invoiceDate: "2024-01-17"}
+]"""
+
+TRANSACTIONS = """[
+    {id: "tx-001", amount: 100, postedAt: "2024-01-15", description: "sss ww"},
+    {id: "tx-002", amount: 250, postedAt: "2024-01-17", description: "s", reference: "REF-2"}
+]"""
+
+
+async def execute(query: str) -> dict:
+    result = await schema.execute(query)
+    assert result.errors is None, result.errors
+    return result.data
+
+
+class TestScoringMutations:
+    """Test the scoring mutations through the GraphQL schema."""
+
+    async def test_score_candidates(self):
+        """Test that scoreCandidates accepts invoice and transaction inputs."""
+        data = await execute(f"""mutation {{
+            scoreCandidates(tenantId: "schema-score", invoices: {INVOICES}, transactions: {TRANSACTIONS}) {{
+                candidates {{ invoiceId transactionId score explanation }}
+                processedInvoices
+            }}
+        }}""")
+
+        result = data["scoreCandidates"]
+        assert result["processedInvoices"] == 2
+        assert result["candidates"][0]["explanation"]
+
+    async def test_score_candidates_columnar(self):
+        """Test that scoreCandidatesColumnar returns scoreCandidates as parallel arrays."""
+        rows = (await execute(f"""mutation {{
+            scoreCandidates(tenantId: "schema-columnar", invoices: {INVOICES}, transactions: {TRANSACTIONS}) {{
+                candidates {{ invoiceId transactionId score scoreBreakdown {{ vendorMatch }} }}
+            }}
+        }}"""))["scoreCandidates"]["candidates"]
+        data = await execute(f"""mutation {{
+            scoreCandidatesColumnar(
+                tenantId: "schema-columnar", invoices: {INVOICES}, transactions: {TRANSACTIONS}
+            ) {{ invoiceIds transactionIds scores vendorMatch explanations processedTransactions }}
+        }}""")
+
+        columns = data["scoreCandidatesColumnar"]
+        assert list(zip(columns["invoiceIds"], columns["transactionIds"], columns["scores"], columns["vendorMatch"])) == [
+            (c["invoiceId"], c["transactionId"], c["score"], c["scoreBreakdown"]["vendorMatch"]) for c in rows
+        ]
+        assert len(columns["explanations"]) == len(rows)
+        assert columns["processedTransactions"] == 2
+
+    async def test_propose_assignment(self):
+        """Test that proposeAssignment returns a one-to-one matching."""
+        data = await execute(f"""mutation {{
+            proposeAssignment(tenantId: "schema-assign", invoices: {INVOICES}, transactions: {TRANSACTIONS}) {{
+                proposals {{ invoiceId transactionId }}
+                totalScore
+            }}
+        }}""")
+
+        pairs = [(p["invoiceId"], p["transactionId"]) for p in data["proposeAssignment"]["proposals"]]
+        assert sorted(pairs) == [("inv-001", "tx-001"), ("inv-002", "tx-002")]
+
+
+class TestBlockingMutations:
+    """Test blocking plan mutations through the GraphQL schema."""
+
+    async def test_set_blocking_plan(self):
+        """Test that setBlockingPlan is reflected by the blockingPlan query."""
+        await execute("""mutation {
+            setBlockingPlan(tenantId: "schema-plan", keys: ["amount", "date"], match: "any") { keys }
+        }""")
+
+        data = await execute('{ blockingPlan(tenantId: "schema-plan") { keys match fullScanFallback } }')
+        assert data["blockingPlan"] == {"keys": ["amount", "date"], "match": "any", "fullScanFallback": False}
+
+    async def test_audit_blocking_recall(self):
+        """Test that auditBlockingRecall reports recall for the audited keys."""
+        data = await execute(f"""mutation {{
+            auditBlockingRecall(
+                tenantId: "schema-audit", invoices: {INVOICES}, transactions: {TRANSACTIONS}, keys: ["amount"]
+            ) {{ sampledInvoices recall plan {{ keys }} }}
+        }}""")
+
+        audit = data["auditBlockingRecall"]
+        assert audit["sampledInvoices"] == 2
+        assert 0 <= audit["recall"] <= 1
+        assert audit["plan"]["keys"] == ["amount"]
+
+
+class TestWorkingSetMutations:
+    """Test working set mutations through the GraphQL schema."""
+
+    async def test_sync_delta_and_score(self):
+        """Test a sync, a delta and both scoring mutations against the retained set."""
+        version = (await execute(f"""mutation {{
+            syncWorkingSet(tenantId: "schema-ws", invoices: {INVOICES}, transactions: {TRANSACTIONS}) {{ version }}
+        }}"""))["syncWorkingSet"]["version"]
+
+        delta = (await execute(f"""mutation {{
+            applyWorkingSetDelta(tenantId: "schema-ws", baseVersion: "{version}", removeTransactionIds: ["tx-002"]) {{
+                version invoices transactions
+            }}
+        }}"""))["applyWorkingSetDelta"]
+        assert (delta["invoices"], delta["transactions"]) == (2, 1)
+
+        scored = (await execute(f"""mutation {{
+            scoreWorkingSet(tenantId: "schema-ws", version: "{delta['version']}") {{
+                candidates {{ transactionId }}
+            }}
+        }}"""))["scoreWorkingSet"]
+        rescored = (await execute(f"""mutation {{
+            rescoreWorkingSet(tenantId: "schema-ws", version: "{delta['version']}") {{
+                candidates {{ transactionId }}
+                incremental
+            }}
+        }}"""))["rescoreWorkingSet"]
+
+        assert rescored["candidates"] == scored["candidates"]
+        assert {c["transactionId"] for c in scored["candidates"]} == {"tx-001"}
+
+    async def test_stale_version_is_an_error(self):
+        """Test that a stale version surfaces as a GraphQL error."""
+        result = await schema.execute("""mutation {
+            applyWorkingSetDelta(tenantId: "schema-missing", baseVersion: "stale") { version }
+        }""")
+
+        assert "full resync required" in result.errors[0].message
+
+
+class TestIndexCacheMutations:
+    """Test index cache operations through the GraphQL schema."""
+
+    async def test_stats_and_invalidate(self):
+        """Test that scoring fills the cache and invalidation empties it for the tenant."""
+        await execute(f"""mutation {{
+            scoreCandidates(tenantId: "schema-cache", invoices: {INVOICES}, transactions: {TRANSACTIONS}) {{
+                processedInvoices
+            }}
+        }}""")
+
+        stats = (await execute("{ indexCacheStats { entries bytes maxBytes } }"))["indexCacheStats"]
+        assert stats["entries"] >= 2
+
+        data = await execute('mutation { invalidateTenantIndexes(tenantId: "schema-cache") }')
+        # Invoice and transaction indexes plus the cached result
+        assert data["invalidateTenantIndexes"] == 3
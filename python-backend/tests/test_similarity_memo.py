@@ -0,0 +1,114 @@
+import pickle
+import pytest
+from app.graphql.schema import schema
+from app.services.features import InvoiceRecord, TransactionRecord
+from app.services.reconciliation_service import ReconciliationService
+from app.services.result_cache import ScoringResultCache
+from app.services.similarity_memo import SimilarityMemo
+from app.services.text_similarity import SequenceMatcherEngine, sequence_ratio
+
+
+PAIRS = [("ss ww", "s w s"), ("www", "ss ww"), ("s w s", "ss ww"), ("ss ww", "s w s"), ("www", "ss ww")]
+
+
+def invoice(description):
+    return InvoiceRecord({"id": "inv-001", "amount": 100, "description": description})
+
+
+def transaction(description):
+    return TransactionRecord({"id": "tx-001", "amount": 100, "description": description})
+
+
+def records(month: int) -> tuple:
+    # The same recurring descriptions every month, under new ids
+    invoices = [
+        {"id": f"inv-{month}-{i}", "amount": 100 + i, "invoice_date": f"2024-0{month}-01", "description": text}
+        for i, text in enumerate(["acme saas plan", "office rent", "payroll run"])
+    ]
+    transactions = [
+        {"id": f"tx-{month}-{i}", "amount": 100 + i, "posted_at": f"2024-0{month}-02", "description": text}
+        for i, text in enumerate(["ACME SaaS monthly", "Rent - office", "Payroll"])
+    ]
+    return invoices, transactions
+
+
+class TestSimilarityMemo:
+    """Test the description-pair similarity memo."""
+
+    def test_memoized_ratios_match_sequence_matcher(self):
+        """Test that the memo returns the engine's ratios and counts repeat pairs as hits."""
+        memo = SimilarityMemo()
+        engine = SequenceMatcherEngine(memo)
+
+        for left, right in PAIRS:
+            assert engine.similarity(invoice(left), transaction(right)) == sequence_ratio(left, right)
+
+        # Pairs are ordered: ("s w s", "ss ww") is not ("ss ww", "s w s")
+        assert (memo.hits, memo.misses, len(memo)) == (2, 3, 3)
+        assert memo.hit_rate == pytest.approx(0.4)
+
+    def test_entries_are_bounded(self):
+        """Test that the least recently used pairs are evicted beyond max_entries."""
+        memo = SimilarityMemo(max_entries=2)
+
+        for left, right in [("a", "b"), ("a", "c"), ("a", "b"), ("a", "d")]:
+            memo.ratio(left, right, sequence_ratio)
+
+        assert (len(memo), memo.evictions) == (2, 1)
+        memo.ratio("a", "b", sequence_ratio)
+        assert memo.hits == 2
+
+    def test_save_and_load(self, tmp_path):
+        """Test that saved ratios are hits in a new memo and damaged files are rejected."""
+        path = str(tmp_path / "memo.bin")
+        memo = SimilarityMemo(path=path)
+        for left, right in PAIRS:
+            memo.ratio(left, right, sequence_ratio)
+        assert memo.save() == 3
+
+        restored = SimilarityMemo(max_entries=2, path=path)
+        assert restored.load() == 2
+        assert restored.ratio("www", "ss ww", sequence_ratio) == sequence_ratio("www", "ss ww")
+        assert restored.hits == 1
+
+        (tmp_path / "memo.bin").write_bytes(b"not a memo")
+        with pytest.raises(ValueError):
+            SimilarityMemo(path=path).load()
+
+    def test_pool_workers_get_an_empty_memo(self):
+        """Test that a pickled memo keeps its bound but not its entries or lock."""
+        memo = SimilarityMemo(max_entries=10)
+        memo.ratio("a", "b", sequence_ratio)
+
+        copy = pickle.loads(pickle.dumps(memo))
+
+        assert (len(copy), copy.max_entries) == (0, 10)
+
+
+class TestServiceSimilarityMemo:
+    """Test the memo across scoring requests."""
+
+    def test_recurring_descriptions_hit_across_runs(self):
+        """Test that next month's run reuses ratios and scores exactly as without the memo."""
+        service = ReconciliationService()
+        service.result_cache = ScoringResultCache(max_bytes=0)
+        plain = ReconciliationService()
+        plain.similarity_memo = SimilarityMemo(max_entries=0)
+
+        service.score_candidates("tenant-memo", *records(1), top_n=3)
+        misses = service.similarity_memo.misses
+        second = service.score_candidates("tenant-memo", *records(2), top_n=3)
+        expected = plain.score_candidates("tenant-memo", *records(2), top_n=3)
+
+        assert [(c.transaction_id, c.score_breakdown.text_similarity) for c in second.candidates] == [
+            (c.transaction_id, c.score_breakdown.text_similarity) for c in expected.candidates
+        ]
+        assert service.similarity_memo.misses == misses
+        assert service.similarity_memo_stats().hit_rate == 0.5
+
+    async def test_stats_query(self):
+        """Test the similarityMemoStats query."""
+        result = await schema.execute("{ similarityMemoStats { entries maxEntries hits misses hitRate persistent } }")
+
+        assert result.errors is None
+        assert result.data["similarityMemoStats"]["persistent"] is False
@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+import app.graphql.schema as graphql_schema
+from app.graphql.schema import schema
+from app.services.scheduler import ScoringScheduler
+from app.services.single_flight import SingleFlight
+
+
+class Call:
+    """An awaitable call that counts its runs and finishes when released."""
+
+    def __init__(self, result=None, error: Exception = None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.cancelled = 0
+        self.released = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.released.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class HeldScheduler(ScoringScheduler):
+    """Scheduler that admits jobs only once released."""
+
+    def __init__(self):
+        super().__init__(threads=1)
+        self.released = asyncio.Event()
+
+    async def run(self, *args, **kwargs):
+        await self.released.wait()
+        return await super().run(*args, **kwargs)
+
+
+async def start(flights: SingleFlight, key: str, call: Call) -> asyncio.Task:
+    task = asyncio.create_task(flights.run(key, call))
+    # Let the task reach the flight before the next caller arrives
+    await asyncio.sleep(0)
+    return task
+
+
+class TestSingleFlight:
+    """Test sharing one in-flight call between identical callers."""
+
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that callers with the same key share a run and others get their own."""
+        flights = SingleFlight()
+        call, other = Call("shared"), Call("other")
+
+        tasks = [await start(flights, "a", call) for _ in range(3)]
+        tasks.append(await start(flights, "b", other))
+        call.released.set()
+        other.released.set()
+
+        assert await asyncio.gather(*tasks) == ["shared", "shared", "shared", "other"]
+        assert (call.runs, other.runs) == (1, 1)
+        assert flights.stats() == {"in_flight": 0, "started": 2, "coalesced": 2}
+
+    async def test_errors_reach_every_caller_and_are_not_kept(self):
+        """Test that a failed call fails all its callers and the next caller retries."""
+        flights = SingleFlight()
+        failing = Call(error=ValueError("bad backend"))
+
+        tasks = [await start(flights, "a", failing) for _ in range(2)]
+        failing.released.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert [str(result) for result in results] == ["bad backend", "bad backend"]
+        retry = Call("ok")
+        retry.released.set()
+        assert await flights.run("a", retry) == "ok"
+
+    async def test_cancelled_caller_leaves_the_call_running(self):
+        """Test that cancelling one caller does not cancel the call for the others."""
+        flights = SingleFlight()
+        call = Call("shared")
+
+        first = await start(flights, "a", call)
+        second = await start(flights, "a", call)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        call.released.set()
+
+        assert await second == "shared"
+        assert call.cancelled == 0
+
+    async def test_call_is_cancelled_when_every_caller_leaves(self):
+        """Test that the call stops once nobody waits and a new caller starts afresh."""
+        flights = SingleFlight()
+        call = Call("shared")
+
+        tasks = [await start(flights, "a", call) for _ in range(2)]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert call.cancelled == 1
+        assert flights.stats()["in_flight"] == 0
+        fresh = Call("fresh")
+        fresh.released.set()
+        assert await flights.run("a", fresh) == "fresh"
+
+
+class TestCoalescedScoring:
+    """Test coalescing of scoreCandidates requests through the GraphQL schema."""
+
+    async def test_identical_requests_score_once(self, monkeypatch):
+        """Test that identical concurrent requests share one scheduler job and result."""
+        scheduler = HeldScheduler()
+        flights = SingleFlight()
+        monkeypatch.setattr(graphql_schema, "scoring_scheduler", scheduler)
+        monkeypatch.setattr(graphql_schema, "scoring_flights", flights)
+        mutation = """mutation {
+            scoreCandidates(
+                tenantId: "schema-single-flight",
+                invoices: [{id: "inv-001", amount: 100, invoiceDate: "2024-01-15"}],
+                transactions: [{id: "tx-001", amount: 100, postedAt: "2024-01-15", description: "x"}]
+            ) { candidates { transactionId score explanation } }
+        }"""
+
+        tasks = [asyncio.create_task(schema.execute(mutation)) for _ in range(3)]
+        for _ in range(100):
+            if flights.joined == 2:
+                break
+            await asyncio.sleep(0.01)
+        scheduler.released.set()
+        results = await asyncio.gather(*tasks)
+
+        assert all(result.errors is None for result in results)
+        assert results[0].data == results[1].data == results[2].data
+        assert scheduler.stats()["admitted"] == 1
+        scheduler.shutdown()
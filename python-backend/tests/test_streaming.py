@@ -0,0 +1,62 @@
+import json
+import pytest
+from app.services.reconciliation_service import ReconciliationService
+
+
+INVOICES = [
+    {"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15", "description": "ss ww"},
+    {"id": "inv-002", "amount": 5000, "invoice_date": "2024-01-15"},
+    {"id": "inv-003", "amount": 250, "invoice_date": "2024-01-16", "description": "s w"},
+]
+
+TRANSACTIONS = [
+    {"id": "tx-001", "amount": 100, "posted_at": "2024-01-15", "description": "ss ww"},
+    {"id": "tx-002", "amount": 100.5, "posted_at": "2024-01-17", "description": "s"},
+    {"id": "tx-003", "amount": 250, "posted_at": "2024-01-16", "description": "s w"},
+]
+
+
+class TestStreamingScoring:
+    """Test per-invoice streaming of scored candidates."""
+
+    def test_stream_matches_batch(self):
+        """Test that streamed candidates are the batch candidates grouped by invoice."""
+        service = ReconciliationService()
+
+        streamed = list(service.iter_candidates("tenant-001", INVOICES, TRANSACTIONS, top_n=2))
+        batch = service.score_candidates("tenant-001", INVOICES, TRANSACTIONS, top_n=2)
+
+        assert [invoice_id for invoice_id, _ in streamed] == ["inv-001", "inv-002", "inv-003"]
+        assert streamed[1][1] == []
+        flattened = sorted(
+            ((-c.score, c.invoice_id, c.transaction_id) for _, cs in streamed for c in cs)
+        )
+        assert flattened == [(-c.score, c.invoice_id, c.transaction_id) for c in batch.candidates]
+
+    def test_invalid_arguments_raise_eagerly(self):
+        """Test that bad arguments fail before iteration starts."""
+        with pytest.raises(ValueError):
+            ReconciliationService().iter_candidates("tenant-001", [], [], backend="gpu")
+
+    def test_ndjson_endpoint(self, test_client):
+        """Test the NDJSON streaming endpoint."""
+        response = test_client.post(
+            "/score/stream",
+            json={"tenant_id": "tenant-001", "invoices": INVOICES, "transactions": TRANSACTIONS},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["invoice_id"] for line in lines] == ["inv-001", "inv-002", "inv-003"]
+        assert lines[0]["candidates"][0]["transaction_id"] == "tx-001"
+        assert "explanation" in lines[0]["candidates"][0]
+
+    def test_ndjson_endpoint_rejects_unknown_backend(self, test_client):
+        """Test that invalid arguments return 400 before streaming."""
+        response = test_client.post(
+            "/score/stream",
+            json={"tenant_id": "tenant-001", "invoices": [], "transactions": [], "backend": "gpu"},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,204 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select
+from app.graphql.schema import schema
+from app.graphql.types import ReconciliationCandidate, ScoreBreakdown
+from app.models import Tenant, Vendor, Invoice, BankTransaction, MatchCandidate, InvoiceStatus, MatchStatus, Currency
+from app.services.reconciliation_service import ReconciliationService
+from tests.conftest import TestingSessionLocal
+from app.services.tenant_store import (
+    load_open_invoices,
+    load_unmatched_transactions,
+    load_vendor_names,
+    write_candidates,
+)
+
+
+async def seed_tenant(session) -> str:
+    """Create a tenant with two open invoices, one paid invoice and three transactions."""
+    tenant_id = str(uuid.uuid4())
+    session.add(Tenant(id=tenant_id, name="Acme", slug=f"acme-{tenant_id}"))
+    session.add(Vendor(id=f"{tenant_id}-v1", tenant_id=tenant_id, name="Office Supplies Co"))
+    await session.flush()
+
+    session.add_all([
+        Invoice(
+            id=f"{tenant_id}-inv-1", tenant_id=tenant_id, vendor_id=f"{tenant_id}-v1",
+            invoice_number="INV-001", amount=Decimal("1500.00"), currency=Currency.USD,
+            invoice_date=datetime(2024, 1, 15), description="Office supplies",
+            status=InvoiceStatus.OPEN,
+        ),
+        Invoice(
+            id=f"{tenant_id}-inv-2", tenant_id=tenant_id, amount=Decimal("250.00"),
+            currency=Currency.USD, invoice_date=datetime(2024, 1, 20), status=InvoiceStatus.OPEN,
+        ),
+        Invoice(
+            id=f"{tenant_id}-inv-3", tenant_id=tenant_id, amount=Decimal("99.00"),
+            currency=Currency.USD, status=InvoiceStatus.PAID,
+        ),
+        BankTransaction(
+            id=f"{tenant_id}-tx-1", tenant_id=tenant_id, posted_at=datetime(2024, 1, 16),
+            amount=Decimal("1500.00"), currency=Currency.USD, description="Payment to Office Supplies Co",
+        ),
+        BankTransaction(
+            id=f"{tenant_id}-tx-2", tenant_id=tenant_id, posted_at=datetime(2024, 1, 21),
+            amount=Decimal("250.00"), currency=Currency.USD, description="Card payment",
+        ),
+        BankTransaction(
+            id=f"{tenant_id}-tx-3", tenant_id=tenant_id, posted_at=datetime(2024, 1, 10),
+            amount=Decimal("99.00"), currency=Currency.USD, description="Settled",
+        ),
+    ])
+    await session.flush()
+
+    session.add(MatchCandidate(
+        id=str(uuid.uuid4()), tenant_id=tenant_id, invoice_id=f"{tenant_id}-inv-3",
+        bank_transaction_id=f"{tenant_id}-tx-3", score=100, status=MatchStatus.CONFIRMED,
+    ))
+    await session.commit()
+    return tenant_id
+
+
+def candidate(invoice_id: str, transaction_id: str, score: int) -> ReconciliationCandidate:
+    return ReconciliationCandidate(
+        invoice_id=invoice_id,
+        transaction_id=transaction_id,
+        score=score,
+        score_breakdown=ScoreBreakdown(
+            exact_amount=score, date_proximity=0, text_similarity=0, vendor_match=0, total=score
+        ),
+        explainer=lambda: "Stored explanation",
+    )
+
+
+class TestTenantLoaders:
+    """Test the streaming tenant loaders."""
+
+    async def test_open_invoices_as_scoring_dicts(self, db_session):
+        """Test that only open invoices are loaded, with vendor names and ISO dates."""
+        tenant_id = await seed_tenant(db_session)
+
+        invoices = await load_open_invoices(db_session, tenant_id, batch_size=1)
+
+        assert [invoice["id"] for invoice in invoices] == [f"{tenant_id}-inv-1", f"{tenant_id}-inv-2"]
+        assert invoices[0] == {
+            "id": f"{tenant_id}-inv-1",
+            "amount": 1500.0,
+            "currency": "USD",
+            "invoice_date": "2024-01-15T00:00:00",
+            "description": "Office supplies",
+            "vendor_name": "Office Supplies Co",
+            "invoice_number": "INV-001",
+        }
+        assert invoices[1]["vendor_name"] == ""
+        assert invoices[1]["description"] == ""
+
+    async def test_confirmed_transactions_excluded(self, db_session):
+        """Test that transactions with a confirmed match are not loaded."""
+        tenant_id = await seed_tenant(db_session)
+
+        transactions = await load_unmatched_transactions(db_session, tenant_id, batch_size=1)
+
+        assert [tx["id"] for tx in transactions] == [f"{tenant_id}-tx-1", f"{tenant_id}-tx-2"]
+        assert transactions[0]["posted_at"] == "2024-01-16T00:00:00"
+        assert transactions[0]["amount"] == 1500.0
+
+    async def test_vendor_names(self, db_session):
+        """Test that vendor names are loaded per tenant."""
+        tenant_id = await seed_tenant(db_session)
+
+        assert await load_vendor_names(db_session, tenant_id) == ["Office Supplies Co"]
+        assert await load_vendor_names(db_session, "other-tenant") == []
+
+
+class TestWriteCandidates:
+    """Test storing proposed match candidates."""
+
+    async def test_replaces_proposed_and_skips_decided(self, db_session):
+        """Test that proposals are replaced and confirmed pairs are not proposed again."""
+        tenant_id = await seed_tenant(db_session)
+        inv1, inv3 = f"{tenant_id}-inv-1", f"{tenant_id}-inv-3"
+        tx1, tx2, tx3 = f"{tenant_id}-tx-1", f"{tenant_id}-tx-2", f"{tenant_id}-tx-3"
+
+        await write_candidates(db_session, tenant_id, [candidate(inv1, tx2, 40)])
+        await db_session.commit()
+
+        written, removed = await write_candidates(
+            db_session, tenant_id, [candidate(inv1, tx1, 95), candidate(inv3, tx3, 100)]
+        )
+        await db_session.commit()
+
+        result = await db_session.execute(
+            select(MatchCandidate.invoice_id, MatchCandidate.bank_transaction_id, MatchCandidate.status)
+            .where(MatchCandidate.tenant_id == tenant_id)
+            .order_by(MatchCandidate.invoice_id)
+        )
+        assert (written, removed) == (1, 1)
+        assert result.all() == [
+            (inv1, tx1, MatchStatus.PROPOSED),
+            (inv3, tx3, MatchStatus.CONFIRMED),
+        ]
+
+    async def test_unchanged_rows_skipped(self, db_session):
+        """Test that rewriting identical candidates touches nothing and changes update in place."""
+        tenant_id = await seed_tenant(db_session)
+        inv1, tx1 = f"{tenant_id}-inv-1", f"{tenant_id}-tx-1"
+
+        assert await write_candidates(db_session, tenant_id, [candidate(inv1, tx1, 95)]) == (1, 0)
+        await db_session.commit()
+        first_id = await db_session.scalar(
+            select(MatchCandidate.id).where(MatchCandidate.invoice_id == inv1)
+        )
+
+        assert await write_candidates(db_session, tenant_id, [candidate(inv1, tx1, 95)]) == (0, 0)
+        assert await write_candidates(db_session, tenant_id, [candidate(inv1, tx1, 90)]) == (1, 0)
+        await db_session.commit()
+
+        stored = await db_session.execute(
+            select(MatchCandidate.id, MatchCandidate.score).where(MatchCandidate.invoice_id == inv1)
+        )
+        assert stored.all() == [(first_id, 90)]
+
+
+class TestReconcileTenant:
+    """Test reconciling a tenant straight from the database."""
+
+    async def test_scores_and_stores_candidates(self, db_session):
+        """Test that results match in-memory scoring and are stored as proposals."""
+        tenant_id = await seed_tenant(db_session)
+        service = ReconciliationService()
+
+        result = await service.reconcile_tenant(db_session, tenant_id, top_n=1)
+
+        invoices = await load_open_invoices(db_session, tenant_id)
+        transactions = await load_unmatched_transactions(db_session, tenant_id)
+        expected = service.score_candidates(tenant_id, invoices, transactions, top_n=1).candidates
+
+        stored = await db_session.execute(
+            select(MatchCandidate.invoice_id, MatchCandidate.bank_transaction_id, MatchCandidate.score)
+            .where(MatchCandidate.tenant_id == tenant_id, MatchCandidate.status == MatchStatus.PROPOSED)
+        )
+        assert result.processed_invoices == 2
+        assert result.processed_transactions == 2
+        assert result.candidates_written == len(expected)
+        assert result.candidates_removed == 0
+        assert sorted(stored.all()) == sorted(
+            (c.invoice_id, c.transaction_id, c.score) for c in expected
+        )
+        assert service.vendor_automata[tenant_id].patterns
+
+    async def test_mutation(self, db_session, monkeypatch):
+        """Test that reconcileTenant opens its own session and reports counts."""
+        tenant_id = await seed_tenant(db_session)
+        monkeypatch.setattr("app.graphql.schema.async_session_maker", TestingSessionLocal)
+
+        result = await schema.execute(f"""mutation {{
+            reconcileTenant(tenantId: "{tenant_id}", topN: 1) {{
+                processedInvoices processedTransactions candidatesWritten
+            }}
+        }}""")
+
+        assert result.errors is None
+        assert result.data["reconcileTenant"]["processedInvoices"] == 2
+        assert result.data["reconcileTenant"]["processedTransactions"] == 2
@@ -0,0 +1,59 @@
+import pytest
+from difflib import SequenceMatcher
+from app.services.features import InvoiceRecord, TransactionRecord
+from app.services.reconciliation_service import ReconciliationService
+from app.services.text_similarity import SequenceMatcherEngine, TfidfEngine, create_text_engine
+
+
+def invoice(description):
+    return InvoiceRecord({"id": "inv-001", "amount": 100, "description": description})
+
+
+def transaction(description):
+    return TransactionRecord({"id": "tx-001", "amount": 100, "description": description})
+
+
+class TestTextSimilarityEngines:
+    """Test the pluggable description similarity engines."""
+
+    def test_sequence_engine_matches_sequence_matcher(self):
+        """Test that the cached engine keeps SequenceMatcher ratios."""
+        engine = SequenceMatcherEngine()
+        pairs = [("ss ww", "s w s"), ("www", "ss ww"), ("s s s", "s w s"), ("ss ww", "s w s")]
+
+        for left, right in pairs:
+            expected = SequenceMatcher(None, left, right).ratio()
+            assert engine.similarity(invoice(left), transaction(right)) == expected
+
+    def test_tfidf_engine_range(self):
+        """Test TF-IDF cosine similarity bounds."""
+        invoices = [invoice("ss ww")]
+        transactions = [transaction("ss ww"), transaction("s"), transaction("ww ss s")]
+        engine = TfidfEngine(invoices, transactions)
+
+        identical, unrelated, overlapping = engine.similarities(invoices[0], transactions)
+
+        assert identical == pytest.approx(1.0)
+        assert 0.0 <= unrelated < overlapping < identical
+
+    def test_tenant_engine_selection(self):
+        """Test that tenants can migrate to the TF-IDF engine independently."""
+        service = ReconciliationService()
+        invoices = [{"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15", "description": "ss ww"}]
+        transactions = [{"id": "tx-001", "amount": 100, "posted_at": "2024-01-15", "description": "ss ww s"}]
+
+        service.set_text_engine("tenant-002", "tfidf")
+        sequence = service.score_candidates("tenant-001", invoices, transactions)
+        tfidf = service.score_candidates("tenant-002", invoices, transactions)
+
+        expected = int(SequenceMatcher(None, "ss ww", "ss ww s").ratio() * 200)
+        assert sequence.candidates[0].score_breakdown.text_similarity == expected
+        assert 0 < tfidf.candidates[0].score_breakdown.text_similarity <= 200
+
+    def test_unknown_engine(self):
+        """Test that unknown engines are rejected."""
+        with pytest.raises(ValueError):
+            create_text_engine("soundex", [], [])
+
+        with pytest.raises(ValueError):
+            ReconciliationService().set_text_engine("tenant-001", "soundex")
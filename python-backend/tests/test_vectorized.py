@@ -0,0 +1,108 @@
+import random
+import pytest
+from app.services.blocking import BlockingPlan, EXHAUSTIVE_PLAN
+from app.services.features import prepare_invoices, prepare_transactions
+from app.services.reconciliation_service import ReconciliationService
+from app.services.vectorized import VectorizedScorer
+
+
+def breakdowns(result):
+    return [
+        (
+            c.invoice_id,
+            c.transaction_id,
+            c.score_breakdown.exact_amount,
+            c.score_breakdown.date_proximity,
+            c.score_breakdown.text_similarity,
+            c.score_breakdown.vendor_match,
+            c.score_breakdown.total,
+        )
+        for c in result.candidates
+    ]
+
+
+class TestVectorizedScorer:
+    """Test the NumPy scoring backend against the pure-Python scorer."""
+
+    @pytest.fixture
+    def service(self):
+        return ReconciliationService()
+
+    @pytest.fixture
+    def batch(self):
+        rng = random.Random(42)
+        dates = ["2024-01-15", "2024-01-16T10:30:00Z", "01/18/2024", "2024-01-24 09:00:00", None, "bad"]
+        amounts = [1000.00, 1005.00, 990.00, 250.00, -5.00, "n/a", 1000.009]
+        words = ["ss", "www", "payment", "s w", "transfer"]
+
+        invoices = [
+            {
+                "id": f"inv-{i}",
+                "amount": rng.choice(amounts),
+                "invoice_date": rng.choice(dates),
+                "description": " ".join(rng.sample(words, 2)),
+                "vendor_name": rng.choice(words),
+                "currency": rng.choice(["USD", "EUR", None]),
+            }
+            for i in range(12)
+        ]
+        transactions = [
+            {
+                "id": f"tx-{i}",
+                "amount": rng.choice(amounts),
+                "posted_at": rng.choice(dates),
+                "description": " ".join(rng.sample(words, 3)),
+                "currency": rng.choice(["USD", "EUR", None]),
+            }
+            for i in range(20)
+        ]
+        return invoices, transactions
+
+    @pytest.mark.parametrize("plan", [
+        EXHAUSTIVE_PLAN,
+        BlockingPlan(),
+        BlockingPlan(keys=("date", "currency"), match="all", full_scan_fallback=True),
+        BlockingPlan(keys=("amount", "vendor"), match="any"),
+    ])
+    def test_backends_return_identical_breakdowns(self, service, batch, plan):
+        """Test that both backends produce the same candidates and breakdowns."""
+        invoices, transactions = batch
+
+        python = service.score_candidates("tenant-001", invoices, transactions, top_n=20, plan=plan)
+        vectorized = service.score_candidates(
+            "tenant-001", invoices, transactions, top_n=20, plan=plan, backend="numpy"
+        )
+
+        assert breakdowns(vectorized) == breakdowns(python)
+
+    def test_threshold_skips_low_partial_scores(self, service, batch):
+        """Test that pairs below the partial threshold are not returned."""
+        invoices, transactions = batch
+
+        for backend in ("python", "numpy"):
+            result = service.score_candidates(
+                "tenant-001", invoices, transactions, top_n=20,
+                plan=EXHAUSTIVE_PLAN, backend=backend, min_partial_score=1000,
+            )
+            assert all(
+                c.score_breakdown.exact_amount + c.score_breakdown.date_proximity >= 1000
+                for c in result.candidates
+            )
+
+    def test_small_chunks(self, service, batch):
+        """Test that chunking the score matrix does not change results."""
+        invoices, transactions = map(list, batch)
+        invoice_records = prepare_invoices(invoices)
+        transaction_records = prepare_transactions(transactions)
+
+        whole = VectorizedScorer(service, transaction_records, EXHAUSTIVE_PLAN)
+        chunked = VectorizedScorer(service, transaction_records, EXHAUSTIVE_PLAN, chunk_cells=1)
+
+        assert list(chunked.iter_scores(invoice_records)) == list(whole.iter_scores(invoice_records))
+
+    def test_unknown_backend(self, service, batch):
+        """Test that unknown backends are rejected."""
+        invoices, transactions = batch
+
+        with pytest.raises(ValueError):
+            service.score_candidates("tenant-001", invoices, transactions, backend="gpu")
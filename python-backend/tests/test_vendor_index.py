@@ -0,0 +1,103 @@
+import random
+from app.services.features import InvoiceRecord, TransactionRecord, prepare_invoices, prepare_transactions
+from app.services.reconciliation_service import ReconciliationService
+from app.services.vendor_index import VendorAutomaton, VendorMentionIndex
+
+
+def transaction(description):
+    return TransactionRecord({"id": "tx-001", "amount": 100, "description": description})
+
+
+class TestVendorAutomaton:
+    """Test Aho-Corasick vendor name matching."""
+
+    def test_matches_substring_search(self):
+        """Test that the automaton finds exactly the patterns substring search finds."""
+        rng = random.Random(7)
+        patterns = {"".join(rng.choice("sw ") for _ in range(rng.randint(1, 4))) for _ in range(30)}
+        automaton = VendorAutomaton(patterns)
+
+        for _ in range(200):
+            text = "".join(rng.choice("sw \\") for _ in range(rng.randint(0, 20)))
+            expected = {pattern for pattern in patterns if pattern in text}
+            assert automaton.find(text) == expected
+
+    def test_overlapping_and_suffix_patterns(self):
+        """Test patterns that overlap or are suffixes of each other."""
+        automaton = VendorAutomaton(["sws", "ws", "s", "wsw"])
+
+        assert automaton.find("wsws") == {"sws", "ws", "s", "wsw"}
+        assert automaton.find("ww") == set()
+
+    def test_empty_patterns_ignored(self):
+        """Test that empty vendor names are not part of the automaton."""
+        automaton = VendorAutomaton(["", "ss"])
+
+        assert len(automaton) == 1
+        assert automaton.find("") == set()
+
+
+class TestVendorMentionIndex:
+    """Test per-request vendor mention lookups."""
+
+    def test_matches(self):
+        """Test membership, empty vendor and unknown vendor fallback."""
+        tx = transaction("ss ww")
+        index = VendorMentionIndex(VendorAutomaton(["ss", "sw"]), [tx])
+
+        assert index.mentions(tx) == {"ss"}
+        assert index.matches("ss", tx)
+        assert not index.matches("sw", tx)
+        assert index.matches("", tx)
+        # Not in the automaton: falls back to substring search
+        assert index.matches("s w", tx)
+
+    def test_scores_match_substring_scoring(self):
+        """Test that indexed vendor scores equal plain substring scores."""
+        service = ReconciliationService()
+        rng = random.Random(3)
+        invoices = prepare_invoices([
+            {"id": f"inv-{i}", "amount": 100, "vendor_name": "".join(rng.choice("sw ") for _ in range(3))}
+            for i in range(20)
+        ])
+        transactions = prepare_transactions([
+            {"id": f"tx-{i}", "amount": 100, "description": "".join(rng.choice("sw x") for _ in range(12))}
+            for i in range(20)
+        ])
+        index = VendorMentionIndex(service._vendor_automaton("tenant-001", invoices), transactions)
+
+        for inv in invoices:
+            for tx in transactions:
+                assert service._score_vendor_match(inv, tx, index) == service._score_vendor_match(inv, tx)
+
+
+class TestTenantVendorAutomata:
+    """Test the per-tenant automaton cache."""
+
+    def test_reused_while_vendors_covered(self):
+        """Test that the automaton is rebuilt only for unseen vendors."""
+        service = ReconciliationService()
+        service.set_tenant_vendors("tenant-001", ["Sss", "WWW"])
+        preloaded = service.vendor_automata["tenant-001"]
+
+        covered = [InvoiceRecord({"id": "inv-001", "amount": 1, "vendor_name": "sss"})]
+        assert service._vendor_automaton("tenant-001", covered) is preloaded
+
+        extended = covered + [InvoiceRecord({"id": "inv-002", "amount": 1, "vendor_name": "sws"})]
+        automaton = service._vendor_automaton("tenant-001", extended)
+        assert automaton is not preloaded
+        assert automaton.patterns == {"sss", "www", "sws"}
+        assert service._vendor_automaton("tenant-002", covered).patterns == {"sss"}
+
+    def test_batch_vendors_do_not_accumulate(self):
+        """Test that batch automata cover the preloaded set plus the current batch only."""
+        service = ReconciliationService()
+        service.set_tenant_vendors("tenant-001", ["Sss"])
+
+        first = [InvoiceRecord({"id": "inv-001", "amount": 1, "vendor_name": "sws"})]
+        second = [InvoiceRecord({"id": "inv-002", "amount": 1, "vendor_name": "wsw"})]
+
+        automaton = service._vendor_automaton("tenant-001", first)
+        assert service._vendor_automaton("tenant-001", first) is automaton
+        assert service._vendor_automaton("tenant-001", second).patterns == {"sss", "wsw"}
+        assert service.vendor_automata["tenant-001"].patterns == {"sss"}
@@ -0,0 +1,101 @@
+import pytest
+from app.services.reconciliation_service import ReconciliationService
+from app.services.working_set import StaleWorkingSetError, WorkingSetStore
+
+
+INVOICES = [
+    {"id": "inv-001", "amount": 100, "invoice_date": "2024-01-15", "description": "ss ww"},
+    {"id": "inv-002", "amount": 250, "invoice_date": "2024-01-16"},
+]
+
+TRANSACTIONS = [
+    {"id": "tx-001", "amount": 100, "posted_at": "2024-01-15", "description": "ss ww"},
+    {"id": "tx-002", "amount": 250, "posted_at": "2024-01-17", "description": "s"},
+]
+
+
+def candidate_rows(result):
+    return [(c.invoice_id, c.transaction_id, c.score) for c in result.candidates]
+
+
+class TestWorkingSetStore:
+    """Test versioned per-tenant working sets."""
+
+    def test_sync_and_delta_versions(self):
+        """Test that syncs and deltas issue new version tokens."""
+        store = WorkingSetStore()
+
+        first = store.sync("tenant-001", INVOICES, TRANSACTIONS).version
+        working_set = store.apply_delta("tenant-001", first, [], ["inv-002"], [], [])
+        second = working_set.version
+        assert list(working_set.invoices) == ["inv-001"]
+        third = store.sync("tenant-001", [], []).version
+        assert len({first, second, third}) == 3
+
+    def test_stale_delta_refused(self):
+        """Test that deltas against an old or missing version require a resync."""
+        store = WorkingSetStore()
+
+        with pytest.raises(StaleWorkingSetError):
+            store.apply_delta("tenant-001", "unknown", [], [], [], [])
+
+        version = store.sync("tenant-001", INVOICES, TRANSACTIONS).version
+        current = store.apply_delta("tenant-001", version, [], [], [], []).version
+        with pytest.raises(StaleWorkingSetError) as error:
+            store.apply_delta("tenant-001", version, [], [], [], [])
+        assert error.value.actual == current
+
+    def test_versions_from_another_store_refused(self):
+        """Test that a token issued by a restarted or different process never matches."""
+        before_restart = WorkingSetStore()
+        version = before_restart.sync("tenant-001", INVOICES, TRANSACTIONS).version
+
+        after_restart = WorkingSetStore()
+        after_restart.sync("tenant-001", [], [])
+
+        with pytest.raises(StaleWorkingSetError):
+            after_restart.apply_delta("tenant-001", version, [], [], [], [])
+
+    def test_failed_delta_changes_nothing(self):
+        """Test that a delta with an invalid record leaves the set at its old version."""
+        store = WorkingSetStore()
+        version = store.sync("tenant-001", INVOICES, TRANSACTIONS).version
+
+        with pytest.raises(KeyError):
+            store.apply_delta("tenant-001", version, [{"amount": 5}], ["inv-001"], [], [])
+
+        working_set = store.get("tenant-001")
+        assert working_set.version == version
+        assert list(working_set.invoices) == ["inv-001", "inv-002"]
+
+
+class TestWorkingSetScoring:
+    """Test scoring against retained working sets."""
+
+    def test_delta_scoring_matches_full_upload(self):
+        """Test that a synced set plus a delta scores like the full records."""
+        service = ReconciliationService()
+        changed_invoice = dict(INVOICES[1], amount=100)
+        new_transaction = {"id": "tx-003", "amount": 100, "posted_at": "2024-01-16", "description": "ss"}
+
+        version = service.sync_working_set("tenant-001", INVOICES, TRANSACTIONS).version
+        version = service.apply_working_set_delta(
+            "tenant-001", version, [changed_invoice], [], [new_transaction], ["tx-002"]
+        ).version
+
+        retained = service.score_working_set("tenant-001", version)
+        full = service.score_candidates(
+            "tenant-001", [INVOICES[0], changed_invoice], [TRANSACTIONS[0], new_transaction]
+        )
+
+        assert candidate_rows(retained) == candidate_rows(full)
+        assert retained.processed_invoices == 2
+        assert retained.processed_transactions == 2
+
+    def test_scoring_stale_version_refused(self):
+        """Test that scoring a version the server does not hold fails."""
+        service = ReconciliationService()
+        service.sync_working_set("tenant-001", INVOICES, TRANSACTIONS)
+
+        with pytest.raises(StaleWorkingSetError):
+            service.score_working_set("tenant-001", "stale")